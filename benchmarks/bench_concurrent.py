@@ -0,0 +1,95 @@
+"""
+Measures read throughput of a `SharedModel` from several threads while a
+writer publishes snapshots, and prints the results as JSON.
+
+    python benchmarks/bench_concurrent.py --readers 1 2 4 8 --duration 2
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sysml
+
+
+def build(width):
+    """Create a model with one package of width blocks, each with one part"""
+    model = sysml.Model("benchmark")
+    package = sysml.Package("structure")
+    model.add(package)
+    for i in range(width):
+        block = sysml.Block("block{}".format(i))
+        block.add_part("part", sysml.Block("part{}".format(i)))
+        package.add(block)
+    return model
+
+
+def run(readers, duration, width, write):
+    shared = sysml.SharedModel(build(width))
+    done = threading.Event()
+    reads = [0] * readers
+    writes = [0]
+
+    def read(slot):
+        count = 0
+        while not done.is_set():
+            snapshot = shared.snapshot()
+            structure = snapshot["structure"]
+            structure["block{}".format(count % width)]["part"]
+            count += 1
+        reads[slot] = count
+
+    def edit():
+        i = 0
+        while not done.is_set():
+            with shared.edit() as draft:
+                block = draft["structure"]["block{}".format(i % width)]
+                block.multiplicity = i
+            i += 1
+        writes[0] = i
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    if write:
+        threads.append(threading.Thread(target=edit))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "readers": readers,
+        "writer": write,
+        "width": width,
+        "reads_per_second": sum(reads) / duration,
+        "publishes_per_second": writes[0] / duration,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=1.0)
+    parser.add_argument("--width", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    results = [
+        run(readers, args.duration, args.width, write)
+        for readers in args.readers
+        for write in (False, True)
+    ]
+    json.dump(
+        {"python": sys.version.split()[0], "results": results}, sys.stdout, indent=2
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Times core model operations on synthetic models, and prints the results as
+JSON for comparison across releases.
+
+    python benchmarks/bench_core.py --depth 8 --branching 3 --width 10000
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# run from a checkout without installing the package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import sysml
+from synthetic import deep_tree, requirement_web, wide_package
+
+
+def timed(function, repeat):
+    """Returns the best and mean wall time of repeated calls to function"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "mean": sum(times) / len(times)}
+
+
+def peak_memory(function):
+    """Returns the peak memory allocated by Python during a call to function"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def size(model):
+    """Returns the number of elements owned by model"""
+    return model.query().count()
+
+
+def bench_construct(shapes, repeat):
+    results = []
+    for shape, build in shapes.items():
+        result = {"case": "construct", "shape": shape, "size": size(build())}
+        result.update(timed(build, repeat))
+        result["peak_bytes"] = peak_memory(build)
+        results.append(result)
+    return results
+
+
+def bench_getitem(shapes, repeat, lookups):
+    results = []
+
+    model = shapes["deep"]()
+    path = ["structure", "root"]
+    block = model["structure"]["root"]
+    while block.parts:
+        key = list(block.parts)[-1]
+        path.append(key)
+        block = block[key]
+
+    def walk():
+        for _ in range(lookups):
+            element = model
+            for key in path:
+                element = element[key]
+
+    result = {"case": "getitem", "shape": "deep", "size": len(path), "lookups": lookups}
+    result.update(timed(walk, repeat))
+    results.append(result)
+
+    package = shapes["wide"]()["structure"]
+    names = list(package.elements)
+    keys = [names[i * 7919 % len(names)] for i in range(lookups)]
+
+    def lookup():
+        for key in keys:
+            package[key]
+
+    result = {
+        "case": "getitem",
+        "shape": "wide",
+        "size": len(names),
+        "lookups": lookups,
+    }
+    result.update(timed(lookup, repeat))
+    results.append(result)
+    return results
+
+
+def bench_add_remove(width, repeat):
+    blocks = [sysml.Block("block{}".format(i)) for i in range(width)]
+
+    def add():
+        package = sysml.Package("structure")
+        for block in blocks:
+            package.add(block)
+        return package
+
+    def add_remove():
+        package = add()
+        for block in blocks:
+            package.remove(block)
+
+    results = []
+    for case, function in (("package_add", add), ("package_add_remove", add_remove)):
+        result = {"case": case, "shape": "wide", "size": width}
+        result.update(timed(function, repeat))
+        results.append(result)
+    return results
+
+
+def bench_yaml(shapes, repeat):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for shape, build in shapes.items():
+            model = build()
+            filename = os.path.join(directory, "{}.yaml".format(shape))
+            result = {"case": "to_yaml", "shape": shape, "size": size(model)}
+            result.update(timed(lambda: model.to_yaml(filename), repeat))
+            results.append(result)
+            result = {"case": "read_yaml", "shape": shape, "size": size(model)}
+            result.update(timed(lambda: sysml.read_yaml(filename), repeat))
+            result["file_bytes"] = os.path.getsize(filename)
+            results.append(result)
+    return results
+
+
+def bench_jsonl(shapes, repeat):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for shape, build in shapes.items():
+            model = build()
+            filename = os.path.join(directory, "{}.jsonl".format(shape))
+            result = {"case": "to_jsonl", "shape": shape, "size": size(model)}
+            result.update(timed(lambda: model.to_jsonl(filename), repeat))
+            results.append(result)
+            for case, validate in (
+                ("read_jsonl", False),
+                ("read_jsonl_validate", True),
+            ):
+                result = {"case": case, "shape": shape, "size": size(model)}
+                result.update(
+                    timed(lambda: sysml.read_jsonl(filename, validate), repeat)
+                )
+                results.append(result)
+    return results
+
+
+def bench_import(repeat):
+    """Times `import sysml` in fresh interpreters, as reported by
+    -X importtime"""
+    times = []
+    path = os.environ.get("PYTHONPATH")
+    env = dict(os.environ, PYTHONPATH=ROOT if not path else ROOT + os.pathsep + path)
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import sysml"],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+        )
+        for line in process.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == "sysml":
+                times.append(int(fields[1]) / 1e6)
+    return [
+        {
+            "case": "import",
+            "best": min(times),
+            "mean": sum(times) / len(times),
+        }
+    ]
+
+
+CASES = ("construct", "getitem", "add_remove", "yaml", "jsonl", "import")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--branching", type=int, default=2)
+    parser.add_argument("--width", type=int, default=2000)
+    parser.add_argument("--requirements", type=int, default=200)
+    parser.add_argument("--density", type=int, default=2)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    shapes = {
+        "deep": lambda: deep_tree(args.depth, args.branching),
+        "wide": lambda: wide_package(args.width),
+        "web": lambda: requirement_web(args.requirements, args.density),
+    }
+    results = []
+    if "construct" in args.cases:
+        results.extend(bench_construct(shapes, args.repeat))
+    if "getitem" in args.cases:
+        results.extend(bench_getitem(shapes, args.repeat, args.lookups))
+    if "add_remove" in args.cases:
+        results.extend(bench_add_remove(args.width, args.repeat))
+    if "yaml" in args.cases:
+        results.extend(bench_yaml(shapes, args.repeat))
+    if "jsonl" in args.cases:
+        results.extend(bench_jsonl(shapes, args.repeat))
+    if "import" in args.cases:
+        results.extend(bench_import(args.repeat))
+
+    json.dump(
+        {
+            "python": sys.version.split()[0],
+            "sysml": sysml.__version__,
+            "arguments": vars(args),
+            "results": results,
+        },
+        sys.stdout,
+        indent=2,
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main()
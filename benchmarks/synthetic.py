@@ -0,0 +1,69 @@
+"""
+Generators of synthetic models of configurable size and shape, shared by the
+benchmark scripts.
+"""
+
+import os
+import random
+import sys
+
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sysml
+
+
+def deep_tree(depth, branching):
+    """Create a model whose structure package holds one block with a tree
+    of parts, branching parts per block, depth levels deep"""
+    model = sysml.Model("deep")
+    root = sysml.Block("root")
+    level = [root]
+    for d in range(1, depth):
+        following = []
+        for block in level:
+            for b in range(branching):
+                part = sysml.Block("{}.{}".format(block.name, b))
+                block.add_part("part{}".format(b), part)
+                following.append(part)
+        level = following
+    model.add(sysml.Package("structure", [root]))
+    return model
+
+
+def wide_package(width):
+    """Create a model whose structure package holds width blocks"""
+    model = sysml.Model("wide")
+    package = sysml.Package("structure")
+    for i in range(width):
+        package.add(sysml.Block("block{}".format(i)))
+    model.add(package)
+    return model
+
+
+def requirement_web(requirements, density, seed=0, chunk=100):
+    """Create a model of requirements each derived from up to density
+    earlier requirements and satisfied by a block of its own
+
+    Relationships are spread over packages of at most chunk elements."""
+    rng = random.Random(seed)
+    model = sysml.Model("web")
+    reqts = [
+        sysml.Requirement("req{}".format(i), "shall {}".format(i), "REQ-{}".format(i))
+        for i in range(requirements)
+    ]
+    blocks = [sysml.Block("block{}".format(i)) for i in range(requirements)]
+    model.add(sysml.Package("requirements", reqts))
+    model.add(sysml.Package("structure", blocks))
+
+    relations = []
+    for i, requirement in enumerate(reqts):
+        relations.append(sysml.Satisfy(blocks[i], requirement))
+        for supplier in rng.sample(reqts[:i], min(i, density)):
+            relations.append(sysml.DeriveReqt(requirement, supplier))
+    for start in range(0, len(relations), chunk):
+        package = sysml.Package("relations{}".format(start // chunk))
+        for relation in relations[start : start + chunk]:
+            package.add(relation)
+        model.add(package)
+    return model
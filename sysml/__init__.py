@@ -1,4 +1,15 @@
 from sysml.elements import *
 from sysml.system import *
+from sysml.derivation import *
+from sysml.cycles import *
+from sysml.compare import *
+from sysml.concurrent import *
+from sysml.store import *
+from sysml.query import *
+from sysml.simulation import *
+from sysml.instrumentation import *
+from sysml.memory import *
+from sysml.jsonl import *
+from sysml.rules import *
 
 __version__ = "0.1.0"
@@ -0,0 +1,139 @@
+"""
+The `compare.py` module computes structural differences between two versions
+of a model, matching model elements by their uuid rather than their name.
+"""
+
+from sysml.elements.base import _REFERENCE_KINDS
+from collections import namedtuple as _namedtuple
+from typing import Iterator
+
+Change = _namedtuple("Change", ["kind", "uuid", "old_path", "new_path", "old", "new"])
+Change.__doc__ = """A single difference between two models
+
+kind is one of "added", "removed", "moved", "renamed" or "modified". Paths
+are tuples of the keys leading to an element from the root of its model, and
+are None, like old or new, on the side where the element does not exist."""
+
+
+def diff(model_a, model_b) -> Iterator["Change"]:
+    """Yields the changes that turn model_a into model_b
+
+    Subtrees with equal content hashes are skipped without being visited.
+    Elements are reported as "added" or "removed" at the top of each new or
+    deleted subtree, and as "moved" when their owner or key differs.
+
+    Parameters
+    ----------
+    model_a : ModelElement
+
+    model_b : ModelElement
+
+    Example
+    -------
+    >>> for change in sysml.diff(sysml.read_yaml("v1.yaml"), model):
+    ...     print(change.kind, change.new_path or change.old_path)
+    renamed ('structure', 'constitution-class starship')
+    """
+    added: dict = {}
+    removed: dict = {}
+    stack: list = [((), model_a, (), model_b)]
+    while stack:
+        path_a, a, path_b, b = stack.pop()
+        if a.content_hash == b.content_hash:
+            continue
+        yield from _compare(path_a, a, path_b, b)
+
+        containers_a = dict(a._containers())
+        for kind, elements_b in b._containers():
+            if kind in _REFERENCE_KINDS:
+                continue
+            elements_a = containers_a.get(kind, {})
+            matched = set()
+            pending = []
+            for key, child in elements_b.items():
+                child_a = elements_a.get(key)
+                if child_a is not None and child_a.uuid == child.uuid:
+                    matched.add(key)
+                    stack.append((path_a + (key,), child_a, path_b + (key,), child))
+                else:
+                    pending.append((key, child))
+            index = {
+                child.uuid: (key, child)
+                for key, child in elements_a.items()
+                if key not in matched
+            }
+            for key, child in pending:
+                match = index.pop(child.uuid, None)
+                if match is None:
+                    added[child.uuid] = (path_b, key, child, b.uuid)
+                    continue
+                key_a, child_a = match
+                yield Change(
+                    "moved",
+                    child.uuid,
+                    path_a + (key_a,),
+                    path_b + (key,),
+                    child_a,
+                    child,
+                )
+                stack.append((path_a + (key_a,), child_a, path_b + (key,), child))
+            for uuid, (key, child) in index.items():
+                removed[uuid] = (path_a, key, child, a.uuid)
+
+    if not added and not removed:
+        return
+
+    # elements leaving one owner for another show up on both sides; pair
+    # them by uuid across every subtree that was added or removed
+    old = _index(removed)
+    new = _index(added)
+    for uuid, (path_b, element_b, owner_b) in new.items():
+        match = old.get(uuid)
+        if match is None:
+            if owner_b not in new or owner_b in old:
+                yield Change("added", uuid, None, path_b, None, element_b)
+            continue
+        path_a, element_a, owner_a = match
+        if owner_a != owner_b or path_a[-1] != path_b[-1]:
+            yield Change("moved", uuid, path_a, path_b, element_a, element_b)
+        yield from _compare(path_a, element_a, path_b, element_b)
+    for uuid, (path_a, element_a, owner_a) in old.items():
+        if uuid not in new and (owner_a not in old or owner_a in new):
+            yield Change("removed", uuid, path_a, None, element_a, None)
+
+
+def _compare(path_a, a, path_b, b) -> Iterator["Change"]:
+    """Yields the changes to the fields of a single element"""
+    content_a = a._content()
+    content_b = b._content()
+    if content_a[0] != content_b[0]:
+        yield Change("renamed", b.uuid, path_a, path_b, a, b)
+    if content_a[1:] != content_b[1:] or _references(a) != _references(b):
+        yield Change("modified", b.uuid, path_a, path_b, a, b)
+
+
+def _references(element) -> dict:
+    return {
+        (kind, key): child.uuid
+        for kind, elements in element._containers()
+        if kind in _REFERENCE_KINDS
+        for key, child in elements.items()
+    }
+
+
+def _index(roots) -> dict:
+    """Maps the uuid of every element within the given subtrees to its path,
+    the element, and the uuid of its owner"""
+    index = {}
+    stack = list(roots.values())
+    while stack:
+        path, key, element, owner = stack.pop()
+        if element.uuid in index:
+            continue
+        index[element.uuid] = (path + (key,), element, owner)
+        for kind, elements in element._containers():
+            if kind in _REFERENCE_KINDS:
+                continue
+            for child_key, child in elements.items():
+                stack.append((path + (key,), child_key, child, element.uuid))
+    return index
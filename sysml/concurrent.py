@@ -0,0 +1,69 @@
+"""
+The `concurrent.py` module shares a model between threads using
+read-copy-update: readers work on immutable published snapshots without
+taking locks, while a writer edits a copy-on-write draft and publishes it as
+the next snapshot.
+"""
+
+from sysml.system import Model
+from contextlib import contextmanager as _contextmanager
+from threading import Lock as _Lock
+from typing import Iterator
+
+
+class SharedModel:
+    """This class defines a model shared between reader and writer threads
+
+    Parameters
+    ----------
+    model : Model
+        Initial snapshot. It must not be edited directly once shared.
+
+    Example
+    -------
+    >>> shared = sysml.SharedModel(model)
+    >>> with shared.edit() as draft:
+    ...     draft["structure"]["starship"].add_part("cloak", cloak)
+    >>> snapshot = shared.snapshot()  # from any thread
+    """
+
+    def __init__(self, model: "Model") -> None:
+        if not isinstance(model, Model):
+            raise TypeError
+        self._snapshot = model
+        self._version = 0
+        self._lock = _Lock()
+
+    @property
+    def version(self) -> int:
+        """Number of snapshots published since the model was shared"""
+        return self._version
+
+    def snapshot(self) -> "Model":
+        """Returns the latest published snapshot. Snapshots never change, so
+        they can be read without locks for as long as they are needed."""
+        return self._snapshot
+
+    @_contextmanager
+    def edit(self) -> Iterator["Model"]:
+        """Yields a draft of the latest snapshot to edit, and publishes it when
+        the block exits without raising. Writers are serialized.
+
+        Notes
+        -----
+        Reach the elements of the draft through item access and the collection
+        views only, so that every element it changes is copied away from the
+        snapshots readers may hold.
+        """
+        with self._lock:
+            draft = self._snapshot.fork()
+            try:
+                yield draft
+            except BaseException:
+                draft.discard()
+                raise
+            fork = draft._fork
+            if fork is not None:
+                fork.seal()
+            self._snapshot = draft
+            self._version += 1
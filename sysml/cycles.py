@@ -0,0 +1,213 @@
+"""
+The `cycles.py` module detects containment loops, such as a block that is
+one of its own parts, and derivation loops between requirements.
+
+---------
+
+`find_cycle` checks a whole model in a single linear pass. `CycleGuard`
+rejects loops as they are inserted, keeping an online topological order of
+containers so that most insertions cost a comparison of two integers.
+"""
+
+from sysml.elements.base import ModelElement, _REFERENCE_KINDS
+from sysml.elements.structure import Block, Package, PartUsage
+from sysml.derivation import DerivationGraph
+from weakref import WeakKeyDictionary as _WeakKeyDictionary
+from weakref import WeakSet as _WeakSet
+from typing import List, Optional
+
+
+def _owned(element):
+    """Yields the model elements owned, rather than referenced, by element,
+    or the definition of a part usage, whose parts each use contains"""
+    if isinstance(element, PartUsage):
+        yield element._definition
+        return
+    for kind, elements in element._containers():
+        if kind not in _REFERENCE_KINDS:
+            yield from elements.values()
+
+
+def _nested(element):
+    """Yields the packages and blocks owned by element, taking part usages
+    for their definitions"""
+    for child in _owned(element):
+        if isinstance(child, PartUsage):
+            child = child._definition
+        if isinstance(child, (Package, Block)):
+            yield child
+
+
+def find_cycle(model) -> Optional[List["ModelElement"]]:
+    """Returns the elements of a containment loop or derivation loop within
+    model, in order, or None if model is acyclic
+
+    Parameters
+    ----------
+    model : ModelElement
+
+    """
+    position = {id(model): 0}
+    path = [model]
+    children = [_owned(model)]
+    while children:
+        for child in children[-1]:
+            index = position.get(id(child))
+            if index is None:
+                position[id(child)] = len(path)
+                path.append(child)
+                children.append(_owned(child))
+                break
+            if index >= 0:
+                return path[index:]
+        else:
+            children.pop()
+            position[id(path.pop())] = -1
+
+    cycle: Optional[List] = DerivationGraph.from_model(model).find_cycle()
+    return cycle
+
+
+class CycleGuard:
+    """This class defines a guard against containment loops
+
+    While installed, `Package.add`, `Block.add_part` and `Block.__setitem__`
+    raise a ValueError instead of making a package or block its own
+    ancestor, including through a part usage of it, and `Package.remove`,
+    `Block.remove_part` and `Block.__setitem__` drop the edges they undo. Containers are ordered so that every parent precedes its
+    children; an insertion that respects the order is accepted outright, and
+    otherwise only the containers between the two ends of the new edge are
+    searched and reordered (Pearce-Kelly).
+
+    Example
+    -------
+    >>> with sysml.CycleGuard():
+    ...     engine.add_part("starship", starship)
+    Traceback (most recent call last):
+    ...
+    ValueError: <Block('starship')> contains <Block('engine')>
+    """
+
+    def __init__(self) -> None:
+        self._order: "_WeakKeyDictionary" = _WeakKeyDictionary()
+        self._parents: "_WeakKeyDictionary" = _WeakKeyDictionary()
+        self._low = 0
+        self._high = 0
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def install(self) -> "CycleGuard":
+        """Checks every subsequent insertion with this guard"""
+        ModelElement._cycle_guard = self
+        return self
+
+    def uninstall(self) -> None:
+        """Stops checking insertions with this guard"""
+        if ModelElement._cycle_guard is self:
+            ModelElement._cycle_guard = None
+
+    def insert(self, parent, child) -> None:
+        """Checks that child can be placed within parent without closing a
+        containment loop, and records the edge"""
+        if isinstance(child, PartUsage):
+            child = child._definition
+        if not isinstance(child, (Package, Block)):
+            return
+        if parent is child:
+            raise ValueError("{!r} cannot contain itself".format(parent))
+        self._register(parent)
+        self._register(child)
+
+        lower = self._order[child]
+        upper = self._order[parent]
+        if upper > lower:
+            forward = self._search(child, upper, True, parent)
+            backward = self._search(parent, lower, False, None)
+            forward.sort(key=self._rank)
+            backward.sort(key=self._rank)
+            affected = backward + forward
+            ranks = sorted(self._rank(element) for element in affected)
+            for element, rank in zip(affected, ranks):
+                self._order[element] = rank
+        self._parents.setdefault(child, _WeakSet()).add(parent)
+
+    def remove(self, parent, child) -> None:
+        """Forgets the edge from parent to child, once parent no longer holds
+        child under any key"""
+        if isinstance(child, PartUsage):
+            child = child._definition
+        parents = self._parents.get(child)
+        if parents is None or parent not in parents:
+            return
+        if not any(element is child for element in _nested(parent)):
+            parents.discard(parent)
+
+    def _rank(self, element) -> int:
+        return self._order[element]
+
+    def _search(self, start, bound, forward, target) -> List["ModelElement"]:
+        """Collects the registered containers reachable from start, through
+        children if forward or through parents otherwise, that lie strictly
+        within bound in the current order, raising if target is reached"""
+        visited = [start]
+        seen = {id(start)}
+        stack = [start]
+        while stack:
+            element = stack.pop()
+            if forward:
+                neighbours = _nested(element)
+            else:
+                neighbours = list(self._parents.get(element, ()))
+            for neighbour in neighbours:
+                rank = self._order.get(neighbour)
+                if rank is None or id(neighbour) in seen:
+                    continue
+                if neighbour is target:
+                    raise ValueError("{!r} contains {!r}".format(start, target))
+                if (rank < bound) if forward else (rank > bound):
+                    seen.add(id(neighbour))
+                    visited.append(neighbour)
+                    stack.append(neighbour)
+        return visited
+
+    def _register(self, root) -> None:
+        """Orders root, and any containers beneath it not seen before, after
+        every container already ordered, or ahead of them all if it contains
+        one of them"""
+        if root in self._order:
+            return
+        active = {id(root)}
+        fresh = True
+        finished = []
+        path = [root]
+        children = [_nested(root)]
+        while children:
+            for child in children[-1]:
+                self._parents.setdefault(child, _WeakSet()).add(path[-1])
+                if child in self._order:
+                    fresh = False
+                    continue
+                if id(child) in active:
+                    raise ValueError("{!r} contains itself".format(child))
+                active.add(id(child))
+                path.append(child)
+                children.append(_nested(child))
+                break
+            else:
+                children.pop()
+                element = path.pop()
+                active.discard(id(element))
+                finished.append(element)
+
+        if fresh:
+            self._high += len(finished)
+            ranks = range(self._high, self._high - len(finished), -1)
+        else:
+            ranks = range(self._low - 1, self._low - len(finished) - 1, -1)
+            self._low -= len(finished)
+        for element, rank in zip(finished, ranks):
+            self._order[element] = rank
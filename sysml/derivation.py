@@ -0,0 +1,210 @@
+"""
+The `derivation.py` module indexes «deriveReqt» relationships of a model as a
+directed graph of requirements, for answering impact-analysis queries such as
+"which requirements are derived, directly or transitively, from REQ-12".
+"""
+
+from sysml.elements.requirements import Requirement
+from sysml.elements.structure import DeriveReqt
+from array import array as _array
+from typing import List, Optional
+
+
+class DerivationGraph:
+    """This class defines a derivation graph over requirements
+
+    Requirements are numbered as they are first seen, and each derive
+    relationship is stored as a pair of integer entries in per-requirement
+    adjacency arrays. Closure queries are answered iteratively and memoized
+    until a relationship that could change them is added or removed.
+
+    Parameters
+    ----------
+    relations : list of DeriveReqt, default None
+
+    acyclic : bool, default False
+        Reject relationships that would close a derivation loop, using the
+        memoized upstream closure of the supplier
+
+    Example
+    -------
+    >>> graph = sysml.DerivationGraph.from_model(model)
+    >>> graph.downstream(model["requirements"]["Top-level"])
+    [<Requirement('Functional')>]
+    """
+
+    def __init__(
+        self, relations: Optional[List["DeriveReqt"]] = None, acyclic: bool = False
+    ) -> None:
+        self._acyclic = acyclic
+        self._nodes: List["Requirement"] = []
+        self._index: dict = {}
+        self._suppliers: List["_array"] = []
+        self._clients: List["_array"] = []
+        self._relations: dict = {}
+        self._upstream: dict = {}
+        self._downstream: dict = {}
+
+        if relations is None:
+            pass
+        elif isinstance(relations, list):
+            for relation in relations:
+                self.add(relation)
+        else:
+            raise TypeError
+
+    @classmethod
+    def from_model(cls, model) -> "DerivationGraph":
+        """Builds a derivation graph from every «deriveReqt» relationship
+        subsumed by a model element"""
+        graph = cls()
+        for path, relation in model.walk(type=DeriveReqt, references=True):
+            graph.add(relation)
+        return graph
+
+    def __len__(self):
+        return len(self._relations)
+
+    def __contains__(self, relation):
+        return id(relation) in self._relations
+
+    def add(self, relation) -> None:
+        """Adds a «deriveReqt» relationship to graph
+
+        Parameters
+        ----------
+        relation : DeriveReqt
+
+        """
+        if not isinstance(relation, DeriveReqt):
+            raise TypeError
+        if id(relation) in self._relations:
+            return
+        if self._acyclic and self._closes_loop(relation):
+            raise ValueError("{!r} closes a derivation loop".format(relation))
+        client = self._node(relation.client)
+        supplier = self._node(relation.supplier)
+        self._suppliers[client].append(supplier)
+        self._clients[supplier].append(client)
+        self._relations[id(relation)] = (relation, client, supplier)
+        self._invalidate(client, supplier)
+
+    def remove(self, relation) -> None:
+        """Removes a «deriveReqt» relationship from graph
+
+        Parameters
+        ----------
+        relation : DeriveReqt
+
+        """
+        relation, client, supplier = self._relations.pop(id(relation))
+        self._invalidate(client, supplier)
+        self._suppliers[client].remove(supplier)
+        self._clients[supplier].remove(client)
+
+    def upstream(self, requirement) -> List["Requirement"]:
+        """Returns every requirement that requirement is derived from,
+        directly or transitively"""
+        closure = self._closure(requirement, self._suppliers, self._upstream)
+        return [self._nodes[node] for node in closure]
+
+    def downstream(self, requirement) -> List["Requirement"]:
+        """Returns every requirement derived from requirement, directly or
+        transitively"""
+        closure = self._closure(requirement, self._clients, self._downstream)
+        return [self._nodes[node] for node in closure]
+
+    def find_cycle(self) -> Optional[List["Requirement"]]:
+        """Returns the requirements of a derivation loop, in derivation order,
+        or None if the graph is acyclic"""
+        position: dict = {}
+        for root in range(len(self._nodes)):
+            if root in position:
+                continue
+            path = [root]
+            edges = [iter(self._suppliers[root])]
+            position[root] = 0
+            while edges:
+                for node in edges[-1]:
+                    index = position.get(node)
+                    if index is None:
+                        position[node] = len(path)
+                        path.append(node)
+                        edges.append(iter(self._suppliers[node]))
+                        break
+                    if index >= 0:
+                        return [self._nodes[node] for node in path[index:]]
+                else:
+                    edges.pop()
+                    position[path.pop()] = -1
+        return None
+
+    def _closes_loop(self, relation) -> bool:
+        if relation.client is relation.supplier:
+            return True
+        client = self._index.get(id(relation.client))
+        if client is None:
+            return False
+        return client in self._closure(
+            relation.supplier, self._suppliers, self._upstream
+        )
+
+    def _node(self, requirement) -> int:
+        node = self._index.get(id(requirement))
+        if node is None:
+            node = len(self._nodes)
+            self._index[id(requirement)] = node
+            self._nodes.append(requirement)
+            self._suppliers.append(_array("l"))
+            self._clients.append(_array("l"))
+        return node
+
+    def _closure(self, requirement, edges, cache) -> "_array":
+        if not isinstance(requirement, Requirement):
+            raise TypeError
+        node = self._index.get(id(requirement))
+        if node is None:
+            return _array("l")
+        closure = cache.get(node)
+        if closure is not None:
+            return closure
+
+        closure = _array("l")
+        seen = {node}
+        stack = [node]
+        while stack:
+            for other in edges[stack.pop()]:
+                if other in seen:
+                    continue
+                seen.add(other)
+                closure.append(other)
+                memo = cache.get(other)
+                if memo is None:
+                    stack.append(other)
+                    continue
+                for reached in memo:
+                    if reached not in seen:
+                        seen.add(reached)
+                        closure.append(reached)
+        cache[node] = closure
+        return closure
+
+    def _invalidate(self, client, supplier) -> None:
+        """Drops memoized closures that an edge between client and supplier
+        can change: upstream closures of client and everything derived from
+        it, downstream closures of supplier and everything it derives from"""
+        for cache, start, edges in (
+            (self._upstream, client, self._clients),
+            (self._downstream, supplier, self._suppliers),
+        ):
+            if not cache:
+                continue
+            seen = {start}
+            stack = [start]
+            while stack:
+                node = stack.pop()
+                cache.pop(node, None)
+                for other in edges[node]:
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
@@ -8,25 +8,136 @@ Model elements are the building blocks that make up SysML
 """
 
 import uuid as _uuid
+from hashlib import blake2b as _blake2b
 from abc import ABC as _ABC
 from abc import abstractproperty as _abstractproperty
-from typing import Optional
+from collections import OrderedDict as _OrderedDict
+from collections.abc import Mapping as _Mapping
+from collections import deque as _deque
+from itertools import chain as _chain
+from weakref import ref as _ref
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    from sysml.cycles import CycleGuard
+    from sysml.system import _Fork
+
+_REFERENCE_KINDS = ("references", "lifelines", "definition")
+_UUID = _uuid.UUID
+_UNKNOWN = _uuid.SafeUUID.unknown
+_new = object.__new__
+_setattr = object.__setattr__
 
 
 class ModelElement(_ABC):
     """Abstract base class for all model elements"""
 
+    __slots__ = ()
+    _cycle_guard: Optional["CycleGuard"] = None
+    _hash = None
+    _fork: Optional["_Fork"] = None
+    _owners: tuple = ()
+
     def __init__(self, name: Optional[str] = ""):
+        # subclasses keep these in their own slots or in __dict__
         if type(name) is str:
-            self._name = name
+            self._name = name  # type: ignore[misc]
         else:
             raise TypeError
 
-        self._uuid = _uuid.uuid1()
+        self._uuid = _uuid.uuid1()  # type: ignore[misc]
 
     def __repr__(self):
         return "<{}('{}')>".format(self.__class__.__name__, self.name)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_hash", None)
+        state.pop("_owners", None)
+        state.pop("_fork", None)
+        state.pop("_query_index", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    @classmethod
+    def restore(
+        cls,
+        uuid,
+        fields: Optional[dict] = None,
+        containers: Optional[dict] = None,
+    ) -> "ModelElement":
+        """Returns an element of this class rebuilt from trusted data, such as
+        a file written by this package, without running its constructor or
+        checking its fields
+
+        Parameters
+        ----------
+        uuid : uuid.UUID, string or bytes
+            The 16 bytes of the uuid if bytes
+
+        fields : dict, default None
+            Values of fields by attribute name, as in `__getstate__`. Fields
+            left out take the defaults declared by `_defaults`, which are
+            those the constructor gives them, with empty collections.
+
+        containers : dict, default None
+            Elements to place in each collection of the element, as dicts of
+            key to element by collection kind, such as "parts"
+
+        See also
+        --------
+        validate
+
+        Example
+        -------
+        >>> block = sysml.Block.restore(
+        ...     "0f7c9a8e-6d4b-11ee-b962-0242ac120002",
+        ...     {"_name": "Nacelle", "_multiplicity": 2},
+        ...     {"parts": {"coil": coil}},
+        ... )
+        """
+        element = cls.__new__(cls)
+        defaults = cls.__dict__.get("_restore_defaults")
+        if defaults is None:
+            defaults = _split_defaults(cls._defaults())
+            setattr(cls, "_restore_defaults", defaults)
+        fixed, fresh = defaults
+        state = fixed.copy()
+        if fields is None:
+            for attribute, factory in fresh:
+                state[attribute] = factory()
+        else:
+            for attribute, factory in fresh:
+                if attribute not in fields:
+                    state[attribute] = factory()
+            state.update(fields)
+        state["_uuid"] = uuid if isinstance(uuid, _uuid.UUID) else _trusted_uuid(uuid)
+        element.__setstate__(state)
+        if containers is not None:
+            collections = dict(element._containers())
+            for kind, elements in containers.items():
+                collections[kind].update(elements)
+        return element
+
+    def validate(self) -> None:
+        """Checks the fields of this element and of every element it owns
+        as their constructors would, for elements built by `restore`, and
+        raises a TypeError naming the first element that fails"""
+        for path, element in _chain([((), self)], self.walk()):
+            try:
+                valid = element._valid()
+            except AttributeError:
+                valid = False
+            if not valid:
+                try:
+                    description = repr(element)
+                except AttributeError:
+                    # the repr of some elements shows the fields found missing
+                    description = "<{}>".format(element.__class__.__name__)
+                raise TypeError("{} at '{}'".format(description, "/".join(path)))
+
     @_abstractproperty
     def name(self):
         """Modeler-defined name of model element"""
@@ -47,6 +158,356 @@ class ModelElement(_ABC):
     def uuid(self):
         return self._uuid
 
+    @property
+    def content_hash(self):
+        """Hex digest of the fields of this element and the content hashes of
+        the elements it owns. Digests are cached, and a mutation discards only
+        the digests of the mutated element and of its owners."""
+        if self._hash is None:
+            _digest(self)
+        return self._hash.hex()
+
+    def walk(
+        self,
+        order: str = "dfs",
+        type: Optional[type] = None,
+        max_depth: Optional[int] = None,
+        prune: Optional[Callable[[tuple, "ModelElement"], bool]] = None,
+        unique: bool = True,
+        references: bool = False,
+    ) -> Iterator[Tuple[tuple, "ModelElement"]]:
+        """Yields (path, element) for every element subsumed by this element,
+        where path is the tuple of keys leading to element from this element
+
+        The walk keeps an explicit stack (or queue), so it is not limited by
+        the recursion limit and holds only the current frontier in memory,
+        besides the set of visited elements if unique.
+
+        Parameters
+        ----------
+        order : {"dfs", "bfs"}, default "dfs"
+            Depth-first, in pre-order, or breadth-first
+
+        type : class or tuple of classes, default None
+            Only yield instances of type. Other elements are still walked
+            through.
+
+        max_depth : int, default None
+            Do not walk further than max_depth keys from this element
+
+        prune : callable, default None
+            Called with (path, element) for each element; the elements it
+            subsumes are skipped if it returns True
+
+        unique : bool, default True
+            Yield and walk elements reached by several paths, such as shared
+            blocks, only once. Without it, the walk of a model holding a
+            containment loop only ends at max_depth.
+
+        references : bool, default False
+            Also walk referenced elements, such as `Block.references` and
+            `Interaction.lifelines`
+
+        Notes
+        -----
+        Walking a fork of a model copies into the fork the elements yielded,
+        and the elements owning them, as item access does, so that they can
+        be edited without changing the model it was forked from. Elements
+        walked through but not yielded, or passed to prune, are not copied.
+
+        Example
+        -------
+        >>> for path, block in model.walk(type=sysml.Block, max_depth=3):
+        ...     print("/".join(path))
+        structure/constitution-class starship
+        """
+        if order not in ("dfs", "bfs"):
+            raise ValueError("order must be 'dfs' or 'bfs'")
+        return self._walk(order, type, max_depth, prune, unique, references, True)
+
+    def _walk(
+        self,
+        order="dfs",
+        type=None,
+        max_depth=None,
+        prune=None,
+        unique=True,
+        references=False,
+        claim=False,
+    ):
+        """Generator behind `walk`, which only copies yielded elements into
+        the fork of this element if claim, and otherwise reads elements
+        shared with the model it was forked from as they are"""
+        fork = self._fork if claim else None
+        visited = {id(self)} if unique else None
+        if order == "dfs":
+            stack = [((), (), self._children(references))]
+            while stack:
+                path, kinds, children = stack[-1]
+                for kind, key, child in children:
+                    if visited is not None:
+                        if id(child) in visited:
+                            continue
+                        visited.add(id(child))
+                    child_path = path + (key,)
+                    child_kinds = kinds + (kind,) if fork is not None else kinds
+                    if type is None or isinstance(child, type):
+                        if fork is not None and child._fork is not fork:
+                            child = self._claim(child_path, child_kinds)
+                        yield child_path, child
+                    if (max_depth is None or len(child_path) < max_depth) and not (
+                        prune is not None and prune(child_path, child)
+                    ):
+                        stack.append(
+                            (child_path, child_kinds, child._children(references))
+                        )
+                        break
+                else:
+                    stack.pop()
+        else:
+            queue = _deque([((), (), self)])
+            while queue:
+                path, kinds, element = queue.popleft()
+                for kind, key, child in element._children(references):
+                    if visited is not None:
+                        if id(child) in visited:
+                            continue
+                        visited.add(id(child))
+                    child_path = path + (key,)
+                    child_kinds = kinds + (kind,) if fork is not None else kinds
+                    if type is None or isinstance(child, type):
+                        if fork is not None and child._fork is not fork:
+                            child = self._claim(child_path, child_kinds)
+                        yield child_path, child
+                    if (max_depth is None or len(child_path) < max_depth) and not (
+                        prune is not None and prune(child_path, child)
+                    ):
+                        queue.append((child_path, child_kinds, child))
+
+    def _children(self, references=False):
+        """Yields (kind, key, element) for each element this element owns,
+        and for each it references if references, without copying any into
+        a fork"""
+        for kind, elements in self._containers():
+            if kind in _REFERENCE_KINDS and not references:
+                continue
+            if self._fork is None:
+                for key, element in elements.items():
+                    yield kind, key, element
+            else:
+                # copies claimed while iterating replace values in elements
+                for key, element in list(elements.items()):
+                    yield kind, key, element
+
+    def _claim(self, path, kinds):
+        """Returns the element reached from this element by path, through
+        collections of the given kinds, copying it and the elements owning
+        it into the fork of this element"""
+        element = self
+        for kind, key in zip(kinds, path):
+            elements = dict(element._containers())[kind]
+            if kind in _REFERENCE_KINDS:
+                element = elements[key]
+            else:
+                element = element._get_owned(elements, key)
+        return element
+
+    def _containers(self):
+        """Returns (kind, dict) pairs for each collection of model elements
+        subsumed by this element"""
+        return ()
+
+    def _get_owned(self, elements, key):
+        """Returns the element owned under key, copying it first if this
+        element belongs to a fork of a model and the element does not"""
+        element = elements[key]
+        if self._fork is not None and element._fork is not self._fork:
+            element = self._fork.claim(self, elements, key)
+        return element
+
+    def _content(self):
+        """Returns the fields of this element that its content hash covers,
+        apart from the elements it subsumes"""
+        return (self.name,)
+
+    @classmethod
+    def _defaults(cls):
+        """Returns the fields that `restore` gives an element of this class
+        when they are left out. `restore` calls this once per class, sharing
+        immutable values between elements and creating collections afresh
+        for each element."""
+        return {"_name": ""}
+
+    def _valid(self):
+        """Returns whether the fields of this element have the types its
+        constructor requires"""
+        return (
+            type(self._name) is str
+            and isinstance(self._uuid, _uuid.UUID)
+            and all(
+                isinstance(element, ModelElement)
+                for kind, elements in self._containers()
+                for element in elements.values()
+            )
+        )
+
+    def _touch(self):
+        """Discards the content hash of this element and of its owners"""
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            if element._hash is not None:
+                element._hash = None
+                stack.extend(_live(element._owners))
+
+    def _release(self, child):
+        """Stops child, once detached from this element, from discarding the
+        content hash of this element when it changes"""
+        if child is not None and any(owner is self for owner in _live(child._owners)):
+            child._owners = [
+                owner for owner in child._owners if _deref(owner) is not self
+            ]
+
+
+def _split_defaults(defaults) -> tuple:
+    """Splits the defaults of a class into a dict of immutable values, which
+    elements can share, and (attribute, class) pairs for the collections
+    each element is given afresh"""
+    fixed: dict = {}
+    fresh: list = []
+    for attribute, value in defaults.items():
+        if value is None or isinstance(value, (str, int, float, tuple, bytes)):
+            fixed[attribute] = value
+        else:
+            fresh.append((attribute, value.__class__))
+    return fixed, tuple(fresh)
+
+
+def _trusted_uuid(value) -> _uuid.UUID:
+    """Returns a uuid.UUID from its 16 bytes or its hex string, skipping the
+    checks of the uuid.UUID constructor for the canonical forms written by
+    this package"""
+    if isinstance(value, bytes):
+        number = int.from_bytes(value, "big")
+    else:
+        digits = value.replace("-", "")
+        if len(digits) != 32:
+            return _UUID(value)
+        number = int(digits, 16)
+    uuid = _new(_UUID)
+    _setattr(uuid, "int", number)
+    _setattr(uuid, "is_safe", _UNKNOWN)
+    return uuid
+
+
+def _digest(root):
+    """Computes the content hash of root and of every element beneath it
+    whose hash is not cached, children first"""
+    active = set()
+    stack = [(root, False)]
+    while stack:
+        element, expanded = stack.pop()
+        if element._hash is not None:
+            continue
+        if not expanded:
+            active.add(id(element))
+            stack.append((element, True))
+            for kind, elements in element._containers():
+                if kind in _REFERENCE_KINDS:
+                    continue
+                for child in elements.values():
+                    if child._hash is None and id(child) not in active:
+                        stack.append((child, False))
+            continue
+
+        active.discard(id(element))
+        digest = _blake2b(digest_size=16)
+        digest.update(element.__class__.__name__.encode())
+        digest.update(repr(element._content()).encode())
+        for kind, elements in element._containers():
+            digest.update(kind.encode())
+            for key, child in elements.items():
+                digest.update(repr(key).encode())
+                if kind in _REFERENCE_KINDS or child._hash is None:
+                    # references, and loops through containment, are hashed
+                    # by identity rather than by content
+                    digest.update(child.uuid.bytes)
+                    continue
+                digest.update(child._hash)
+                _own(child, element)
+        element._hash = digest.digest()
+
+
+def _own(child, owner):
+    """Records owner among the owners of child. An owner in another fork
+    than child, such as a variant sharing an element of its base model, is
+    held weakly so that discarded variants and snapshots can be freed."""
+    owners = child._owners
+    for entry in owners:
+        if entry is owner or (isinstance(entry, _ref) and entry() is owner):
+            return
+    entry = owner if owner._fork is child._fork else _ref(owner)
+    if not owners:
+        child._owners = [entry]
+    else:
+        child._owners = [owner for owner in owners if _deref(owner) is not None]
+        child._owners.append(entry)
+
+
+def _weaken(child, owner):
+    """Holds owner weakly among the owners of child, once child is shared
+    with a fork that may outlive owner"""
+    owners = child._owners
+    for index, entry in enumerate(owners):
+        if entry is owner:
+            owners[index] = _ref(owner)
+            return
+
+
+def _deref(owner):
+    return owner() if isinstance(owner, _ref) else owner
+
+
+def _live(owners):
+    """Yields the owners of an element that are still alive"""
+    for owner in owners:
+        if isinstance(owner, _ref):
+            owner = owner()
+            if owner is None:
+                continue
+        yield owner
+
+
+class _OwnedView(_Mapping):
+    """Read-only view of a collection of model elements owned by owner
+
+    Elements of a fork are copied into it as they are reached through the
+    view, not when the view is created, so that listing names or counting
+    elements copies nothing. Collections are edited through the methods of
+    their owner.
+    """
+
+    __slots__ = ("_owner", "_elements")
+
+    def __init__(self, owner, elements):
+        self._owner = owner
+        self._elements = elements
+
+    def __getitem__(self, key):
+        return self._owner._get_owned(self._elements, key)
+
+    def __iter__(self):
+        return iter(self._elements)
+
+    def __len__(self):
+        return len(self._elements)
+
+    def __contains__(self, key):
+        return key in self._elements
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, dict(self.items()))
+
 
 class Dependency(ModelElement):
     """A dependency relationship can be applied between models elements to
@@ -83,3 +544,13 @@ class Dependency(ModelElement):
     @property
     def client(self):
         return self._client
+
+    def _content(self):
+        return (self.name, str(self._client.uuid), str(self._supplier.uuid))
+
+    def _valid(self):
+        return (
+            super()._valid()
+            and isinstance(self._client, ModelElement)
+            and isinstance(self._supplier, ModelElement)
+        )
@@ -3,15 +3,357 @@ Behavior of a system, in collaboration with its actors, can be described
 by use cases, activities, interactions, and/or state machines.
 """
 
-from sysml.elements.base import ModelElement
+from sysml.elements.base import ModelElement, _OwnedView
 from sysml.elements.structure import Block
+from array import array as _array
+from bisect import bisect_left as _bisect_left
+from collections import Counter as _Counter
 from collections import OrderedDict as _OrderedDict
-from collections import Iterable
-from typing import Dict, List, Optional, Union
+from collections.abc import Iterable
+from hashlib import blake2b as _blake2b
+from types import ModuleType as _ModuleType
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+_numpy: Optional[_ModuleType]
+try:
+    import numpy as _numpy
+except ImportError:
+    _numpy = None
+
+
+class State(ModelElement):
+    """This class defines a state of a state machine"""
+
+    def __init__(self, name: Optional[str] = ""):
+        super().__init__(name)
+
+    @property
+    def name(self):
+        return self._name
+
+
+class Transition(ModelElement):
+    """This class defines a transition between two states, triggered by an
+    event
+
+    Parameters
+    ----------
+    source : State
+
+    target : State
+
+    event : string
+
+    guard : callable, default None
+        Called with the number of the machine instance receiving the event;
+        the transition is only taken if it returns True
+
+    action : callable, default None
+        Called with the number of the machine instance when the transition
+        is taken
+
+    """
+
+    def __init__(
+        self,
+        source: "State",
+        target: "State",
+        event: str,
+        guard: Optional[Callable[[int], bool]] = None,
+        action: Optional[Callable[[int], None]] = None,
+    ):
+        if not isinstance(source, State) or not isinstance(target, State):
+            raise TypeError
+        if type(event) is not str:
+            raise TypeError
+        if not (guard is None or callable(guard)):
+            raise TypeError
+        if not (action is None or callable(action)):
+            raise TypeError
+        super().__init__(event)
+        self._source = source
+        self._target = target
+        self._guard = guard
+        self._action = action
+
+    def __repr__(self):
+        return "<{}('{}' -> '{}' on '{}')>".format(
+            self.__class__.__name__, self._source.name, self._target.name, self.name
+        )
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def event(self):
+        return self._name
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def target(self):
+        return self._target
+
+    @property
+    def guard(self):
+        return self._guard
+
+    @property
+    def action(self):
+        return self._action
+
+    def _content(self):
+        return (
+            self.name,
+            self._source.uuid,
+            self._target.uuid,
+            _qualname(self._guard),
+            _qualname(self._action),
+        )
+
+    @classmethod
+    def _defaults(cls):
+        return dict(super()._defaults(), _guard=None, _action=None)
+
+    def _valid(self):
+        return (
+            super()._valid()
+            and isinstance(self._source, State)
+            and isinstance(self._target, State)
+            and (self._guard is None or callable(self._guard))
+            and (self._action is None or callable(self._action))
+        )
 
 
 class StateMachine(ModelElement):
-    """This class defines a state"""
+    """This class defines a state machine
+
+    Parameters
+    ----------
+    name : string, default None
+
+    states : list of State, default None
+
+    transitions : list of Transition, default None
+
+    initial : State, default None
+        Initial state, the first state if None
+
+    Notes
+    -----
+    states and transitions are read-only views, edited with add_state and
+    add_transition.
+
+    Example
+    -------
+    >>> idle, docked = sysml.State("idle"), sysml.State("docked")
+    >>> machine = sysml.StateMachine(
+    ...     "Shuttle",
+    ...     [idle, docked],
+    ...     [sysml.Transition(idle, docked, "dock")],
+    ... )
+    >>> simulation = sysml.Simulation(machine, instances=1000000)
+    >>> simulation.send("dock")
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = "",
+        states: Optional[List["State"]] = None,
+        transitions: Optional[List["Transition"]] = None,
+        initial: Optional["State"] = None,
+    ):
+        super().__init__(name)
+
+        self._states: "_OrderedDict" = _OrderedDict()
+        self._transitions: "_OrderedDict" = _OrderedDict()
+        self._initial = None
+        if states is None:
+            pass
+        elif isinstance(states, list):
+            for state in states:
+                self.add_state(state)
+        else:
+            raise TypeError
+        if transitions is None:
+            pass
+        elif isinstance(transitions, list):
+            for transition in transitions:
+                self.add_transition(transition)
+        else:
+            raise TypeError
+        if initial is not None:
+            self.initial = initial
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def states(self):
+        return _OwnedView(self, self._states)
+
+    @property
+    def transitions(self):
+        return _OwnedView(self, self._transitions)
+
+    @property
+    def initial(self):
+        if self._initial is None and self._states:
+            return next(iter(self._states.values()))
+        return self._initial
+
+    @initial.setter
+    def initial(self, state):
+        if not isinstance(state, State):
+            raise TypeError
+        if self._states.get(state.name) is not state:
+            raise KeyError(state.name)
+        self._initial = state
+        self._touch()
+
+    def __getitem__(self, stateName):
+        "Returns state specified by its name"
+        return self._get_owned(self._states, stateName)
+
+    def _containers(self):
+        return (("states", self._states), ("transitions", self._transitions))
+
+    def _content(self):
+        initial = self.initial
+        return (self.name, None if initial is None else initial.name)
+
+    @classmethod
+    def _defaults(cls):
+        return dict(
+            super()._defaults(),
+            _states=_OrderedDict(),
+            _transitions=_OrderedDict(),
+            _initial=None,
+        )
+
+    def _valid(self):
+        return (
+            super()._valid()
+            and all(isinstance(state, State) for state in self._states.values())
+            and all(
+                isinstance(transition, Transition)
+                for transition in self._transitions.values()
+            )
+            and (self._initial is None or isinstance(self._initial, State))
+        )
+
+    def add_state(self, state):
+        """Adds a state to state machine"""
+        if not isinstance(state, State):
+            raise TypeError
+        self._states[state.name] = state
+        self._touch()
+
+    def add_transition(self, transition):
+        """Adds a transition between two states of state machine"""
+        if not isinstance(transition, Transition):
+            raise TypeError
+        for state in (transition.source, transition.target):
+            if self._states.get(state.name) is not state:
+                raise KeyError(state.name)
+        self._transitions["transition{}".format(len(self._transitions) + 1)] = (
+            transition
+        )
+        self._touch()
+
+    def compile(self) -> "TransitionTable":
+        """Returns the transition table of state machine"""
+        return TransitionTable(self)
+
+
+class TransitionTable:
+    """This class defines the compiled transition table of a state machine
+
+    States and events are numbered in the order they are added, and `table`
+    holds, for each state and event code, the code of the next state at
+    index ``state * len(events) + event``. An entry of -1 means the event is
+    ignored in that state. Transitions with a guard or an action cannot be
+    resolved from the table alone; their entries are ``-2 - cell`` and are
+    resolved by `fire`.
+
+    Parameters
+    ----------
+    machine : StateMachine
+
+    """
+
+    def __init__(self, machine: "StateMachine") -> None:
+        if not isinstance(machine, StateMachine):
+            raise TypeError
+        if not machine._states:
+            raise ValueError("{!r} has no states".format(machine))
+        self.states: Tuple[str, ...] = tuple(machine._states)
+        events: dict = {}
+        transitions = list(machine._transitions.values())
+        for transition in transitions:
+            events.setdefault(transition.event, len(events))
+        self.events: Tuple[str, ...] = tuple(events)
+        self._event_codes = events
+
+        width = len(self.events)
+        self.table = _array("l", [-1]) * (len(self.states) * width)
+        self.cells: List[List[tuple]] = []
+        candidates: dict = {}
+        codes = {state: code for code, state in enumerate(self.states)}
+        self._state_codes = codes
+        self.initial = codes[machine.initial.name]
+        for transition in transitions:
+            index = codes[transition.source.name] * width + events[transition.event]
+            candidates.setdefault(index, []).append(
+                (transition.guard, transition.action, codes[transition.target.name])
+            )
+        for index, cell in candidates.items():
+            guard, action, target = cell[0]
+            if len(cell) == 1 and guard is None and action is None:
+                self.table[index] = target
+            else:
+                self.table[index] = -2 - len(self.cells)
+                self.cells.append(cell)
+
+    def state_code(self, state) -> int:
+        """Returns the code of a state, given as a State or a name"""
+        if isinstance(state, State):
+            state = state.name
+        return self._state_codes[state]
+
+    def event_code(self, event: str) -> int:
+        """Returns the code of an event"""
+        return self._event_codes[event]
+
+    def fire(self, state: int, event: int, instance: int = 0) -> int:
+        """Returns the code of the state that a machine instance in state
+        reaches on event, running guards and actions as needed"""
+        target = self.table[state * len(self.events) + event]
+        if target > -2:
+            return state if target == -1 else target
+        for guard, action, target in self.cells[-2 - target]:
+            if guard is None or guard(instance):
+                if action is not None:
+                    action(instance)
+                return target
+        return state
+
+
+def _qualname(function) -> Optional[str]:
+    if function is None:
+        return None
+    return "{}.{}".format(
+        getattr(function, "__module__", None),
+        getattr(function, "__qualname__", repr(function)),
+    )
+
+
+class ActivityNode(ModelElement):
+    """Abstract base class for the nodes of an activity"""
 
     def __init__(self, name: Optional[str] = ""):
         super().__init__(name)
@@ -21,35 +363,691 @@ class StateMachine(ModelElement):
         return self._name
 
 
+class Action(ActivityNode):
+    """This class defines an action, which starts once a token has arrived on
+    each of its incoming flows and offers a token on each of its outgoing
+    flows when it completes
+
+    Parameters
+    ----------
+    name : string, default None
+
+    duration : float or callable, default 0.0
+        Time the action takes, or a function of the run number returning it
+
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = "",
+        duration: Union[float, Callable[[int], float]] = 0.0,
+    ):
+        super().__init__(name)
+        if not (callable(duration) or isinstance(duration, (int, float))):
+            raise TypeError
+        self._duration = duration
+
+    @property
+    def duration(self):
+        return self._duration
+
+    @duration.setter
+    def duration(self, duration):
+        if not (callable(duration) or isinstance(duration, (int, float))):
+            raise TypeError
+        self._duration = duration
+        self._touch()
+
+    def _content(self):
+        duration = self._duration
+        return (self.name, _qualname(duration) if callable(duration) else duration)
+
+    @classmethod
+    def _defaults(cls):
+        return dict(super()._defaults(), _duration=0.0)
+
+    def _valid(self):
+        return super()._valid() and (
+            callable(self._duration) or isinstance(self._duration, (int, float))
+        )
+
+
+class InitialNode(ActivityNode):
+    """This class defines the node where control starts when an activity is
+    run"""
+
+
+class ActivityFinalNode(ActivityNode):
+    """This class defines a node that stops a run of an activity as soon as
+    a token reaches it"""
+
+
+class ForkNode(ActivityNode):
+    """This class defines a node that offers each token it receives on every
+    outgoing flow"""
+
+
+class JoinNode(ActivityNode):
+    """This class defines a node that waits for a token on each incoming flow,
+    then offers a single token on its outgoing flows"""
+
+
+class DecisionNode(ActivityNode):
+    """This class defines a node that offers each token it receives on the
+    first outgoing flow whose guard passes, or else on a flow without a
+    guard"""
+
+
+class MergeNode(ActivityNode):
+    """This class defines a node that offers each token it receives on its
+    outgoing flows, without waiting for other incoming flows"""
+
+
+class ActivityEdge(ModelElement):
+    """Abstract base class for the flows between the nodes of an activity
+
+    Parameters
+    ----------
+    source : ActivityNode
+
+    target : ActivityNode
+
+    guard : callable, default None
+        Called with the run number; tokens only pass if it returns True
+
+    """
+
+    def __init__(
+        self,
+        source: "ActivityNode",
+        target: "ActivityNode",
+        guard: Optional[Callable[[int], bool]] = None,
+    ):
+        if not isinstance(source, ActivityNode):
+            raise TypeError
+        if not isinstance(target, ActivityNode):
+            raise TypeError
+        if not (guard is None or callable(guard)):
+            raise TypeError
+        super().__init__()
+        self._source = source
+        self._target = target
+        self._guard = guard
+
+    def __repr__(self):
+        return "<{}('{}' -> '{}')>".format(
+            self.__class__.__name__, self._source.name, self._target.name
+        )
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def target(self):
+        return self._target
+
+    @property
+    def guard(self):
+        return self._guard
+
+    def _content(self):
+        return (
+            self.name,
+            self._source.uuid,
+            self._target.uuid,
+            _qualname(self._guard),
+        )
+
+    @classmethod
+    def _defaults(cls):
+        return dict(super()._defaults(), _guard=None)
+
+    def _valid(self):
+        return (
+            super()._valid()
+            and isinstance(self._source, ActivityNode)
+            and isinstance(self._target, ActivityNode)
+            and (self._guard is None or callable(self._guard))
+        )
+
+
+class ControlFlow(ActivityEdge):
+    """This class defines a flow of control tokens"""
+
+
+class ObjectFlow(ActivityEdge):
+    """This class defines a flow of object tokens. Tokens carry no values
+    when an activity is run."""
+
+
 class Activity(ModelElement):
-    """This class defines a activity"""
+    """This class defines a activity
 
-    def __init__(self, name: Optional[str] = ""):
+    Parameters
+    ----------
+    name : string, default None
+
+    nodes : list of ActivityNode, default None
+
+    edges : list of ActivityEdge, default None
+
+    Notes
+    -----
+    nodes and edges are read-only views, edited with add_node and add_edge.
+
+    Example
+    -------
+    >>> launch = sysml.Action("launch", duration=2.0)
+    >>> start, end = sysml.InitialNode("start"), sysml.ActivityFinalNode("end")
+    >>> mission = sysml.Activity(
+    ...     "Mission",
+    ...     [start, launch, end],
+    ...     [sysml.ControlFlow(start, launch), sysml.ControlFlow(launch, end)],
+    ... )
+    >>> sysml.ActivityEngine(mission).run()[0].finish
+    2.0
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = "",
+        nodes: Optional[List["ActivityNode"]] = None,
+        edges: Optional[List["ActivityEdge"]] = None,
+    ):
         super().__init__(name)
 
+        self._nodes: "_OrderedDict" = _OrderedDict()
+        self._edges: "_OrderedDict" = _OrderedDict()
+        if nodes is None:
+            pass
+        elif isinstance(nodes, list):
+            for node in nodes:
+                self.add_node(node)
+        else:
+            raise TypeError
+        if edges is None:
+            pass
+        elif isinstance(edges, list):
+            for edge in edges:
+                self.add_edge(edge)
+        else:
+            raise TypeError
+
     @property
     def name(self):
         return self._name
 
+    @property
+    def nodes(self):
+        return _OwnedView(self, self._nodes)
+
+    @property
+    def edges(self):
+        return _OwnedView(self, self._edges)
+
+    def __getitem__(self, nodeName):
+        "Returns activity node specified by its name"
+        return self._get_owned(self._nodes, nodeName)
+
+    def _containers(self):
+        return (("nodes", self._nodes), ("edges", self._edges))
+
+    @classmethod
+    def _defaults(cls):
+        return dict(super()._defaults(), _nodes=_OrderedDict(), _edges=_OrderedDict())
+
+    def _valid(self):
+        return (
+            super()._valid()
+            and all(isinstance(node, ActivityNode) for node in self._nodes.values())
+            and all(isinstance(edge, ActivityEdge) for edge in self._edges.values())
+        )
+
+    def add_node(self, node):
+        """Adds a node to activity"""
+        if not isinstance(node, ActivityNode):
+            raise TypeError
+        self._nodes[node.name] = node
+        self._touch()
+
+    def add_edge(self, edge):
+        """Adds a flow between two nodes of activity"""
+        if not isinstance(edge, ActivityEdge):
+            raise TypeError
+        for node in (edge.source, edge.target):
+            if self._nodes.get(node.name) is not node:
+                raise KeyError(node.name)
+        i = 1
+        while True:
+            edgeName = "".join(
+                [
+                    edge.__class__.__name__[0].lower(),
+                    edge.__class__.__name__[1:],
+                    str(i),
+                ]
+            )
+            if edgeName not in self._edges:
+                break
+            i += 1
+        self._edges[edgeName] = edge
+        self._touch()
+
+    def compile(self) -> "ActivityGraph":
+        """Returns the flow graph of activity"""
+        return ActivityGraph(self)
+
+
+class ActivityGraph:
+    """This class defines the compiled flow graph of an activity
+
+    Nodes and flows are numbered in the order they are added. `kinds` holds
+    a code from `ActivityGraph.KINDS` for each node, and the flows leaving
+    and entering node ``n`` are ``outgoing[out_offsets[n]:out_offsets[n + 1]]``
+    and ``incoming[in_offsets[n]:in_offsets[n + 1]]``, with `sources` and
+    `targets` giving the nodes at either end of each flow.
+
+    Parameters
+    ----------
+    activity : Activity
+
+    """
+
+    KINDS = (
+        Action,
+        InitialNode,
+        ActivityFinalNode,
+        ForkNode,
+        JoinNode,
+        DecisionNode,
+        MergeNode,
+    )
+
+    def __init__(self, activity: "Activity") -> None:
+        if not isinstance(activity, Activity):
+            raise TypeError
+        nodes = list(activity._nodes.values())
+        edges = list(activity._edges.values())
+        codes = {id(node): code for code, node in enumerate(nodes)}
+        self.nodes: Tuple[str, ...] = tuple(node.name for node in nodes)
+        self.kinds = _array("B")
+        for node in nodes:
+            for code, kind in enumerate(self.KINDS):
+                if isinstance(node, kind):
+                    self.kinds.append(code)
+                    break
+            else:
+                raise TypeError
+        self.durations: list = [
+            node.duration if isinstance(node, Action) else 0.0 for node in nodes
+        ]
+        self.guards: list = [edge.guard for edge in edges]
+        self.sources = _array("l", (codes[id(edge.source)] for edge in edges))
+        self.targets = _array("l", (codes[id(edge.target)] for edge in edges))
+        self.out_offsets, self.outgoing = _adjacency(len(nodes), self.sources)
+        self.in_offsets, self.incoming = _adjacency(len(nodes), self.targets)
+
+
+def _adjacency(size, ends) -> Tuple["_array", "_array"]:
+    """Returns the offsets and flow numbers, grouped by node, of flows with
+    the given end nodes"""
+    offsets = _array("l", [0]) * (size + 1)
+    for node in ends:
+        offsets[node + 1] += 1
+    for node in range(size):
+        offsets[node + 1] += offsets[node]
+    edges = _array("l", [0]) * len(ends)
+    position = offsets[:-1]
+    for edge, node in enumerate(ends):
+        edges[position[node]] = edge
+        position[node] += 1
+    return offsets, edges
+
+
+class MessageLog:
+    """This class defines the log of messages exchanged between the lifelines
+    of an interaction
+
+    Messages are not stored as objects but as entries of four parallel
+    arrays: sender and receiver lifeline numbers, timestamps and message kind
+    codes. Lifelines are numbered in the order they join the interaction, and
+    kind codes index `MessageLog.KINDS`. Queries run over the arrays, with
+    numpy when it is installed, and return arrays of message numbers.
+
+    Messages are added through `Interaction.add_message` and
+    `Interaction.extend_messages`.
+
+    Parameters
+    ----------
+    lifelines : list of string, default None
+        Names of the lifelines that may send or receive messages
+    """
+
+    KINDS = (
+        "synchCall",
+        "asynchCall",
+        "asynchSignal",
+        "createMessage",
+        "deleteMessage",
+        "reply",
+    )
+
+    _owner: Optional["Interaction"] = None
+    _hash = None
+
+    def __init__(self, lifelines: Optional[List[str]] = None) -> None:
+        self._lifelines: List[str] = []
+        self._numbers: dict = {}
+        self._senders = _array("l")
+        self._receivers = _array("l")
+        self._timestamps = _array("d")
+        self._kinds = _array("B")
+        self._sorted = True
+        for lifeline in lifelines or ():
+            self._register(lifeline)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_owner", None)
+        state.pop("_hash", None)
+        return state
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def __getitem__(self, message) -> Tuple[str, str, float, str]:
+        """Returns the sender name, receiver name, timestamp and kind of a
+        message"""
+        return (
+            self._lifelines[self._senders[message]],
+            self._lifelines[self._receivers[message]],
+            self._timestamps[message],
+            self.KINDS[self._kinds[message]],
+        )
+
+    @property
+    def lifelines(self) -> Tuple[str, ...]:
+        """Lifeline names, indexed by lifeline number"""
+        return tuple(self._lifelines)
+
+    @property
+    def senders(self) -> memoryview:
+        return memoryview(self._senders).toreadonly()
+
+    @property
+    def receivers(self) -> memoryview:
+        return memoryview(self._receivers).toreadonly()
+
+    @property
+    def timestamps(self) -> memoryview:
+        return memoryview(self._timestamps).toreadonly()
+
+    @property
+    def kinds(self) -> memoryview:
+        return memoryview(self._kinds).toreadonly()
+
+    def number(self, lifeline) -> int:
+        """Returns the number of a lifeline, given as a Block or a name"""
+        if isinstance(lifeline, Block):
+            lifeline = lifeline.name
+        return self._numbers[lifeline]
+
+    def between(
+        self,
+        a,
+        b,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        directed: bool = False,
+    ) -> "_array":
+        """Returns the numbers of the messages exchanged between lifelines a
+        and b, in either direction unless directed, with timestamps from start
+        up to but excluding end
+
+        Parameters
+        ----------
+        a : Block or string
+
+        b : Block or string
+
+        start : float, default None
+
+        end : float, default None
+
+        directed : bool, default False
+            Only return messages sent by a to b
+
+        """
+        a = self.number(a)
+        b = self.number(b)
+        low, high = 0, len(self)
+        windowed = start is not None or end is not None
+        if windowed and self._sorted:
+            if start is not None:
+                low = _bisect_left(self._timestamps, start)
+            if end is not None:
+                high = max(low, _bisect_left(self._timestamps, end))
+            windowed = False
+        if start is None:
+            start = float("-inf")
+        if end is None:
+            end = float("inf")
+
+        if _numpy is not None:
+            senders = _numpy.frombuffer(self._senders, "l")[low:high]
+            receivers = _numpy.frombuffer(self._receivers, "l")[low:high]
+            mask = (senders == a) & (receivers == b)
+            if not directed:
+                mask |= (senders == b) & (receivers == a)
+            if windowed:
+                timestamps = _numpy.frombuffer(self._timestamps, "d")[low:high]
+                mask &= (timestamps >= start) & (timestamps < end)
+            messages = _array("l")
+            messages.frombytes((_numpy.flatnonzero(mask) + low).astype("l").tobytes())
+            return messages
+
+        pairs = {(a, b)} if directed else {(a, b), (b, a)}
+        timestamps = self._timestamps
+        return _array(
+            "l",
+            (
+                message
+                for message, sender, receiver in zip(
+                    range(low, high),
+                    self._senders[low:high],
+                    self._receivers[low:high],
+                )
+                if (sender, receiver) in pairs
+                and (not windowed or start <= timestamps[message] < end)
+            ),
+        )
+
+    def counts(self, sent: bool = True, received: bool = True) -> Dict[str, int]:
+        """Returns the number of messages each lifeline sent and/or received.
+        A message a lifeline sends to itself is counted once."""
+        if _numpy is not None:
+            size = len(self._lifelines)
+            senders = _numpy.frombuffer(self._senders, "l")
+            receivers = _numpy.frombuffer(self._receivers, "l")
+            counts = _numpy.zeros(size, "l")
+            if sent:
+                counts += _numpy.bincount(senders, minlength=size)
+            if received:
+                counts += _numpy.bincount(receivers, minlength=size)
+            if sent and received:
+                counts -= _numpy.bincount(senders[senders == receivers], minlength=size)
+            totals = counts.tolist()
+        else:
+            counter: "_Counter" = _Counter()
+            if sent:
+                counter.update(self._senders)
+            if received:
+                counter.update(self._receivers)
+            if sent and received:
+                counter.subtract(
+                    sender
+                    for sender, receiver in zip(self._senders, self._receivers)
+                    if sender == receiver
+                )
+            totals = [counter[number] for number in range(len(self._lifelines))]
+        return dict(zip(self._lifelines, totals))
+
+    def digest(self) -> bytes:
+        """Returns a digest of the lifeline names and messages"""
+        if self._hash is None:
+            digest = _blake2b(digest_size=16)
+            digest.update(repr(self._lifelines).encode())
+            for values in (
+                self._senders,
+                self._receivers,
+                self._timestamps,
+                self._kinds,
+            ):
+                digest.update(memoryview(values).cast("B"))
+            self._hash = digest.digest()
+        return self._hash
+
+    def copy(self) -> "MessageLog":
+        """Returns a copy of this log that can be extended independently"""
+        log = MessageLog.__new__(MessageLog)
+        log.__dict__.update(self.__getstate__())
+        log._lifelines = list(self._lifelines)
+        log._numbers = dict(self._numbers)
+        for attribute in ("_senders", "_receivers", "_timestamps", "_kinds"):
+            setattr(log, attribute, getattr(self, attribute)[:])
+        return log
+
+    def _register(self, lifeline) -> None:
+        if lifeline not in self._numbers:
+            self._numbers[lifeline] = len(self._lifelines)
+            self._lifelines.append(lifeline)
+            self._hash = None
+
+    def _extend(self, senders, receivers, timestamps, kinds=None) -> None:
+        senders = self._lifeline_numbers(senders)
+        receivers = self._lifeline_numbers(receivers)
+        timestamps = _typed("d", timestamps)
+        size = len(timestamps)
+        if kinds is None:
+            kinds = _array("B", bytes(size))
+        else:
+            codes = {kind: code for code, kind in enumerate(self.KINDS)}
+            kinds = _array(
+                "B", (kind if type(kind) is int else codes[kind] for kind in kinds)
+            )
+            if any(kind >= len(self.KINDS) for kind in set(kinds)):
+                raise ValueError("unknown message kind code")
+        if not len(senders) == len(receivers) == size == len(kinds):
+            raise ValueError("message arrays differ in length")
+
+        if self._sorted and size:
+            previous = self._timestamps[-1] if self._timestamps else timestamps[0]
+            if _numpy is not None:
+                values = _numpy.frombuffer(timestamps, "d")
+                self._sorted = previous <= values[0] and bool(
+                    (values[1:] >= values[:-1]).all()
+                )
+            else:
+                self._sorted = previous <= timestamps[0] and all(
+                    earlier <= later
+                    for earlier, later in zip(timestamps, timestamps[1:])
+                )
+        self._senders.extend(senders)
+        self._receivers.extend(receivers)
+        self._timestamps.extend(timestamps)
+        self._kinds.extend(kinds)
+        self._hash = None
+
+    def _lifeline_numbers(self, lifelines) -> "_array":
+        """Returns lifelines, given as lifeline numbers, names or Blocks, as
+        an array of lifeline numbers"""
+        if isinstance(lifelines, _array) or (
+            _numpy is not None and isinstance(lifelines, _numpy.ndarray)
+        ):
+            numbers = _typed("l", lifelines)
+        else:
+            cache: dict = {}
+            numbers = _array("l")
+            append = numbers.append
+            for lifeline in lifelines:
+                number = cache.get(lifeline)
+                if number is None:
+                    if type(lifeline) is int:
+                        number = lifeline
+                    else:
+                        number = self.number(lifeline)
+                    cache[lifeline] = number
+                append(number)
+        if numbers and not 0 <= min(numbers) <= max(numbers) < len(self._lifelines):
+            raise ValueError("unknown lifeline number")
+        return numbers
+
+
+def _typed(typecode, values) -> "_array":
+    """Returns values as an array of typecode, converting numpy arrays
+    without iterating over them in Python"""
+    if _numpy is not None and isinstance(values, _numpy.ndarray):
+        converted = _array(typecode)
+        converted.frombytes(_numpy.ascontiguousarray(values, typecode).tobytes())
+        return converted
+    if isinstance(values, _array) and values.typecode == typecode:
+        return values
+    return _array(typecode, values)
+
 
 class Interaction(ModelElement):
-    """This class defines an interaction"""
+    """This class defines an interaction
+
+    Parameters
+    ----------
+    name : string, default None
+
+    lifelines : list of Block, default None
+
+    messages : MessageLog or list of tuple, default None
+        Messages between the lifelines, each given as a tuple of sender,
+        receiver, timestamp and, optionally, kind
+
+    """
 
     def __init__(
         self,
         name: Optional[str] = "",
         lifelines: Optional[List["Block"]] = None,
-        messages: Optional["ModelElement"] = None,
+        messages: Optional[Union["MessageLog", List[tuple]]] = None,
     ):
         super().__init__(name)
 
         self._lifelines: "_OrderedDict" = _OrderedDict()
+        self._messages = MessageLog()
+        self._messages._owner = self
         if lifelines is None:
             pass
-        if isinstance(lifelines, Iterable):
+        elif isinstance(lifelines, Iterable):
             for lifeline in lifelines:
                 if isinstance(lifeline, Block):
                     self._lifelines[lifeline.name] = lifeline
+                    self._messages._register(lifeline.name)
+        else:
+            raise TypeError
+
+        if messages is None:
+            pass
+        elif isinstance(messages, MessageLog):
+            for name in messages.lifelines:
+                if name not in self._lifelines:
+                    raise KeyError(name)
+            self._messages = messages.copy()
+            self._messages._owner = self
+            for lifeline in self._lifelines:
+                self._messages._register(lifeline)
+        elif isinstance(messages, Iterable):
+            for message in messages:
+                self.add_message(*message)
         else:
             raise TypeError
 
@@ -57,9 +1055,90 @@ class Interaction(ModelElement):
     def name(self):
         return self._name
 
+    @property
+    def messages(self) -> "MessageLog":
+        return self._messages
+
+    def _containers(self):
+        return (("lifelines", self._lifelines),)
+
+    def _content(self):
+        return (self.name, self._messages.digest())
+
+    @classmethod
+    def _defaults(cls):
+        return dict(
+            super()._defaults(), _lifelines=_OrderedDict(), _messages=MessageLog()
+        )
+
+    def _valid(self):
+        return (
+            super()._valid()
+            and all(
+                isinstance(lifeline, Block) for lifeline in self._lifelines.values()
+            )
+            and isinstance(self._messages, MessageLog)
+        )
+
     def add_lifeline(self, lifeline):
         if isinstance(lifeline, Block):
             self._lifelines[lifeline.name] = lifeline
+            self._writable_messages()._register(lifeline.name)
+            self._touch()
 
     def remove_lifeline(self, lifeline):
+        """Removes a lifeline. Messages it sent or received are kept."""
         self._lifelines.pop(lifeline.name)
+        self._touch()
+
+    def add_message(self, sender, receiver, timestamp: float, kind="synchCall"):
+        """Appends a message to the message log
+
+        Parameters
+        ----------
+        sender : Block, string or int
+            Lifeline, lifeline name or lifeline number
+
+        receiver : Block, string or int
+
+        timestamp : float
+
+        kind : string or int, default "synchCall"
+            One of `MessageLog.KINDS`, or its index
+
+        """
+        self.extend_messages((sender,), (receiver,), (timestamp,), (kind,))
+
+    def extend_messages(
+        self,
+        senders: Sequence,
+        receivers: Sequence,
+        timestamps: Sequence[float],
+        kinds: Optional[Sequence] = None,
+    ):
+        """Appends messages to the message log from parallel sequences, which
+        may be arrays or numpy arrays of lifeline numbers, timestamps and
+        kind codes
+
+        Parameters
+        ----------
+        senders : sequence of Block, string or int
+
+        receivers : sequence of Block, string or int
+
+        timestamps : sequence of float
+
+        kinds : sequence of string or int, default None
+            Message kinds, all "synchCall" if None
+
+        """
+        self._writable_messages()._extend(senders, receivers, timestamps, kinds)
+        self._touch()
+
+    def _writable_messages(self) -> "MessageLog":
+        """Returns the message log, copying it first if it is shared with
+        another interaction, such as the original of a fork"""
+        if self._messages._owner is not self:
+            self._messages = self._messages.copy()
+            self._messages._owner = self
+        return self._messages
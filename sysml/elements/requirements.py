@@ -16,7 +16,7 @@ class Requirement(ModelElement):
         super().__init__(name)
 
         if type(txt) is str:
-            self.txt = txt
+            self._txt = txt
         else:
             raise TypeError
 
@@ -25,6 +25,39 @@ class Requirement(ModelElement):
         else:
             raise TypeError
 
+    def __setstate__(self, state):
+        if "txt" in state:
+            # files written before txt became a property store it as "txt"
+            state = dict(state)
+            state["_txt"] = state.pop("txt")
+        super().__setstate__(state)
+
     @property
     def name(self):
         return self._name
+
+    @property
+    def txt(self):
+        return self._txt
+
+    @txt.setter
+    def txt(self, txt):
+        if type(txt) is str:
+            self._txt = txt
+            self._touch()
+        else:
+            raise TypeError
+
+    @property
+    def id(self):
+        return self._id
+
+    def _content(self):
+        return (self.name, self._txt, self._id)
+
+    @classmethod
+    def _defaults(cls):
+        return dict(super()._defaults(), _txt="", _id="")
+
+    def _valid(self):
+        return super()._valid() and type(self._txt) is str and type(self._id) is str
@@ -6,7 +6,9 @@ classifications, internal composition, or interfaces.
 from sysml.elements.base import *
 from sysml.elements.requirements import *
 from sysml.elements.parametrics import *
+from sysml.elements.base import _OwnedView
 from collections import OrderedDict as _OrderedDict
+from types import MappingProxyType as _MappingProxyType
 from typing import Dict, List, Optional, Union
 
 
@@ -18,6 +20,7 @@ class Block(ModelElement):
     name : string, default None
 
     parts : dict or list, default None
+        Blocks, or part usages of blocks
 
     references : dict or list, default None
 
@@ -29,6 +32,12 @@ class Block(ModelElement):
 
     multiplicity : int, default 1
 
+    Notes
+    -----
+    parts, references, values, constraints and flows are read-only views.
+    Parts are edited with add_part, remove_part or item assignment, and
+    references with add_reference and remove_reference.
+
     """
 
     def __init__(
@@ -52,14 +61,14 @@ class Block(ModelElement):
         elif isinstance(parts, dict):
             self._parts: "_OrderedDict" = _OrderedDict()
             for key, part in parts.items():
-                if isinstance(part, Block):
+                if isinstance(part, (Block, PartUsage)):
                     self._parts[key] = part
                 else:
                     raise TypeError
         elif isinstance(parts, list):
             self._parts: "_OrderedDict" = _OrderedDict()
             for part in parts:
-                if isinstance(part, Block):
+                if isinstance(part, (Block, PartUsage)):
                     self._parts[part.name] = part
                 else:
                     raise TypeError
@@ -148,28 +157,29 @@ class Block(ModelElement):
     def name(self, name):
         if type(name) is str:
             self._name = name
+            self._touch()
         else:
             raise TypeError
 
     @property
     def parts(self):
-        return self._parts
+        return _OwnedView(self, self._parts)
 
     @property
     def references(self):
-        return self._references
+        return _MappingProxyType(self._references)
 
     @property
     def values(self):
-        return self._values
+        return _OwnedView(self, self._values)
 
     @property
     def constraints(self):
-        return self._constraints
+        return _OwnedView(self, self._constraints)
 
     @property
     def flows(self):
-        return self._flowProperties
+        return _OwnedView(self, self._flowProperties)
 
     @property
     def multiplicity(self):
@@ -179,9 +189,49 @@ class Block(ModelElement):
     def multiplicity(self, multiplicity):
         if isinstance(multiplicity, (int, float)):
             self._multiplicity = multiplicity
+            self._touch()
         else:
             raise TypeError
 
+    def _containers(self):
+        return (
+            ("parts", self._parts),
+            ("references", self._references),
+            ("values", self._values),
+            ("constraints", self._constraints),
+            ("flows", self._flowProperties),
+        )
+
+    def _content(self):
+        return (self.name, self._multiplicity)
+
+    @classmethod
+    def _defaults(cls):
+        return dict(
+            super()._defaults(),
+            _parts=_OrderedDict(),
+            _references=_OrderedDict(),
+            _values=_OrderedDict(),
+            _constraints=_OrderedDict(),
+            _flowProperties=_OrderedDict(),
+            _multiplicity=1,
+        )
+
+    def _valid(self):
+        return (
+            super()._valid()
+            and isinstance(self._multiplicity, (int, float))
+            and all(
+                isinstance(part, (Block, PartUsage)) for part in self._parts.values()
+            )
+            and all(isinstance(value, ValueType) for value in self._values.values())
+            and all(
+                isinstance(constraint, ConstraintBlock)
+                for constraint in self._constraints.values()
+            )
+            and all(isinstance(flow, Block) for flow in self._flowProperties.values())
+        )
+
     def add_part(self, partName, part):
         """Adds block element to parts attribute
 
@@ -189,14 +239,43 @@ class Block(ModelElement):
         ----------
         partName : string
 
-        block : Block
+        block : Block or PartUsage
 
         """
-        if type(partName) is str and isinstance(part, Block):
+        if type(partName) is str and isinstance(part, (Block, PartUsage)):
+            if self._cycle_guard is not None:
+                self._cycle_guard.insert(self, part)
             self._parts[partName] = part
+            self._touch()
         else:
             raise TypeError
 
+    def add_usage(
+        self,
+        partName: str,
+        definition: "Block",
+        multiplicity: int = 1,
+        overrides: Optional[dict] = None,
+    ) -> "PartUsage":
+        """Adds a part usage of a block definition to parts attribute, and
+        returns it. Usages share their definition, which is preferable to
+        `add_part` for components used many times over.
+
+        Parameters
+        ----------
+        partName : string
+
+        definition : Block
+
+        multiplicity : int, default 1
+
+        overrides : dict, default None
+
+        """
+        usage = PartUsage(definition, partName, multiplicity, overrides)
+        self.add_part(partName, usage)
+        return usage
+
     def remove_part(self, partName):
         """Removes block element from parts attribute
 
@@ -205,32 +284,230 @@ class Block(ModelElement):
         partName : string
 
         """
-        self._parts.pop(partName)
+        part = self._parts.pop(partName)
+        if self._cycle_guard is not None:
+            self._cycle_guard.remove(self, part)
+        self._release(part)
+        self._touch()
+
+    def add_reference(self, referenceName, element):
+        """Adds a model element to references attribute. References are not
+        owned by block.
+
+        Parameters
+        ----------
+        referenceName : string
+
+        element : ModelElement
+
+        """
+        if type(referenceName) is str and isinstance(element, ModelElement):
+            self._references[referenceName] = element
+            self._touch()
+        else:
+            raise TypeError
+
+    def remove_reference(self, referenceName):
+        """Removes model element from references attribute
+
+        Parameters
+        ----------
+        referenceName : string
+
+        """
+        self._references.pop(referenceName)
+        self._touch()
 
     def __getitem__(self, elementName):
         if type(elementName) is str:
             if elementName in self._parts.keys():
-                return self._parts[elementName]
+                return self._get_owned(self._parts, elementName)
             elif elementName in self._references.keys():
                 return self._references[elementName]
             elif elementName in self._values.keys():
-                return self._values[elementName]
+                return self._get_owned(self._values, elementName)
             elif elementName in self._constraints.keys():
-                return self._constraints[elementName]
+                return self._get_owned(self._constraints, elementName)
             elif elementName in self._flowProperties.keys():
-                return self._flowProperties[elementName]
+                return self._get_owned(self._flowProperties, elementName)
             else:
                 raise KeyError
         else:
             raise TypeError
 
     def __setitem__(self, elementName, element):
-        if type(elementName) is str and isinstance(element, Block):
+        if type(elementName) is str and isinstance(element, (Block, PartUsage)):
+            if self._cycle_guard is not None:
+                self._cycle_guard.insert(self, element)
+            previous = self._parts.get(elementName)
             self._parts[elementName] = element
+            if previous is not None and previous is not element:
+                if self._cycle_guard is not None:
+                    self._cycle_guard.remove(self, previous)
+                self._release(previous)
+            self._touch()
         elif type(elementName) is not str:
             raise TypeError
-        elif not isinstance(element, Block):
+        elif not isinstance(element, (Block, PartUsage)):
+            raise TypeError
+
+
+class PartUsage(ModelElement):
+    """This class defines a part usage, the use of a block as a part of
+    another block
+
+    A usage refers to a block, its definition, and only holds what is local
+    to that use: its name, multiplicity and overrides of the definition.
+    Usages are far smaller than blocks, so the same component used thousands
+    of times costs one block plus one usage per use. The definition is
+    referenced, not owned, so it is written once when the model is saved.
+
+    Parameters
+    ----------
+    definition : Block
+
+    name : string, default None
+        Usage name, by default the name of the definition
+
+    multiplicity : int, default 1
+
+    overrides : dict, default None
+        Values of this usage that differ from the definition, by name
+
+    Example
+    -------
+    >>> bolt = sysml.Block("M6 Bolt")
+    >>> library.add(bolt)
+    >>> usage = flange.add_usage("bolt1", bolt, overrides={"torque": 9.5})
+    >>> usage["torque"], usage.definition is bolt
+    (9.5, True)
+    """
+
+    __slots__ = (
+        "_name",
+        "_uuid",
+        "_definition",
+        "_multiplicity",
+        "_overrides",
+        "_hash",
+        "_owners",
+        "_fork",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        definition: "Block",
+        name: Optional[str] = None,
+        multiplicity: int = 1,
+        overrides: Optional[dict] = None,
+    ) -> None:
+        if not isinstance(definition, Block):
+            raise TypeError
+        if name is None:
+            name = definition.name
+        super().__init__(name)
+        self._definition = definition
+        if isinstance(multiplicity, (int, float)):
+            self._multiplicity = multiplicity
+        else:
+            raise TypeError
+        if overrides is None:
+            self._overrides: tuple = ()
+        elif isinstance(overrides, dict):
+            self._overrides = tuple(overrides.items())
+        else:
+            raise TypeError
+        self._hash = None
+        self._owners: tuple = ()
+        self._fork = None
+
+    def __getstate__(self):
+        return {
+            "_name": self._name,
+            "_uuid": self._uuid,
+            "_definition": self._definition,
+            "_multiplicity": self._multiplicity,
+            "_overrides": self._overrides,
+        }
+
+    def __setstate__(self, state):
+        for attribute, value in state.items():
+            if attribute == "_overrides":
+                value = tuple(tuple(override) for override in value)
+            setattr(self, attribute, value)
+        self._hash = None
+        self._owners = ()
+        self._fork = None
+
+    def __getitem__(self, elementName):
+        "Returns an override, or the element of the definition, by its name"
+        for name, value in self._overrides:
+            if name == elementName:
+                return value
+        return self.definition[elementName]
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def definition(self):
+        if self._fork is not None and self._definition._fork is not self._fork:
+            self._definition = self._fork.rehome(self._definition)
+        return self._definition
+
+    @property
+    def multiplicity(self):
+        return self._multiplicity
+
+    @multiplicity.setter
+    def multiplicity(self, multiplicity):
+        if isinstance(multiplicity, (int, float)):
+            self._multiplicity = multiplicity
+            self._touch()
+        else:
+            raise TypeError
+
+    @property
+    def overrides(self):
+        "Returns a copy of the overrides of this usage"
+        return dict(self._overrides)
+
+    def override(self, name, value):
+        """Overrides a value of the definition for this usage only
+
+        Parameters
+        ----------
+        name : string
+
+        value : object
+
+        """
+        if type(name) is not str:
             raise TypeError
+        overrides = self.overrides
+        overrides[name] = value
+        self._overrides = tuple(overrides.items())
+        self._touch()
+
+    def _containers(self):
+        return (("definition", {"definition": self._definition}),)
+
+    def _content(self):
+        return (self.name, self._multiplicity, self._overrides)
+
+    @classmethod
+    def _defaults(cls):
+        return dict(super()._defaults(), _multiplicity=1, _overrides=())
+
+    def _valid(self):
+        return (
+            super()._valid()
+            and isinstance(self._definition, Block)
+            and isinstance(self._multiplicity, (int, float))
+            and type(self._overrides) is tuple
+        )
 
 
 class DeriveReqt(Dependency):
@@ -292,6 +569,10 @@ class Package(ModelElement):
 
     elements : dict or list, default None
 
+    Notes
+    -----
+    elements is a read-only view, edited with add and remove.
+
     """
 
     def __init__(
@@ -324,7 +605,7 @@ class Package(ModelElement):
 
     def __getitem__(self, elementName):
         "Returns model element specified by its name"
-        return self._elements[elementName]
+        return self._get_owned(self._elements, elementName)
 
     @property
     def name(self):
@@ -332,13 +613,22 @@ class Package(ModelElement):
 
     @property
     def elements(self):
-        return self._elements
+        return _OwnedView(self, self._elements)
+
+    def _containers(self):
+        return (("elements", self._elements),)
+
+    @classmethod
+    def _defaults(cls):
+        return dict(super()._defaults(), _elements=_OrderedDict())
 
     def add(self, element):
         """Adds a model element to package"""
         if isinstance(element, ModelElement):
+            if self._cycle_guard is not None:
+                self._cycle_guard.insert(self, element)
             i = 0
-            while element not in self.elements.values():
+            while element not in self._elements.values():
                 if isinstance(element, Dependency):
                     i += 1
                     elementName = "".join(
@@ -352,12 +642,17 @@ class Package(ModelElement):
                     elementName = element.name
                 if elementName not in self._elements.keys():
                     self._elements[elementName] = element
+                    self._touch()
         else:
             raise TypeError
 
     def remove(self, element):
         """Removes a model element from package"""
-        self._elements.pop(element.name)
+        removed = self._elements.pop(element.name)
+        if self._cycle_guard is not None:
+            self._cycle_guard.remove(self, removed)
+        self._release(removed)
+        self._touch()
 
     def RTM(self):
         """Generates a requirements traceability matrix for model elements
@@ -0,0 +1,217 @@
+"""
+The `instrumentation.py` module counts and times calls to the hot paths of
+the package, such as `Package.add`, item lookups, element construction and
+serialization, so that slow model operations can be diagnosed without a
+profiler.
+
+---------
+
+Collection is opt-in. Hot methods are only wrapped while an `instrument()`
+block is active, and serialization functions check a single flag, so the
+package runs at full speed otherwise. Construction is reported per class, as
+"Block.__init__", timing each element from the outermost constructor it
+runs.
+"""
+
+from sysml.elements.base import ModelElement
+from sysml.elements.structure import Block, Package
+from asyncio import iscoroutinefunction as _iscoroutinefunction
+from contextlib import contextmanager as _contextmanager
+from functools import wraps as _wraps
+from threading import Lock as _Lock
+from time import perf_counter as _perf_counter
+from typing import Callable, Dict, Iterator, Optional
+
+_HOT_PATHS = (
+    (Package, "add"),
+    (Package, "__getitem__"),
+    (Block, "add_part"),
+    (Block, "__getitem__"),
+)
+
+_counters: dict = {}
+_hooks: tuple = ()
+_originals: dict = {}
+_lock = _Lock()
+_active = 0
+
+
+def stats(reset: bool = False) -> Dict[str, Dict[str, float]]:
+    """Returns the number of calls to, and cumulative seconds spent in, each
+    instrumented operation called while collection was active
+
+    Parameters
+    ----------
+    reset : bool, default False
+        Zero the counters after reading them
+
+    Example
+    -------
+    >>> with sysml.instrument():
+    ...     model = sysml.read_yaml("model.yaml")
+    >>> sysml.stats()["read_yaml"]
+    {'calls': 1, 'seconds': 0.0421}
+    """
+    with _lock:
+        result = {
+            name: {"calls": counter[0], "seconds": counter[1]}
+            for name, counter in _counters.items()
+            if counter[0]
+        }
+        if reset:
+            for counter in _counters.values():
+                counter[:] = [0, 0.0]
+    return result
+
+
+@_contextmanager
+def instrument(
+    hook: Optional[Callable[[str, float], None]] = None,
+) -> Iterator[Dict[str, Dict[str, float]]]:
+    """Collects statistics on instrumented operations within the block, and
+    yields a dict that is filled, on exit, with the statistics of calls made
+    within the block. Blocks may be nested.
+
+    Parameters
+    ----------
+    hook : callable, default None
+        Called with the operation name and its duration in seconds after
+        every instrumented call within the block, for forwarding to an
+        external metrics system
+
+    Example
+    -------
+    >>> with sysml.instrument(hook=metrics.observe) as scope:
+    ...     package.add(block)
+    >>> scope["Package.add"]["calls"]
+    1
+    """
+    global _active, _hooks
+    with _lock:
+        if not _active:
+            _patch()
+        _active += 1
+        if hook is not None:
+            _hooks = _hooks + (hook,)
+    before = stats()
+    scope: Dict[str, Dict[str, float]] = {}
+    try:
+        yield scope
+    finally:
+        for name, after in stats().items():
+            previous = before.get(name, {"calls": 0, "seconds": 0.0})
+            if after["calls"] > previous["calls"]:
+                scope[name] = {
+                    "calls": after["calls"] - previous["calls"],
+                    "seconds": after["seconds"] - previous["seconds"],
+                }
+        with _lock:
+            if hook is not None:
+                hooks = list(_hooks)
+                hooks.remove(hook)
+                _hooks = tuple(hooks)
+            _active -= 1
+            if not _active:
+                _unpatch()
+
+
+def _probe(name: str) -> Callable:
+    """Decorates a function so that its calls are counted and timed while
+    collection is active"""
+
+    def decorate(function):
+        if _iscoroutinefunction(function):
+
+            @_wraps(function)
+            async def probed(*args, **kwargs):
+                if not _active:
+                    return await function(*args, **kwargs)
+                start = _perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    _record(name, _perf_counter() - start)
+
+        else:
+
+            @_wraps(function)
+            def probed(*args, **kwargs):
+                if not _active:
+                    return function(*args, **kwargs)
+                start = _perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    _record(name, _perf_counter() - start)
+
+        return probed
+
+    return decorate
+
+
+def _record(name, seconds) -> None:
+    with _lock:
+        counter = _counters.get(name)
+        if counter is None:
+            counter = _counters[name] = [0, 0.0]
+        counter[0] += 1
+        counter[1] += seconds
+    # hooks are called outside the lock, as they may run instrumented code
+    for hook in _hooks:
+        hook(name, seconds)
+
+
+def _timed(name, function) -> Callable:
+    @_wraps(function)
+    def timed(*args, **kwargs):
+        start = _perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _record(name, _perf_counter() - start)
+
+    return timed
+
+
+def _timed_init(function) -> Callable:
+    """Wraps the constructor of a model element class so that it is timed
+    only where it is the constructor of the class being built, and not
+    when it is reached through super()"""
+
+    @_wraps(function)
+    def timed(self, *args, **kwargs):
+        cls = type(self)
+        if cls.__init__ is not timed:
+            return function(self, *args, **kwargs)
+        start = _perf_counter()
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            _record(cls.__name__ + ".__init__", _perf_counter() - start)
+
+    return timed
+
+
+def _patch() -> None:
+    """Replaces each hot method, and the constructor of each model element
+    class defining one, with a timed wrapper"""
+    for cls, attribute in _HOT_PATHS:
+        original = cls.__dict__[attribute]
+        _originals[cls, attribute] = original
+        name = "{}.{}".format(cls.__name__, attribute)
+        setattr(cls, attribute, _timed(name, original))
+    stack: list = [ModelElement]
+    while stack:
+        element_class = stack.pop()
+        stack.extend(element_class.__subclasses__())
+        original = element_class.__dict__.get("__init__")
+        if original is not None and (element_class, "__init__") not in _originals:
+            _originals[element_class, "__init__"] = original
+            setattr(element_class, "__init__", _timed_init(original))
+
+
+def _unpatch() -> None:
+    """Restores the hot methods replaced by `_patch`"""
+    for (cls, attribute), original in _originals.items():
+        setattr(cls, attribute, original)
+    _originals.clear()
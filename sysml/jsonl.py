@@ -0,0 +1,314 @@
+"""
+The `jsonl.py` module exports models as JSON Lines, one record per element,
+for data pipelines and columnar stores, and imports them back.
+
+---------
+
+Records are written in the order elements are reached from the root, so that
+every element follows its owner, and are encoded with orjson when it is
+installed. Neither exporting nor reading records requires the whole file in
+memory.
+"""
+
+from sysml.elements.base import ModelElement, Dependency, _REFERENCE_KINDS
+from sysml.elements.requirements import Requirement
+from sysml.elements.structure import Block, Package, PartUsage
+from sysml.instrumentation import _probe
+from os import path as _path
+import json as _json
+from types import ModuleType as _ModuleType
+from typing import BinaryIO, Iterator, List, Optional, Union
+
+_orjson: Optional[_ModuleType]
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def records(element) -> Iterator[dict]:
+    """Yields one record per element subsumed by element, element included
+
+    Every record holds the uuid, type and name of an element, and the uuid
+    of its owner with the kind of collection and key it is owned under, None
+    for element itself. Requirements add "txt" and "id", dependencies
+    "client" and "supplier", blocks "multiplicity" and "references", and part
+    usages "definition", "multiplicity" and "overrides", with elements given
+    by uuid. An element owned by several others is recorded in full under
+    the first, and by a record of only "uuid", "parent", "kind" and "key"
+    under each of the others.
+
+    Parameters
+    ----------
+    element : ModelElement
+
+    Example
+    -------
+    >>> for record in sysml.records(model["requirements"]):
+    ...     print(record["type"], record["name"], record.get("id"))
+    Package requirements None
+    Requirement Functional REQ-2
+    """
+    if not isinstance(element, ModelElement):
+        raise TypeError
+    seen = set()
+    stack = [(None, None, None, element)]
+    while stack:
+        parent, kind, key, element = stack.pop()
+        if id(element) in seen:
+            yield {
+                "uuid": str(element.uuid),
+                "parent": parent,
+                "kind": kind,
+                "key": key,
+            }
+            continue
+        seen.add(id(element))
+        record = {
+            "uuid": str(element.uuid),
+            "type": element.__class__.__name__,
+            "name": element.name,
+            "parent": parent,
+            "kind": kind,
+            "key": key,
+        }
+        record.update(_fields(element))
+        yield record
+
+        children = [
+            (record["uuid"], kind, key, child)
+            for kind, elements in element._containers()
+            if kind not in _REFERENCE_KINDS
+            for key, child in elements.items()
+        ]
+        stack.extend(reversed(children))
+
+
+@_probe("write_jsonl")
+def write_jsonl(
+    element,
+    filename: str,
+    shard_size: Optional[int] = None,
+    chunk_size: int = 10000,
+) -> List[str]:
+    """Writes the records of element and of every element it owns to a JSON
+    Lines file, or to a series of files, and returns the names of the files
+    written
+
+    Parameters
+    ----------
+    element : ModelElement
+
+    filename : string
+
+    shard_size : int, default None
+        Maximum number of records per file. Files are then named after
+        filename with a shard number before the extension, as in
+        "model-00000.jsonl".
+
+    chunk_size : int, default 10000
+        Number of records encoded before each write
+
+    Example
+    -------
+    >>> model.to_jsonl("export/model.jsonl", shard_size=1000000)
+    ['export/model-00000.jsonl', 'export/model-00001.jsonl']
+    """
+    if type(filename) is not str:
+        raise TypeError
+    if shard_size is not None and shard_size < 1:
+        raise ValueError("shard_size must be positive")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    encode = _encoder()
+    filenames: List[str] = []
+    f: Optional[BinaryIO] = None
+    written = 0
+    chunk: list = []
+    try:
+        for record in records(element):
+            if f is None or written == shard_size:
+                if f is not None and chunk:
+                    f.write(b"".join(chunk))
+                    chunk.clear()
+                f = _next_shard(f, filename, shard_size, filenames)
+                written = 0
+            chunk.append(encode(record))
+            written += 1
+            if len(chunk) == chunk_size:
+                f.write(b"".join(chunk))
+                chunk.clear()
+        if f is not None:
+            f.write(b"".join(chunk))
+    finally:
+        if f is not None:
+            f.close()
+    return filenames
+
+
+@_probe("read_jsonl")
+def read_jsonl(
+    filenames: Union[str, List[str]], validate: bool = False
+) -> "ModelElement":
+    """Load the element recorded first in JSON Lines files written by
+    `write_jsonl`, together with the elements it owns
+
+    Elements are rebuilt with `ModelElement.restore`, trusting the records
+    to hold fields of the right types.
+
+    Parameters
+    ----------
+    filenames : string or list of string
+        A file, or the shards of an export in order
+
+    validate : bool, default False
+        Check the fields of every element once loaded, raising a TypeError
+        if any fails, for records from other sources
+
+    Notes
+    -----
+    Records carry the fields of packages, blocks, part usages, requirements
+    and dependencies only, so records of other elements, such as behaviors,
+    raise a ValueError rather than being imported incompletely. A ValueError
+    is also raised for a reference to an element without a record, such as
+    the client of a dependency outside the exported subtree.
+    """
+    if type(filenames) is str:
+        filenames = [filenames]
+    classes = _classes()
+    elements: dict = {}
+    references: list = []
+    root = None
+    parent = None
+    containers: dict = {}
+    for filename in filenames:
+        with open(filename, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = _loads(line)
+                element = elements.get(record["uuid"])
+                if element is None:
+                    element = _build(record, classes, references)
+                    elements[record["uuid"]] = element
+                if root is None:
+                    root = element
+                else:
+                    if record["parent"] != parent:
+                        parent = record["parent"]
+                        containers = dict(elements[parent]._containers())
+                    containers[record["kind"]][record["key"]] = element
+    if root is None:
+        raise ValueError("no records in {}".format(", ".join(filenames)))
+
+    for target, attribute, uuid, record in references:
+        element = elements.get(uuid)
+        if element is None:
+            raise ValueError(
+                "record {} refers to {} as {!r}, which has no record".format(
+                    record, uuid, attribute.lstrip("_")
+                )
+            )
+        if isinstance(target, ModelElement):
+            setattr(target, attribute, element)
+        else:
+            target[attribute] = element
+    if validate:
+        root.validate()
+    return root
+
+
+def _fields(element) -> dict:
+    """Returns the type-specific fields of the record of element"""
+    if isinstance(element, Requirement):
+        return {"txt": element.txt, "id": element.id}
+    if isinstance(element, Dependency):
+        return {
+            "client": str(element.client.uuid),
+            "supplier": str(element.supplier.uuid),
+        }
+    if isinstance(element, Block):
+        return {
+            "multiplicity": element.multiplicity,
+            "references": {
+                key: str(reference.uuid)
+                for key, reference in element.references.items()
+            },
+        }
+    if isinstance(element, PartUsage):
+        return {
+            "definition": str(element._definition.uuid),
+            "multiplicity": element.multiplicity,
+            "overrides": element.overrides,
+        }
+    return {}
+
+
+def _build(record, classes, references) -> "ModelElement":
+    """Creates the element of a record, noting in references the fields and
+    entries that refer to other elements by uuid, with the uuid of the
+    record, to be set once every record has been read"""
+    cls = classes.get(record.get("type"))
+    if cls is None:
+        raise ValueError("unknown element type {!r}".format(record.get("type")))
+    fields = {"_name": record["name"]}
+    if issubclass(cls, Dependency):
+        element = cls.restore(record["uuid"], fields)
+        references.append((element, "_client", record["client"], record["uuid"]))
+        references.append((element, "_supplier", record["supplier"], record["uuid"]))
+    elif issubclass(cls, PartUsage):
+        fields["_multiplicity"] = record["multiplicity"]
+        fields["_overrides"] = tuple(record["overrides"].items())
+        element = cls.restore(record["uuid"], fields)
+        references.append(
+            (element, "_definition", record["definition"], record["uuid"])
+        )
+    elif issubclass(cls, Requirement):
+        fields["_txt"] = record["txt"]
+        fields["_id"] = record["id"]
+        element = cls.restore(record["uuid"], fields)
+    elif issubclass(cls, Block):
+        fields["_multiplicity"] = record["multiplicity"]
+        element = cls.restore(record["uuid"], fields)
+        for key, uuid in record["references"].items():
+            references.append((element._references, key, uuid, record["uuid"]))
+    elif issubclass(cls, Package):
+        element = cls.restore(record["uuid"], fields)
+    else:
+        raise ValueError("cannot import {} records".format(cls.__name__))
+    return element
+
+
+def _classes() -> dict:
+    """Returns every model element class by name"""
+    classes: dict = {}
+    stack = [ModelElement]
+    while stack:
+        cls = stack.pop()
+        classes.setdefault(cls.__name__, cls)
+        stack.extend(cls.__subclasses__())
+    return classes
+
+
+def _encoder():
+    if _orjson is not None:
+        return lambda record: _orjson.dumps(record) + b"\n"
+    return lambda record: (_json.dumps(record, separators=(",", ":")) + "\n").encode()
+
+
+def _loads(line):
+    if _orjson is not None:
+        return _orjson.loads(line)
+    return _json.loads(line)
+
+
+def _next_shard(f, filename, shard_size, filenames):
+    """Closes the current file, if any, and opens the next one"""
+    if f is not None:
+        f.close()
+    if shard_size is not None:
+        stem, extension = _path.splitext(filename)
+        filename = "{}-{:05d}{}".format(stem, len(filenames), extension)
+    filenames.append(filename)
+    return open(filename, "wb")
@@ -0,0 +1,186 @@
+"""
+The `memory.py` module reports where the memory of a loaded model goes: by
+element class, by attribute, by container kind and by top-level package.
+"""
+
+from sysml.elements.base import ModelElement
+from sysml.elements.structure import Package
+from collections import namedtuple as _namedtuple
+from enum import Enum as _Enum
+from itertools import chain as _chain
+from sys import getsizeof as _getsizeof
+from tracemalloc import get_object_traceback as _get_object_traceback
+from tracemalloc import is_tracing as _is_tracing
+from types import BuiltinFunctionType as _BuiltinFunctionType
+from types import FunctionType as _FunctionType
+from types import MethodType as _MethodType
+from types import ModuleType as _ModuleType
+from typing import Optional
+
+MemoryReport = _namedtuple(
+    "MemoryReport",
+    ["total", "by_class", "by_attribute", "by_container", "by_package", "by_site"],
+)
+MemoryReport.__doc__ = """The deep size, in bytes, of a model element and
+everything it owns
+
+Each breakdown maps a name to a dict of "count" and "bytes". by_class is keyed
+by element class; by_attribute by "Class.attribute", counting the values held
+by element attributes other than containers; by_container by container kind,
+counting the container and its keys, with "empty" the number of containers
+holding no elements; by_package by the name of each package directly owned by
+the root. by_site is keyed by the "filename:lineno" where objects were
+allocated, and is None unless the report was made in tracemalloc mode.
+
+Objects shared between elements, such as interned strings, are counted once,
+where they are first reached."""
+
+_LEAVES = (
+    type,
+    _Enum,
+    _ModuleType,
+    _FunctionType,
+    _MethodType,
+    _BuiltinFunctionType,
+)
+_SKIPPED = ("_fork",)
+
+
+def memory_usage(element, tracemalloc: bool = False) -> "MemoryReport":
+    """Returns the deep size of element and of every element it owns
+
+    Parameters
+    ----------
+    element : ModelElement
+
+    tracemalloc : bool, default False
+        Also attribute every counted object to the line that allocated it.
+        Requires tracemalloc to have been started before the model was
+        loaded or built; sites are the most recent frame recorded.
+
+    Example
+    -------
+    >>> tracemalloc.start()
+    >>> model = sysml.read_yaml("model.yaml")
+    >>> report = model.memory_usage(tracemalloc=True)
+    >>> report.by_class["Requirement"]
+    {'count': 1200, 'bytes': 391320}
+    """
+    if not isinstance(element, ModelElement):
+        raise TypeError
+    if tracemalloc and not _is_tracing():
+        raise RuntimeError("tracemalloc is not tracing")
+
+    by_class: dict = {}
+    by_attribute: dict = {}
+    by_container: dict = {}
+    by_package: dict = {}
+    by_site: Optional[dict] = {} if tracemalloc else None
+    sizer = _Sizer(by_site)
+    total = 0
+
+    packages: dict = {}
+    for path, element in _chain([((), element)], element._walk()):
+        name = element.__class__.__name__
+        containers = {id(elements): kind for kind, elements in element._containers()}
+
+        size = sizer.element(element)
+        for attribute, value in _attributes(element):
+            if attribute in _SKIPPED:
+                continue
+            kind = containers.get(id(value))
+            if kind is None:
+                value_size = sizer.size(value)
+                _add(by_attribute, "{}.{}".format(name, attribute), value_size)
+            else:
+                value_size = sizer.size(value, shallow=True)
+                value_size += sum(sizer.size(key) for key in value)
+                _add(by_container, kind, value_size)
+                entry = by_container[kind]
+                entry["empty"] = entry.get("empty", 0) + (not value)
+            size += value_size
+        _add(by_class, name, size)
+        if len(path) == 1 and isinstance(element, Package):
+            packages[path[0]] = element.name
+        if path and path[0] in packages:
+            _add(by_package, packages[path[0]], size)
+        total += size
+
+    return MemoryReport(
+        total, by_class, by_attribute, by_container, by_package, by_site
+    )
+
+
+class _Sizer:
+    """Sums the sizes of objects not counted before"""
+
+    def __init__(self, by_site) -> None:
+        self.seen: set = set()
+        self.by_site = by_site
+
+    def element(self, element) -> int:
+        """Returns the size of an element and of its attribute dict"""
+        size = self._count(element)
+        state = getattr(element, "__dict__", None)
+        if state is not None:
+            # some interpreters only allocate the attribute dict when it is
+            # first accessed, so its allocation site is not meaningful
+            size += self._count(state, trace=False)
+        return size
+
+    def size(self, value, shallow=False) -> int:
+        """Returns the size of value and of the objects it refers to, apart
+        from model elements, functions, classes and modules. Only value
+        itself is counted if shallow."""
+        total = 0
+        stack = [value]
+        while stack:
+            obj = stack.pop()
+            if id(obj) in self.seen or isinstance(obj, ModelElement):
+                continue
+            total += self._count(obj)
+            if shallow or isinstance(obj, _LEAVES):
+                continue
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset)):
+                stack.extend(obj)
+            else:
+                stack.extend(field for attribute, field in _attributes(obj))
+        return total
+
+    def _count(self, obj, trace=True) -> int:
+        self.seen.add(id(obj))
+        size = _getsizeof(obj)
+        if trace and self.by_site is not None:
+            traceback = _get_object_traceback(obj)
+            if traceback is not None:
+                frame = traceback[0]
+                site = "{}:{}".format(frame.filename, frame.lineno)
+                _add(self.by_site, site, size)
+        return size
+
+
+def _attributes(obj):
+    """Yields the attribute names and values of an object, from its
+    dict and its slots"""
+    state = getattr(obj, "__dict__", None)
+    if isinstance(state, dict):
+        yield from state.items()
+    for cls in type(obj).__mro__:
+        for slot in cls.__dict__.get("__slots__", ()):
+            if slot in ("__dict__", "__weakref__"):
+                continue
+            try:
+                yield slot, getattr(obj, slot)
+            except AttributeError:
+                pass
+
+
+def _add(breakdown, name, size) -> None:
+    entry = breakdown.get(name)
+    if entry is None:
+        entry = breakdown[name] = {"count": 0, "bytes": 0}
+    entry["count"] += 1
+    entry["bytes"] += size
@@ -0,0 +1,354 @@
+"""
+The `query.py` module answers queries over the elements of a model, such as
+"every block with a multiplicity above one under the structure package",
+from per-type and per-attribute indexes of the model.
+
+---------
+
+Indexes are built on first use and kept on the model until its content hash
+changes, so repeated queries over an unchanged model cost little more than
+the size of their results.
+"""
+
+from sysml.elements.base import ModelElement
+from array import array as _array
+from builtins import type as _type
+from heapq import merge as _merge
+from typing import Callable, Iterator, List, Optional, Union
+
+_MISSING = object()
+
+
+class Query:
+    """This class defines a lazy query over the elements owned by a model
+
+    Results are computed each time the query is iterated, in the order the
+    elements are reached from the model. The model itself is not a result.
+
+    Parameters
+    ----------
+    model : ModelElement
+
+    type : class or tuple of classes, default None
+        Only yield instances of type, subclasses included
+
+    where : dict or callable, default None
+        Either a predicate called with each candidate element, or a dict
+        mapping attribute names to a required value or to a predicate called
+        with the attribute value. Attributes in a dict are looked up in
+        per-attribute indexes.
+
+    under : ModelElement, default None
+        Only yield elements owned, directly or transitively, by under
+
+    Notes
+    -----
+    Indexes are invalidated through the content hash of the model, so edits
+    to fields that the content hash does not cover are not seen by queries.
+    Querying a fork of a model copies into the fork only the elements yielded,
+    and the elements owning them, as `ModelElement.walk` does.
+
+    Example
+    -------
+    >>> query = model.query(
+    ...     type=sysml.Block,
+    ...     where={"multiplicity": lambda m: m > 1},
+    ...     under=model["structure"],
+    ... )
+    >>> list(query)
+    [<Block('Nacelle')>]
+    >>> print(query.explain())
+    drive  attribute index multiplicity (1 of 2 values): 1 elements
+    filter type index Block: 3 elements
+    filter subtree of <Package('structure')>: 3 elements
+    """
+
+    def __init__(
+        self,
+        model,
+        type: Optional[Union[type, tuple]] = None,
+        where: Optional[Union[dict, Callable]] = None,
+        under: Optional["ModelElement"] = None,
+    ) -> None:
+        if not isinstance(model, ModelElement):
+            raise TypeError
+        if not (type is None or isinstance(type, (_type, tuple))):
+            raise TypeError
+        if not (where is None or isinstance(where, dict) or callable(where)):
+            raise TypeError
+        if not (under is None or isinstance(under, ModelElement)):
+            raise TypeError
+        self._model = model
+        self._type = type
+        self._where = where
+        self._under = under
+
+    def __iter__(self) -> Iterator["ModelElement"]:
+        return self._run()
+
+    def __repr__(self):
+        fields = [
+            "{}={!r}".format(name, value)
+            for name, value in (
+                ("type", self._type),
+                ("where", self._where),
+                ("under", self._under),
+            )
+            if value is not None
+        ]
+        return "<Query({})>".format(", ".join(fields))
+
+    def count(self) -> int:
+        """Returns the number of results"""
+        return sum(1 for element in self._run(claim=False))
+
+    def first(self) -> Optional["ModelElement"]:
+        """Returns the first result, or None if there is none"""
+        return next(iter(self), None)
+
+    def explain(self) -> str:
+        """Returns the plan of this query against the current model, one
+        step per line: the index that candidates are drawn from, then the
+        conditions each candidate is checked against"""
+        steps = self._plan()[1]
+        return "\n".join(
+            "{:6} {}".format("drive" if index == 0 else "filter", step)
+            for index, step in enumerate(steps)
+        )
+
+    def _run(self, claim=True) -> Iterator["ModelElement"]:
+        index = _index(self._model)
+        candidates, steps, checks = self._plan(index)
+        elements = index.elements
+        for position in candidates:
+            element = elements[position]
+            if all(check(position, element) for check in checks):
+                yield index.claim(self._model, position) if claim else element
+
+    def _plan(self, index=None):
+        """Returns the candidate positions of the most selective index, a
+        description of each step and the checks applied to candidates"""
+        if index is None:
+            index = _index(self._model)
+        sources = []
+        filters = []
+
+        if self._type is not None:
+            cls = self._type
+            postings = [
+                positions
+                for candidate, positions in index.types.items()
+                if issubclass(candidate, cls)
+            ]
+            sources.append(
+                (
+                    sum(len(positions) for positions in postings),
+                    "type index {}".format(_describe(cls)),
+                    lambda postings=postings: _union(postings),
+                    lambda position, element: isinstance(element, cls),
+                )
+            )
+
+        if isinstance(self._where, dict):
+            for name, condition in self._where.items():
+                check = _attribute_check(name, condition)
+                values = index.attribute(name)
+                if values is None:
+                    filters.append(("attribute {} (not indexed)".format(name), check))
+                    continue
+                if callable(condition):
+                    keys = [key for key in values if condition(key)]
+                else:
+                    try:
+                        keys = [condition] if condition in values else []
+                    except TypeError:
+                        filters.append(
+                            ("attribute {} (not indexed)".format(name), check)
+                        )
+                        continue
+                postings = [values[key] for key in keys]
+                sources.append(
+                    (
+                        sum(len(positions) for positions in postings),
+                        "attribute index {} ({} of {} values)".format(
+                            name, len(keys), len(values)
+                        ),
+                        lambda postings=postings: _union(postings),
+                        check,
+                    )
+                )
+        elif self._where is not None:
+            predicate = self._where
+            filters.append(
+                (
+                    "predicate {}".format(getattr(predicate, "__name__", predicate)),
+                    lambda position, element: predicate(element),
+                )
+            )
+
+        if self._under is not None:
+            start = index.position.get(id(self._under))
+            if start is None and self._model._fork is not None:
+                # under may be a copy made since the index was built
+                for original, clone in self._model._fork.clones.values():
+                    if clone is self._under:
+                        start = index.position.get(id(original))
+            if start is None:
+                raise ValueError(
+                    "{!r} is not within {!r}".format(self._under, self._model)
+                )
+            start += 1
+            end = index.end[start - 1]
+            sources.append(
+                (
+                    end - start,
+                    "subtree of {!r}".format(self._under),
+                    lambda: iter(range(start, end)),
+                    lambda position, element: start <= position < end,
+                )
+            )
+
+        sources.sort(key=lambda source: source[0])
+        if sources:
+            size, description, candidates, check = sources[0]
+            candidates = candidates()
+            steps = ["{}: {} elements".format(description, size)]
+        else:
+            candidates = iter(range(1, len(index.elements)))
+            steps = ["scan: {} elements".format(len(index.elements) - 1)]
+        checks = []
+        for size, description, _, check in sources[1:]:
+            steps.append("{}: {} elements".format(description, size))
+            checks.append(check)
+        for description, check in filters:
+            steps.append(description)
+            checks.append(check)
+        return candidates, steps, checks
+
+
+class _Index:
+    """Positions of the elements owned by a model, in the order they are
+    reached from it, grouped by type and by attribute value. Each element
+    also records the position just past the elements it owns. The model
+    itself is not kept, so that the index can be stored on it.
+
+    The index of a fork holds the elements it shares with the model it was
+    forked from as they are, along with the position of the owner of each
+    element and the collection it is kept in, so that results can be copied
+    into the fork when they are yielded.
+    """
+
+    def __init__(self, model) -> None:
+        self.hash = model.content_hash
+        self.elements: List[Optional["ModelElement"]] = []
+        self.position: dict = {}
+        self.end = _array("l")
+        self.types: dict = {}
+        self.attributes: dict = {}
+        self.owners: Optional[list] = None if model._fork is None else []
+
+        stack: list = [(model, False, None)]
+        while stack:
+            element, done, owner = stack.pop()
+            if done:
+                self.end[self.position[id(element)]] = len(self.elements)
+                continue
+            if id(element) in self.position:
+                continue
+            position = len(self.elements)
+            self.position[id(element)] = position
+            self.elements.append(element if position > 0 else None)
+            self.end.append(position + 1)
+            if position > 0:
+                self.types.setdefault(type(element), _array("l")).append(position)
+            if self.owners is not None:
+                self.owners.append(owner)
+            stack.append((element, True, None))
+            children = list(element._children())
+            stack.extend(
+                (child, False, (position, kind, key))
+                for kind, key, child in reversed(children)
+            )
+
+    def claim(self, model, position) -> "ModelElement":
+        """Returns the element at position, copied into the fork of model
+        along with the elements owning it if model is a fork"""
+        element = self.elements[position]
+        fork = model._fork
+        if self.owners is None or element._fork is fork:
+            return element
+        kinds: list = []
+        keys: list = []
+        owner = element
+        start = position
+        while start > 0 and owner._fork is not fork:
+            start, kind, key = self.owners[start]
+            kinds.append(kind)
+            keys.append(key)
+            owner = self.elements[start]
+        if start == 0:
+            owner = model
+        element = owner._claim(keys[::-1], kinds[::-1])
+        self.elements[position] = element
+        self.position[id(element)] = position
+        return element
+
+    def attribute(self, name) -> Optional[dict]:
+        """Returns the positions of the elements with each value of an
+        attribute, or None if some value cannot be used as a key"""
+        if name in self.attributes:
+            return self.attributes[name]
+        values: dict = {}
+        for position in range(1, len(self.elements)):
+            value = getattr(self.elements[position], name, _MISSING)
+            if value is _MISSING:
+                continue
+            try:
+                positions = values.get(value)
+            except TypeError:
+                self.attributes[name] = None
+                return None
+            if positions is None:
+                positions = values[value] = _array("l")
+            positions.append(position)
+        self.attributes[name] = values
+        return values
+
+
+def _index(model) -> "_Index":
+    """Returns the indexes of model, rebuilding them if it has changed.
+    Indexes are kept on the model, apart from elements without attribute
+    dicts, such as part usages, whose indexes are rebuilt each time."""
+    index = getattr(model, "_query_index", None)
+    if index is None or index.hash != model.content_hash:
+        index = _Index(model)
+        if hasattr(model, "__dict__"):
+            model._query_index = index
+    return index
+
+
+def _union(postings) -> Iterator[int]:
+    if len(postings) == 1:
+        return iter(postings[0])
+    return _merge(*postings)
+
+
+def _attribute_check(name, condition):
+    if callable(condition):
+
+        def check(position, element):
+            value = getattr(element, name, _MISSING)
+            return value is not _MISSING and condition(value)
+
+    else:
+
+        def check(position, element):
+            return getattr(element, name, _MISSING) == condition
+
+    return check
+
+
+def _describe(cls) -> str:
+    if isinstance(cls, tuple):
+        return ", ".join(candidate.__name__ for candidate in cls)
+    return cls.__name__
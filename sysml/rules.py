@@ -0,0 +1,306 @@
+"""
+The `rules.py` module checks a model against modeling rules, such as naming
+conventions or requirements left unlinked, and reports every violation.
+
+---------
+
+Rules are checked one top-level package at a time, so that large models can
+be checked by a pool of processes. Workers read the model without copying it
+where processes are forked, and otherwise each receive a snapshot of the
+package they check.
+"""
+
+from sysml.elements.base import ModelElement, Dependency
+from sysml.elements.requirements import Requirement
+from sysml.elements.structure import Block, Package, PartUsage, Satisfy
+from collections import namedtuple as _namedtuple
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from itertools import chain as _chain
+from multiprocessing import get_all_start_methods as _get_all_start_methods
+from multiprocessing import get_context as _get_context
+import re as _re
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+Violation = _namedtuple("Violation", ["rule", "path", "uuid", "message"])
+Violation.__doc__ = """A breach of a modeling rule by an element
+
+path is the tuple of keys leading to the element from the checked model, and
+uuid the uuid of the element as a string."""
+
+_shared: Optional[tuple] = None
+
+
+class Rule:
+    """Base class for modeling rules
+
+    A rule checks every element of its type on its own with `check`. Rules
+    that need the whole model, such as finding requirements that no
+    dependency refers to, instead gather facts about elements with `facts`,
+    which are merged across packages and passed to `finish`. Rules and their
+    facts must be picklable to be checked in worker processes.
+
+    Example
+    -------
+    >>> class Documented(sysml.Rule):
+    ...     name = "documented"
+    ...     type = sysml.Requirement
+    ...     def check(self, path, requirement):
+    ...         if not requirement.txt:
+    ...             yield "requirement has no text"
+    """
+
+    name = "rule"
+    type: Union[type, Tuple[type, ...]] = ModelElement
+
+    def __repr__(self):
+        return "<{}('{}')>".format(self.__class__.__name__, self.name)
+
+    def check(self, path: tuple, element) -> Iterable[str]:
+        """Yields a message for each way element breaks this rule"""
+        return ()
+
+    def facts(self, path: tuple, element) -> Iterable:
+        """Yields facts about element needed by `finish`"""
+        return ()
+
+    def finish(self, facts: list) -> Iterable["Violation"]:
+        """Yields the violations found from the facts gathered over the whole
+        model"""
+        return ()
+
+
+class NamingRule(Rule):
+    """Names of elements, other than dependencies, must match a pattern
+
+    Parameters
+    ----------
+    pattern : string, default r"\\S(.*\\S)?"
+        Regular expression that whole names must match. By default names
+        must be non-empty, without leading or trailing whitespace.
+
+    type : class or tuple of classes, default ModelElement
+
+    """
+
+    name = "naming"
+
+    def __init__(self, pattern: str = r"\S(.*\S)?", type=ModelElement) -> None:
+        self.pattern = pattern
+        self.type = type
+        self._compiled = _re.compile(pattern)
+
+    def check(self, path, element):
+        if isinstance(element, Dependency):
+            return
+        if self._compiled.fullmatch(element.name) is None:
+            yield "name {!r} does not match {!r}".format(element.name, self.pattern)
+
+
+class OrphanRequirementRule(Rule):
+    """Every requirement must be at one end of a dependency, such as a
+    satisfy or derive requirement relationship"""
+
+    name = "orphan-requirement"
+    type = (Requirement, Dependency)
+
+    def facts(self, path, element):
+        # requirements are recorded with their path, dependency ends without
+        if isinstance(element, Requirement):
+            yield (path, str(element.uuid))
+        else:
+            yield (None, str(element.client.uuid))
+            yield (None, str(element.supplier.uuid))
+
+    def finish(self, facts):
+        linked = {uuid for path, uuid in facts if path is None}
+        for path, uuid in facts:
+            if path is not None and uuid not in linked:
+                yield Violation(self.name, path, uuid, "requirement is not linked")
+
+
+class SatisfyClientRule(Rule):
+    """The client of a satisfy relationship must be a block"""
+
+    name = "satisfy-client"
+    type = Satisfy
+
+    def check(self, path, satisfy):
+        if not isinstance(satisfy.client, (Block, PartUsage)):
+            yield "client {!r} is not a block".format(satisfy.client)
+
+
+class MultiplicityRule(Rule):
+    """Multiplicities of blocks and part usages must be whole numbers within
+    bounds
+
+    Parameters
+    ----------
+    minimum : int, default 0
+
+    maximum : int, default None
+
+    """
+
+    name = "multiplicity"
+    type = (Block, PartUsage)
+
+    def __init__(self, minimum: int = 0, maximum: Optional[int] = None) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def check(self, path, element):
+        multiplicity = element.multiplicity
+        if multiplicity != int(multiplicity):
+            yield "multiplicity {} is not a whole number".format(multiplicity)
+        if multiplicity < self.minimum:
+            yield "multiplicity {} is below {}".format(multiplicity, self.minimum)
+        if self.maximum is not None and multiplicity > self.maximum:
+            yield "multiplicity {} is above {}".format(multiplicity, self.maximum)
+
+
+class DuplicateNameRule(Rule):
+    """A name must not be used by more than one kind of block property, as
+    item access only reaches the first"""
+
+    name = "duplicate-name"
+    type = Block
+
+    def check(self, path, block):
+        kinds: dict = {}
+        for kind, elements in block._containers():
+            for key in elements:
+                kinds.setdefault(key, []).append(kind)
+        for key, found in kinds.items():
+            if len(found) > 1:
+                yield "{!r} is used by {}".format(key, " and ".join(found))
+
+
+def default_rules() -> List["Rule"]:
+    """Returns an instance of each built-in rule, with default settings"""
+    return [
+        NamingRule(),
+        OrphanRequirementRule(),
+        SatisfyClientRule(),
+        MultiplicityRule(),
+        DuplicateNameRule(),
+    ]
+
+
+def check_model(
+    model,
+    rules: Optional[List["Rule"]] = None,
+    processes: Optional[int] = None,
+) -> Iterator["Violation"]:
+    """Checks model against rules, yielding violations as the checks of each
+    top-level package complete
+
+    Violations are yielded package by package, in the order of the packages
+    in model, after those of model itself and of the elements it owns outside
+    packages. Violations found by `Rule.finish` come last.
+
+    Parameters
+    ----------
+    model : ModelElement
+
+    rules : list of Rule, default None
+        Rules to check, the built-in rules if None
+
+    processes : int, default None
+        Number of worker processes to spread packages over, or None to check
+        them all in this process
+
+    Notes
+    -----
+    An element owned by several packages is checked within each of them.
+
+    Example
+    -------
+    >>> for violation in model.check(processes=8):
+    ...     print("/".join(violation.path), violation.message)
+    structure/starship/nacelle multiplicity -1 is below 0
+    """
+    if not isinstance(model, ModelElement):
+        raise TypeError
+    if rules is None:
+        rules = default_rules()
+    if not all(isinstance(rule, Rule) for rule in rules):
+        raise TypeError
+    return _run(model, rules, processes)
+
+
+def _run(model, rules, processes) -> Iterator["Violation"]:
+    facts: list = [[] for rule in rules]
+    packages = []
+    for kind, key, element in model._children():
+        if isinstance(element, Package):
+            packages.append(((key,), element))
+
+    roots = {id(element) for path, element in packages}
+    elements = model._walk(prune=lambda path, element: id(element) in roots)
+    violations, found = _check(
+        rules,
+        [((), model)] + [item for item in elements if id(item[1]) not in roots],
+    )
+    yield from _merge(violations, found, facts)
+
+    if processes is None:
+        for path, package in packages:
+            yield from _merge(*_check_package(rules, path, package), facts)
+    elif "fork" in _get_all_start_methods():
+        global _shared
+        _shared = (rules, packages)
+        try:
+            with _ProcessPoolExecutor(processes, _get_context("fork")) as executor:
+                for result in executor.map(_check_shared, range(len(packages))):
+                    yield from _merge(*result, facts)
+        finally:
+            _shared = None
+    else:
+        with _ProcessPoolExecutor(processes) as executor:
+            for result in executor.map(
+                _check_package,
+                [rules] * len(packages),
+                [path for path, package in packages],
+                [package for path, package in packages],
+            ):
+                yield from _merge(*result, facts)
+
+    for rule, gathered in zip(rules, facts):
+        yield from rule.finish(gathered)
+
+
+def _check(rules, elements) -> Tuple[list, list]:
+    """Returns the violations found in (path, element) pairs by rules, and
+    the facts gathered by each rule"""
+    violations = []
+    facts: list = [[] for rule in rules]
+    for path, element in elements:
+        for rule, gathered in zip(rules, facts):
+            if not isinstance(element, rule.type):
+                continue
+            for message in rule.check(path, element):
+                violations.append(
+                    Violation(rule.name, path, str(element.uuid), message)
+                )
+            gathered.extend(rule.facts(path, element))
+    return violations, facts
+
+
+def _check_package(rules, path, package) -> Tuple[list, list]:
+    """Checks a package and the elements it owns"""
+    elements = ((path + subpath, element) for subpath, element in package._walk())
+    return _check(rules, _chain([(path, package)], elements))
+
+
+def _check_shared(index) -> Tuple[list, list]:
+    """Checks a package of the model shared with forked workers"""
+    if _shared is None:
+        raise RuntimeError("no model is shared with this worker")
+    rules, packages = _shared
+    return _check_package(rules, *packages[index])
+
+
+def _merge(violations, found, facts) -> list:
+    for gathered, new in zip(facts, found):
+        gathered.extend(new)
+    return violations
@@ -0,0 +1,382 @@
+"""
+The `simulation.py` module executes behavior models for Monte Carlo studies:
+many instances of a compiled state machine side by side, and many runs of an
+activity by token flow.
+"""
+
+from sysml.elements.behavior import Activity, ActivityGraph
+from sysml.elements.behavior import StateMachine, TransitionTable
+from array import array as _array
+from collections import Counter as _Counter
+from collections import namedtuple as _namedtuple
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from heapq import heappop as _heappop
+from heapq import heappush as _heappush
+from math import isnan as _isnan
+from math import nan as _NAN
+from types import ModuleType as _ModuleType
+from typing import Dict, List, Optional, Sequence, Union
+
+_numpy: Optional[_ModuleType]
+try:
+    import numpy as _numpy
+except ImportError:
+    _numpy = None
+
+
+class Simulation:
+    """This class defines a simulation of independent instances of a state
+    machine
+
+    The state of every instance is kept as a state code in one array. Events
+    are looked up in the transition table of the machine, for all instances
+    at once with numpy when it is installed; only entries with guards or
+    actions call back into Python, once per instance that reaches them.
+
+    Parameters
+    ----------
+    machine : StateMachine or TransitionTable
+
+    instances : int, default 1
+
+    Example
+    -------
+    >>> simulation = sysml.Simulation(machine, instances=100000)
+    >>> simulation.step(numpy.random.randint(0, 3, 100000))
+    >>> simulation.counts()
+    {'idle': 33412, 'docked': 66588}
+    """
+
+    def __init__(
+        self,
+        machine: Union["StateMachine", "TransitionTable"],
+        instances: int = 1,
+    ) -> None:
+        if isinstance(machine, StateMachine):
+            machine = machine.compile()
+        if not isinstance(machine, TransitionTable):
+            raise TypeError
+        if type(instances) is not int:
+            raise TypeError
+        if instances < 1:
+            raise ValueError("instances must be positive")
+        self._table = machine
+        self._states = _array("l", [machine.initial]) * instances
+
+    def __len__(self):
+        return len(self._states)
+
+    @property
+    def table(self) -> "TransitionTable":
+        return self._table
+
+    @property
+    def states(self) -> memoryview:
+        """State codes of the instances"""
+        return memoryview(self._states).toreadonly()
+
+    def state(self, instance: int = 0) -> str:
+        """Returns the name of the current state of an instance"""
+        return self._table.states[self._states[instance]]
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of instances in each state"""
+        if _numpy is not None:
+            totals = _numpy.bincount(
+                _numpy.frombuffer(self._states, "l"),
+                minlength=len(self._table.states),
+            ).tolist()
+        else:
+            counter = _Counter(self._states)
+            totals = [counter[code] for code in range(len(self._table.states))]
+        return dict(zip(self._table.states, totals))
+
+    def reset(self) -> None:
+        """Returns every instance to the initial state"""
+        self._states[:] = _array("l", [self._table.initial]) * len(self._states)
+
+    def send(self, event: Union[str, int]) -> None:
+        """Sends the same event to every instance
+
+        Parameters
+        ----------
+        event : string or int
+            Event name or code
+
+        """
+        if isinstance(event, str):
+            event = self._table.event_code(event)
+        self.step(_array("l", [event]) * len(self._states))
+
+    def step(self, events: Sequence) -> None:
+        """Sends one event to each instance
+
+        Parameters
+        ----------
+        events : sequence of string or int
+            Event name or code for each instance, or -1 for no event. Arrays
+            and numpy arrays of codes are processed without a Python loop
+            when numpy is installed.
+
+        """
+        if len(events) != len(self._states):
+            raise ValueError("expected one event per instance")
+        events = self._event_codes(events)
+        table = self._table
+        width = len(table.events)
+        if not width:
+            return
+
+        if _numpy is not None:
+            states = _numpy.frombuffer(self._states, "l")
+            codes = _numpy.frombuffer(events, "l")
+            active = codes >= 0
+            targets = _numpy.frombuffer(table.table, "l")[
+                _numpy.where(active, states * width + codes, 0)
+            ]
+            targets[~active] = -1
+            moved = targets >= 0
+            states[moved] = targets[moved]
+            for instance in _numpy.flatnonzero(targets <= -2).tolist():
+                states[instance] = table.fire(
+                    self._states[instance], events[instance], instance
+                )
+            return
+
+        states = self._states
+        entries = table.table
+        fire = table.fire
+        for instance, event in enumerate(events):
+            if event < 0:
+                continue
+            state = states[instance]
+            target = entries[state * width + event]
+            if target >= 0:
+                states[instance] = target
+            elif target <= -2:
+                states[instance] = fire(state, event, instance)
+
+    def run(self, events: Sequence, instance: int = 0) -> str:
+        """Sends a sequence of events, in order, to one instance and returns
+        the name of the state it ends in
+
+        Parameters
+        ----------
+        events : sequence of string or int
+            Event names or codes, or -1 for no event
+
+        instance : int, default 0
+
+        """
+        events = self._event_codes(events)
+        table = self._table
+        width = len(table.events)
+        entries = table.table
+        fire = table.fire
+        state = self._states[instance]
+        for event in events:
+            if event < 0:
+                continue
+            target = entries[state * width + event]
+            if target >= 0:
+                state = target
+            elif target <= -2:
+                state = fire(state, event, instance)
+        self._states[instance] = state
+        return table.states[state]
+
+    def _event_codes(self, events) -> "_array":
+        """Returns events, given as names or codes, as an array of codes"""
+        if _numpy is not None and isinstance(events, _numpy.ndarray):
+            codes = _array("l")
+            codes.frombytes(_numpy.ascontiguousarray(events, "l").tobytes())
+        elif isinstance(events, _array) and events.typecode == "l":
+            codes = events
+        else:
+            lookup = self._table.event_code
+            codes = _array(
+                "l",
+                (event if type(event) is int else lookup(event) for event in events),
+            )
+        if codes and not -1 <= min(codes) <= max(codes) < len(self._table.events):
+            raise ValueError("unknown event code")
+        return codes
+
+
+Timeline = _namedtuple("Timeline", ["finish", "starts", "ends"])
+Timeline.__doc__ = """The outcome of one run of an activity
+
+finish is the time the run ended, at an activity final node or when no
+tokens were left. starts and ends are arrays, indexed by node number, of the
+time each node first started and last completed, NaN for nodes that never
+ran."""
+
+
+class ActivityEngine:
+    """This class defines an engine that runs an activity by moving tokens
+    through its compiled flow graph
+
+    Nodes that are ready to offer tokens wait in a queue ordered by time: an
+    action is queued for the time it completes, other nodes for the time
+    they receive a token. Actions and join nodes start once every incoming
+    flow holds a token, consuming one token from each.
+
+    Parameters
+    ----------
+    activity : Activity or ActivityGraph
+
+    limit : int, default 1000000
+        Maximum number of nodes started in one run, which bounds runs of
+        activities that loop forever
+
+    Notes
+    -----
+    Durations and guards are called with the run number, so that random
+    draws can be seeded per run and reproduced. Runs are independent of each
+    other and may be spread over processes, in which case durations and
+    guards must be picklable module-level functions.
+
+    Example
+    -------
+    >>> engine = sysml.ActivityEngine(mission)
+    >>> finish = [timeline.finish for timeline in engine.run(10000, processes=4)]
+    """
+
+    def __init__(
+        self, activity: Union["Activity", "ActivityGraph"], limit: int = 1000000
+    ) -> None:
+        if isinstance(activity, Activity):
+            activity = activity.compile()
+        if not isinstance(activity, ActivityGraph):
+            raise TypeError
+        self._graph = activity
+        self._limit = limit
+
+    @property
+    def graph(self) -> "ActivityGraph":
+        return self._graph
+
+    def run(
+        self, runs: int = 1, start: int = 0, processes: Optional[int] = None
+    ) -> List["Timeline"]:
+        """Runs the activity and returns the timeline of each run
+
+        Parameters
+        ----------
+        runs : int, default 1
+            Number of runs
+
+        start : int, default 0
+            Run number of the first run
+
+        processes : int, default None
+            Number of worker processes to spread runs over, or None to run
+            them all in this process
+
+        """
+        numbers = range(start, start + runs)
+        if processes is None:
+            return _run_activity(self._graph, numbers, self._limit)
+        size = max(1, -(-runs // (processes * 4)))
+        chunks = [numbers[i : i + size] for i in range(0, runs, size)]
+        timelines: List["Timeline"] = []
+        with _ProcessPoolExecutor(processes) as executor:
+            for chunk in executor.map(
+                _run_activity,
+                [self._graph] * len(chunks),
+                chunks,
+                [self._limit] * len(chunks),
+            ):
+                timelines.extend(chunk)
+        return timelines
+
+
+_ACTION, _INITIAL, _FINAL, _FORK, _JOIN, _DECISION, _MERGE = range(7)
+
+
+def _run_activity(graph, numbers, limit) -> List["Timeline"]:
+    """Returns the timelines of runs of graph with the given run numbers"""
+    kinds = graph.kinds
+    durations = graph.durations
+    guards = graph.guards
+    targets = graph.targets
+    out_offsets = graph.out_offsets
+    outgoing = graph.outgoing
+    in_offsets = graph.in_offsets
+    incoming = graph.incoming
+    size = len(graph.nodes)
+    waiting = [
+        in_offsets[node + 1] - in_offsets[node] > 1 and kinds[node] in (_ACTION, _JOIN)
+        for node in range(size)
+    ]
+    initial = [node for node in range(size) if kinds[node] == _INITIAL]
+    unset = _array("d", [_NAN]) * size
+    empty_flows = _array("l", [0]) * len(targets)
+    empty_nodes = _array("l", [0]) * size
+
+    timelines = []
+    for run in numbers:
+        starts = unset[:]
+        ends = unset[:]
+        tokens = empty_flows[:]
+        filled = empty_nodes[:]
+        queue = [(0.0, order, node) for order, node in enumerate(initial)]
+        for node in initial:
+            starts[node] = 0.0
+        order = len(queue)
+        started = 0
+        now = 0.0
+        while queue:
+            now, _, node = _heappop(queue)
+            ends[node] = now
+            kind = kinds[node]
+            if kind == _FINAL:
+                break
+
+            flows = outgoing[out_offsets[node] : out_offsets[node + 1]]
+            if kind == _DECISION:
+                chosen = None
+                for flow in flows:
+                    guard = guards[flow]
+                    if guard is None:
+                        if chosen is None:
+                            chosen = flow
+                    elif guard(run):
+                        chosen = flow
+                        break
+                flows = () if chosen is None else (chosen,)
+            else:
+                flows = [
+                    flow for flow in flows if guards[flow] is None or guards[flow](run)
+                ]
+
+            for flow in flows:
+                target = targets[flow]
+                if waiting[target]:
+                    tokens[flow] += 1
+                    if tokens[flow] == 1:
+                        filled[target] += 1
+                    if filled[target] < in_offsets[target + 1] - in_offsets[target]:
+                        continue
+                    for entering in incoming[
+                        in_offsets[target] : in_offsets[target + 1]
+                    ]:
+                        tokens[entering] -= 1
+                        if tokens[entering] == 0:
+                            filled[target] -= 1
+
+                started += 1
+                if started > limit:
+                    raise RuntimeError(
+                        "run {} started more than {} nodes".format(run, limit)
+                    )
+                if _isnan(starts[target]):
+                    starts[target] = now
+                finish = now
+                if kinds[target] == _ACTION:
+                    duration = durations[target]
+                    finish += duration(run) if callable(duration) else duration
+                _heappush(queue, (finish, order, target))
+                order += 1
+        timelines.append(Timeline(now, starts, ends))
+    return timelines
@@ -0,0 +1,470 @@
+"""
+The `store.py` module keeps model elements in a local SQLite database, so that
+models too large to hold in memory can be opened, queried and edited a
+subtree at a time.
+"""
+
+from sysml.elements.base import ModelElement, Dependency, _REFERENCE_KINDS
+from sysml.elements.behavior import MessageLog
+from sysml.elements.requirements import Requirement
+from collections import OrderedDict as _OrderedDict
+from importlib import import_module as _import_module
+from itertools import chain as _chain
+from weakref import WeakValueDictionary as _WeakValueDictionary
+import json as _json
+import sqlite3 as _sqlite3
+from typing import Iterator, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS elements (
+    uuid TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    reqt_id TEXT,
+    fields TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS elements_type ON elements (type);
+CREATE INDEX IF NOT EXISTS elements_name ON elements (name);
+CREATE INDEX IF NOT EXISTS elements_reqt_id ON elements (reqt_id);
+CREATE TABLE IF NOT EXISTS containment (
+    parent TEXT NOT NULL,
+    attribute TEXT NOT NULL,
+    key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    child TEXT NOT NULL,
+    PRIMARY KEY (parent, attribute, key)
+);
+CREATE INDEX IF NOT EXISTS containment_child ON containment (child);
+CREATE TABLE IF NOT EXISTS links (
+    parent TEXT NOT NULL,
+    attribute TEXT NOT NULL,
+    key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    target TEXT NOT NULL,
+    PRIMARY KEY (parent, attribute, key)
+);
+CREATE INDEX IF NOT EXISTS links_target ON links (target);
+CREATE TABLE IF NOT EXISTS dependencies (
+    uuid TEXT PRIMARY KEY,
+    client TEXT NOT NULL,
+    supplier TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dependencies_client ON dependencies (client);
+CREATE INDEX IF NOT EXISTS dependencies_supplier ON dependencies (supplier);
+CREATE TABLE IF NOT EXISTS roots (uuid TEXT PRIMARY KEY);
+"""
+
+_SUBTREE = """
+WITH RECURSIVE subtree (uuid) AS (
+    SELECT ?
+    UNION
+    SELECT containment.child FROM containment
+    JOIN subtree ON containment.parent = subtree.uuid
+)
+"""
+
+
+class ModelStore:
+    """This class defines a SQLite-backed store of model elements
+
+    Elements, the collections that own them, the collections that refer to
+    them, such as block references, and dependency endpoints are kept in
+    indexed tables. Elements are built only when requested, together with
+    everything they own, and edits to them are written back by `flush`.
+
+    Parameters
+    ----------
+    path : string, default ":memory:"
+
+    batch_size : int, default 10000
+        Number of rows sent to SQLite per statement when writing
+
+    Example
+    -------
+    >>> with sysml.ModelStore("program.db") as store:
+    ...     store.save(model)
+    ...     for requirement in store.find(type=sysml.Requirement, id="REQ-12"):
+    ...         requirement.txt = "revised"
+    ...     store.flush()
+    """
+
+    def __init__(self, path: str = ":memory:", batch_size: int = 10000) -> None:
+        self._connection = _sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._batch_size = batch_size
+        self._elements: "_WeakValueDictionary" = _WeakValueDictionary()
+        self._roots: dict = {}
+        self._found: "_WeakValueDictionary" = _WeakValueDictionary()
+        self._saved: dict = {}
+        self._types: dict = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM elements").fetchone()[0]
+
+    def close(self) -> None:
+        """Closes the database, discarding edits that were not flushed"""
+        self._connection.close()
+
+    def roots(self) -> List[str]:
+        """Returns the uuids of the elements saved with `save`"""
+        return [row[0] for row in self._connection.execute("SELECT uuid FROM roots")]
+
+    def save(self, element) -> None:
+        """Writes element and every element it owns to the store, and tracks
+        them for `flush`"""
+        if not isinstance(element, ModelElement):
+            raise TypeError
+        self._connection.execute(
+            "INSERT OR IGNORE INTO roots VALUES (?)", (str(element.uuid),)
+        )
+        self._track(element)
+        self.flush()
+
+    def get(self, uuid, validate: bool = False) -> "ModelElement":
+        """Returns the element with the given uuid, building it and every
+        element it owns if they are not already loaded
+
+        Parameters
+        ----------
+        uuid : uuid.UUID or string
+
+        validate : bool, default False
+            Check the fields of the elements built, raising a TypeError if
+            any fails. Elements are otherwise trusted to be stored as written.
+
+        """
+        uuid = str(uuid)
+        element = self._elements.get(uuid)
+        if element is None:
+            element = self._load(uuid)
+            if validate:
+                element.validate()
+        self._track(element)
+        return element
+
+    def find(
+        self,
+        type: Optional[type] = None,
+        name: Optional[str] = None,
+        id: Optional[str] = None,
+    ) -> Iterator["ModelElement"]:
+        """Yields the stored elements of a type, subclasses included, with a
+        name and with a requirement id, using the table indexes. Elements are
+        built as they are yielded.
+
+        Notes
+        -----
+        Elements found are tracked for `flush` only for as long as they are
+        referenced elsewhere, so edits to an element must be flushed before
+        it is dropped. Use `get` to keep an element tracked until released.
+        """
+        clauses = []
+        parameters: list = []
+        if type is not None:
+            types = [type]
+            for cls in types:
+                types.extend(cls.__subclasses__())
+            clauses.append("type IN ({})".format(", ".join("?" * len(types))))
+            parameters.extend(_qualname(cls) for cls in types)
+        if name is not None:
+            clauses.append("name = ?")
+            parameters.append(name)
+        if id is not None:
+            clauses.append("reqt_id = ?")
+            parameters.append(id)
+        query = "SELECT uuid FROM elements"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        rows = self._connection.execute(query, parameters)
+        while True:
+            batch = rows.fetchmany(self._batch_size)
+            if not batch:
+                break
+            for (uuid,) in batch:
+                element = self._elements.get(uuid)
+                if element is None:
+                    element = self._load(uuid)
+                self._found[uuid] = element
+                yield element
+
+    def release(self, element) -> None:
+        """Stops tracking an element returned by `get`, `find` or `save`, so
+        that it can be freed once unreferenced. Unflushed edits are lost."""
+        self._roots.pop(str(element.uuid), None)
+        self._found.pop(str(element.uuid), None)
+
+    def flush(self) -> None:
+        """Writes back, in one transaction, every tracked element whose
+        content hash differs from the last one written or loaded. Subtrees
+        with unchanged hashes are skipped."""
+        elements: list = []
+        dependencies: list = []
+        containment: list = []
+        links: list = []
+        parents: list = []
+        removed: set = set()
+        written: dict = {}
+
+        with self._connection:
+            roots = list(_chain(self._roots.values(), self._found.values()))
+            for root in roots:
+                root.content_hash
+                stack = [root]
+                while stack:
+                    element = stack.pop()
+                    uuid = str(element.uuid)
+                    previous = self._saved.get(uuid)
+                    if previous == element._hash or uuid in written:
+                        continue
+                    elements.append(_row(element))
+                    written[uuid] = element._hash
+                    self._elements[uuid] = element
+                    if isinstance(element, Dependency):
+                        dependencies.append(
+                            (uuid, str(element.client.uuid), str(element.supplier.uuid))
+                        )
+                    children = set()
+                    for kind, attribute, value in _collections(element):
+                        rows = links if kind in _REFERENCE_KINDS else containment
+                        for position, (key, child) in enumerate(value.items()):
+                            rows.append(
+                                (uuid, attribute, key, position, str(child.uuid))
+                            )
+                            children.add(str(child.uuid))
+                    if previous is not None:
+                        removed.update(
+                            child
+                            for (child,) in self._connection.execute(
+                                "SELECT child FROM containment WHERE parent = ? "
+                                "UNION SELECT target FROM links WHERE parent = ?",
+                                (uuid, uuid),
+                            )
+                            if child not in children
+                        )
+                    parents.append((uuid,))
+                    for kind, owned in element._containers():
+                        if kind not in _REFERENCE_KINDS:
+                            stack.extend(owned.values())
+                    if len(elements) >= self._batch_size:
+                        self._write(elements, dependencies, parents, containment, links)
+            self._write(elements, dependencies, parents, containment, links)
+            self._saved.update(written)
+            self._delete_orphans(removed)
+
+    def _write(self, elements, dependencies, parents, containment, links) -> None:
+        execute = self._connection.executemany
+        execute("INSERT OR REPLACE INTO elements VALUES (?, ?, ?, ?, ?)", elements)
+        execute("INSERT OR REPLACE INTO dependencies VALUES (?, ?, ?)", dependencies)
+        execute("DELETE FROM containment WHERE parent = ?", parents)
+        execute("DELETE FROM links WHERE parent = ?", parents)
+        execute("INSERT INTO containment VALUES (?, ?, ?, ?, ?)", containment)
+        execute("INSERT INTO links VALUES (?, ?, ?, ?, ?)", links)
+        for rows in (elements, dependencies, parents, containment, links):
+            rows.clear()
+
+    def _delete_orphans(self, removed) -> None:
+        """Deletes elements no longer owned or referenced by any stored
+        element, then the elements that only they owned or referred to"""
+        execute = self._connection.execute
+        stack = list(removed)
+        while stack:
+            uuid = stack.pop()
+            kept = execute(
+                "SELECT 1 FROM containment WHERE child = ? "
+                "UNION SELECT 1 FROM links WHERE target = ? "
+                "UNION SELECT 1 FROM roots WHERE uuid = ? "
+                "UNION SELECT 1 FROM dependencies WHERE client = ? OR supplier = ?",
+                (uuid, uuid, uuid, uuid, uuid),
+            ).fetchone()
+            if kept is not None:
+                continue
+            # elements owned or referred to only by this one become orphans
+            # once it is deleted, and are checked again
+            for row in execute(
+                "SELECT child FROM containment WHERE parent = ? "
+                "UNION SELECT target FROM links WHERE parent = ? "
+                "UNION SELECT client FROM dependencies WHERE uuid = ? "
+                "UNION SELECT supplier FROM dependencies WHERE uuid = ?",
+                (uuid, uuid, uuid, uuid),
+            ):
+                stack.append(row[0])
+            for table, column in (
+                ("elements", "uuid"),
+                ("dependencies", "uuid"),
+                ("containment", "parent"),
+                ("links", "parent"),
+            ):
+                execute("DELETE FROM {} WHERE {} = ?".format(table, column), (uuid,))
+            self._saved.pop(uuid, None)
+
+    def _load(self, root) -> "ModelElement":
+        """Builds the element with the given uuid and every element it owns,
+        then the elements they refer to, such as the endpoints of
+        dependencies"""
+        pending = [root]
+        built: list = []
+        linked: list = []
+        while pending:
+            uuid = pending.pop()
+            if uuid in self._elements:
+                continue
+            rows = self._connection.execute(
+                _SUBTREE + "SELECT elements.uuid, type, fields FROM elements "
+                "JOIN subtree ON elements.uuid = subtree.uuid",
+                (uuid,),
+            ).fetchall()
+            if not rows:
+                raise KeyError(uuid)
+            created = {}
+            for uuid_, type_, fields in rows:
+                if uuid_ not in self._elements:
+                    element = self._build(uuid_, type_, _json.loads(fields))
+                    self._elements[uuid_] = element
+                    created[uuid_] = element
+
+            for parent, attribute, key, child in self._connection.execute(
+                _SUBTREE + "SELECT parent, attribute, key, child FROM containment "
+                "JOIN subtree ON containment.parent = subtree.uuid "
+                "ORDER BY parent, attribute, position",
+                (uuid,),
+            ):
+                if parent in created:
+                    element = created[parent]
+                    element.__dict__[attribute][key] = self._elements[child]
+
+            for parent, attribute, key, target in self._connection.execute(
+                _SUBTREE + "SELECT parent, attribute, key, target FROM links "
+                "JOIN subtree ON links.parent = subtree.uuid "
+                "ORDER BY parent, attribute, position",
+                (uuid,),
+            ):
+                if parent in created:
+                    collection = created[parent].__dict__[attribute]
+                    collection[key] = _Pending(target)
+                    linked.append((collection, key, target))
+                    pending.append(target)
+
+            for element in created.values():
+                for attribute, value in element.__getstate__().items():
+                    if isinstance(value, _Pending):
+                        pending.append(value.uuid)
+            built.extend(created.values())
+
+        for element in built:
+            for attribute, value in element.__getstate__().items():
+                if isinstance(value, _Pending):
+                    setattr(element, attribute, self._elements[value.uuid])
+        for collection, key, target in linked:
+            collection[key] = self._elements[target]
+        for element in built:
+            element.content_hash
+            self._saved[str(element.uuid)] = element._hash
+        return self._elements[root]
+
+    def _build(self, uuid, type_, fields) -> "ModelElement":
+        """Creates an element from stored fields, without calling its
+        constructor"""
+        cls = self._types.get(type_)
+        if cls is None:
+            module, name = type_.rsplit(".", 1)
+            cls = self._types[type_] = getattr(_import_module(module), name)
+        state: dict = {
+            attribute: _OrderedDict() for attribute in fields.pop("__collections__")
+        }
+        for attribute, target in fields.pop("__references__").items():
+            state[attribute] = _Pending(target)
+        for attribute, log in fields.pop("__messages__", {}).items():
+            state[attribute] = _message_log(log)
+        state.update(fields)
+        return cls.restore(uuid, state)
+
+    def _track(self, element) -> None:
+        self._roots[str(element.uuid)] = element
+
+
+class _Pending:
+    """Placeholder for an element that is loaded after the element
+    referring to it"""
+
+    __slots__ = ("uuid",)
+
+    def __init__(self, uuid):
+        self.uuid = uuid
+
+
+def _qualname(cls) -> str:
+    return "{}.{}".format(cls.__module__, cls.__qualname__)
+
+
+def _collections(element):
+    """Yields the kind, attribute name and value of each collection of model
+    elements subsumed by element"""
+    attributes = {
+        id(value): attribute
+        for attribute, value in getattr(element, "__dict__", {}).items()
+    }
+    for kind, value in element._containers():
+        if id(value) in attributes:
+            yield kind, attributes[id(value)], value
+
+
+def _row(element) -> tuple:
+    """Returns the elements table row of element. Fields holding an element,
+    such as the client of a dependency, are stored by uuid under
+    "__references__", and message logs as lists under "__messages__".
+    Callable fields, such as guards, cannot be stored and raise a
+    TypeError."""
+    collections = {attribute for kind, attribute, value in _collections(element)}
+    references: dict = {}
+    messages: dict = {}
+    fields: dict = {
+        "__collections__": sorted(collections),
+        "__references__": references,
+        "__messages__": messages,
+    }
+    for attribute, value in element.__getstate__().items():
+        if attribute in collections or attribute == "_uuid":
+            continue
+        if isinstance(value, ModelElement):
+            references[attribute] = str(value.uuid)
+        elif isinstance(value, MessageLog):
+            messages[attribute] = {
+                "lifelines": list(value._lifelines),
+                "senders": value._senders.tolist(),
+                "receivers": value._receivers.tolist(),
+                "timestamps": value._timestamps.tolist(),
+                "kinds": value._kinds.tolist(),
+                "sorted": bool(value._sorted),
+            }
+        elif callable(value):
+            raise TypeError(
+                "{!r} cannot be stored: {} is the callable {!r}".format(
+                    element, attribute, value
+                )
+            )
+        else:
+            fields[attribute] = value
+    return (
+        str(element.uuid),
+        _qualname(type(element)),
+        element.name,
+        element._id if isinstance(element, Requirement) else None,
+        _json.dumps(fields),
+    )
+
+
+def _message_log(fields) -> "MessageLog":
+    """Rebuilds a message log from the lists `_row` stores it as"""
+    log = MessageLog(fields["lifelines"])
+    log._senders.extend(fields["senders"])
+    log._receivers.extend(fields["receivers"])
+    log._timestamps.extend(fields["timestamps"])
+    log._kinds.extend(fields["kinds"])
+    log._sorted = fields["sorted"]
+    return log
@@ -2,9 +2,44 @@
 The `model.py` module is used to instantiate a central namespace for a SysML
 model by subsuming elements into mode elements or model relations.
 """
-from sysml.elements import Package
+
+from sysml.elements import ModelElement, Package
+from sysml.elements.base import _REFERENCE_KINDS, _weaken
+from sysml.instrumentation import _probe
+from sysml.jsonl import write_jsonl as _write_jsonl
+from sysml.memory import MemoryReport as _MemoryReport
+from sysml.memory import memory_usage as _memory_usage
+from sysml.query import Query as _Query
+from sysml.rules import Rule as _Rule
+from sysml.rules import Violation as _Violation
+from sysml.rules import check_model as _check_model
+import asyncio as _asyncio
+from collections import OrderedDict as _OrderedDict
+from concurrent.futures import Executor as _Executor
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from io import StringIO as _StringIO
+from os import makedirs as _makedirs
+from os import path as _path
+from os import remove as _remove
+from os import replace as _replace
+from threading import Event as _Event
+from typing import Callable, Iterator, List, Optional, Union
 from yaml import dump as _dump
 from yaml import load as _load
+from yaml import safe_dump as _safe_dump
+from yaml import safe_load as _safe_load
+
+try:
+    from yaml import CDumper as _Dumper
+    from yaml import CLoader as _Loader
+except ImportError:
+    from yaml import Dumper as _Dumper  # type: ignore[assignment]
+    from yaml import Loader as _Loader  # type: ignore[assignment]
+
+_MANIFEST = "manifest.yaml"
+_REFERENCE_TAG = "!sysml/ref"
+_CHUNK_SIZE = 1 << 20
+_CHECK_INTERVAL = 1000
 
 
 class Model(Package):
@@ -13,6 +48,7 @@ class Model(Package):
     elements) of a system.
     """
 
+    @_probe("Model.to_yaml")
     def to_yaml(self, filename: str) -> None:
         """ Write this Project to a yaml file """
         if type(filename) is str:
@@ -21,17 +57,697 @@ class Model(Package):
         else:
             raise TypeError
 
+    @_probe("Model.to_directory")
+    def to_directory(self, path: str) -> None:
+        """Write this model to a directory, as one yaml file per top-level
+        package plus a manifest listing each package file and the elements it
+        references in other files. Package files whose content hash matches
+        the manifest already in the directory are not rewritten, unless an
+        element they reference is no longer placed in any file."""
+        if type(path) is not str:
+            raise TypeError
+        _makedirs(_path.join(path, "packages"), exist_ok=True)
+        manifest = _path.join(path, _MANIFEST)
+        previous = {}
+        if _path.exists(manifest):
+            with open(manifest, "r") as f:
+                for entry in _safe_load(f)["packages"]:
+                    previous[entry["uuid"]] = entry
+
+        packages = [
+            element
+            for element in self._elements.values()
+            if isinstance(element, Package)
+        ]
+        roots = {id(self)}
+        roots.update(id(package) for package in packages)
+        owned = {root: _owned_elements(root, roots) for root in [self] + packages}
+        placed = set().union(*owned.values())
+        placed_uuids: Optional[set] = None
+
+        entries = []
+        for package in packages:
+            entry = previous.pop(str(package.uuid), None)
+            digest = package.content_hash
+            stale = (
+                entry is None
+                or entry["hash"] != digest
+                or not _path.exists(_path.join(path, entry["file"]))
+            )
+            if not stale and entry["references"]:
+                # elements it refers to may have left the files they were in
+                if placed_uuids is None:
+                    placed_uuids = {
+                        str(element.uuid)
+                        for elements in owned.values()
+                        for element in elements.values()
+                    }
+                stale = not placed_uuids.issuperset(entry["references"])
+            if stale:
+                filename = "packages/{}.yaml".format(package.uuid)
+                references = _write_unit(
+                    _path.join(path, filename), package, owned[package], placed
+                )
+                entry = {
+                    "uuid": str(package.uuid),
+                    "name": package.name,
+                    "file": filename,
+                    "hash": digest,
+                    "references": sorted(references),
+                }
+            entries.append(entry)
+        references = _write_unit(
+            _path.join(path, "model.yaml"), self, owned[self], placed
+        )
+        for entry in previous.values():
+            if _path.exists(_path.join(path, entry["file"])):
+                _remove(_path.join(path, entry["file"]))
+
+        with open(manifest, "w") as f:
+            f.write(
+                _safe_dump(
+                    {
+                        "model": "model.yaml",
+                        "references": sorted(references),
+                        "packages": entries,
+                    }
+                )
+            )
+
+    def to_jsonl(
+        self, filename: str, shard_size: Optional[int] = None, chunk_size: int = 10000
+    ) -> List[str]:
+        """Write this model to a JSON Lines file, one record per element, or
+        to shards of at most shard_size records, returning the names of the
+        files written. See `write_jsonl`."""
+        return _write_jsonl(self, filename, shard_size, chunk_size)
+
+    @_probe("Model.asave")
+    async def asave(
+        self,
+        filename: str,
+        executor: Optional["_Executor"] = None,
+        progress: Optional[Callable] = None,
+        chunk_size: int = _CHUNK_SIZE,
+    ) -> None:
+        """Write this model to a yaml file without blocking the event loop
+
+        The model is serialized in an executor, then written in chunks to a
+        temporary file that replaces filename once complete, so cancelling
+        leaves any existing file untouched. The model must not be edited
+        until the write completes.
+
+        Parameters
+        ----------
+        filename : string
+
+        executor : concurrent.futures.Executor, default None
+            Executor to offload work to, the event loop's default if None
+
+        progress : callable, default None
+            Called on the event loop as progress(phase, done, total), where
+            phase is "serialize" or "write" and total may be None
+
+        chunk_size : int, default 1 MiB
+
+        """
+        if type(filename) is not str:
+            raise TypeError
+        loop = _asyncio.get_running_loop()
+        cancelled = _Event()
+        partial = filename + ".partial"
+        try:
+            text = await loop.run_in_executor(
+                executor, _serialize, self, *_hooks(loop, executor, cancelled, progress)
+            )
+            data = text.encode()
+            with open(partial, "wb") as f:
+                for start in range(0, len(data), chunk_size):
+                    chunk = data[start : start + chunk_size]
+                    await loop.run_in_executor(executor, f.write, chunk)
+                    if progress is not None:
+                        progress("write", start + len(chunk), len(data))
+            _replace(partial, filename)
+        except BaseException:
+            cancelled.set()
+            if _path.exists(partial):
+                _remove(partial)
+            raise
+
+    def fork(self) -> "Model":
+        """Returns a copy-on-write variant of this model
+
+        Packages, blocks and other owned elements are shared with this model
+        until they are reached through the variant, by item access or through
+        the views returned by the `elements`/`parts`/`values`/`constraints`/
+        `flows` properties, at which point the variant takes a shallow copy of
+        them. Listing names through a view copies nothing. Edits made through
+        the variant are therefore never seen by this model.
+
+        Notes
+        -----
+        Edits made to this model while a variant is alive are seen by the
+        variant wherever it has not yet copied the edited element.
+        Relationships copied into a variant still refer to the client and
+        supplier elements of this model.
+        """
+        return _Fork(self).clone(self)
+
+    def merge(self, variant: "Model") -> None:
+        """Replaces the content of this model with that of variant, a fork
+        of this model, and discards variant
+
+        Relationships, references and part usages that refer to elements the
+        variant has copied are pointed at the copies.
+        """
+        fork = variant._fork
+        if type(variant) is not type(self) or fork is None or fork.base is not self:
+            raise ValueError("{!r} is not a fork of {!r}".format(variant, self))
+        clones = {}
+        for key, (original, clone) in fork.clones.items():
+            # owners and hashes recorded in the variant may point into it
+            clone._fork = None
+            clone._owners = ()
+            clone._hash = None
+            clones[key] = clone
+        fork.seal()
+        self.__dict__.update(variant.__getstate__())
+        for element in self._elements.values():
+            variant._release(element)
+        for path, element in self.walk():
+            _rehome(element, clones)
+        self._touch()
+        variant.__dict__.update(_elements=_OrderedDict())
+
+    def discard(self) -> None:
+        """Discards this variant, releasing every element it has copied"""
+        fork = self._fork
+        if fork is None or fork.root is not self:
+            raise ValueError("{!r} is not a fork".format(self))
+        fork.release()
+        fork.seal()
+        self._elements = _OrderedDict()
+        self._touch()
+
+    def query(
+        self,
+        type: Optional[type] = None,
+        where: Optional[Union[dict, Callable]] = None,
+        under: Optional["ModelElement"] = None,
+    ) -> "_Query":
+        """Returns a lazy query over the elements of this model
+
+        Parameters
+        ----------
+        type : class or tuple of classes, default None
+            Only yield instances of type, subclasses included
+
+        where : dict or callable, default None
+            Either a predicate called with each element, or a dict mapping
+            attribute names to a required value or to a predicate called with
+            the attribute value
+
+        under : ModelElement, default None
+            Only yield elements owned, directly or transitively, by under
+
+        Example
+        -------
+        >>> unsatisfied = model.query(
+        ...     type=sysml.Requirement,
+        ...     where=lambda r: not model.query(
+        ...         type=sysml.Satisfy, where={"supplier": r}
+        ...     ).first(),
+        ... )
+        """
+        return _Query(self, type, where, under)
+
+    def memory_usage(self, tracemalloc: bool = False) -> "_MemoryReport":
+        """Returns the deep size of this model, broken down by element class,
+        attribute, container kind and top-level package
+
+        Parameters
+        ----------
+        tracemalloc : bool, default False
+            Also attribute memory to the lines that allocated it. Requires
+            tracemalloc to have been started before the model was loaded.
+
+        """
+        return _memory_usage(self, tracemalloc)
+
+    def check(
+        self, rules: Optional[List["_Rule"]] = None, processes: Optional[int] = None
+    ) -> Iterator["_Violation"]:
+        """Checks this model against modeling rules, yielding each violation
+        found, package by package. See `check_model`.
+
+        Parameters
+        ----------
+        rules : list of Rule, default None
+            Rules to check, the built-in rules if None
+
+        processes : int, default None
+            Number of worker processes to spread packages over
+
+        """
+        return _check_model(self, rules, processes)
+
     def isValid(self):
         """Checks whether all requirements contained within model are satisfied
         by a «block» and verified by a «testCase»"""
         pass
 
 
-def read_yaml(filename: str) -> "Model":
-    """ Load a project from a yaml file """
+@_probe("read_yaml")
+def read_yaml(filename: str, validate: bool = False) -> "Model":
+    """Load a project from a yaml file
+
+    Parameters
+    ----------
+    filename : string
+
+    validate : bool, default False
+        Check the fields of every element once loaded, raising a TypeError
+        if any fails. Elements are rebuilt without running their
+        constructors, so files from other sources should be validated.
+
+    """
     with open(filename, "r") as f:
-        rv = _load(f.read())
+        rv = _load(f.read(), Loader=_Loader)
         if type(rv) is Model:
+            if validate:
+                rv.validate()
             return rv
         else:
             raise TypeError(type(rv))
+
+
+@_probe("aread")
+async def aread(
+    filename: str,
+    executor: Optional["_Executor"] = None,
+    progress: Optional[Callable] = None,
+    chunk_size: int = _CHUNK_SIZE,
+) -> "Model":
+    """Load a model from a yaml file without blocking the event loop
+
+    The file is read in chunks and parsed in an executor, checking for
+    cancellation every few thousand nodes, so several models can be loaded
+    concurrently alongside other tasks.
+
+    Parameters
+    ----------
+    filename : string
+
+    executor : concurrent.futures.Executor, default None
+        Executor to offload work to, the event loop's default if None. With a
+        process pool, parsing reports no progress and runs to completion even
+        if cancelled.
+
+    progress : callable, default None
+        Called on the event loop as progress(phase, done, total), where phase
+        is "read" or "parse"
+
+    chunk_size : int, default 1 MiB
+
+    Example
+    -------
+    >>> models = await asyncio.gather(sysml.aread("a.yaml"), sysml.aread("b.yaml"))
+    """
+    loop = _asyncio.get_running_loop()
+    cancelled = _Event()
+    try:
+        total = await loop.run_in_executor(executor, _path.getsize, filename)
+        chunks = []
+        done = 0
+        with open(filename, "rb") as f:
+            while True:
+                chunk = await loop.run_in_executor(executor, f.read, chunk_size)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                done += len(chunk)
+                if progress is not None:
+                    progress("read", done, total)
+        rv = await loop.run_in_executor(
+            executor,
+            _parse,
+            b"".join(chunks),
+            *_hooks(loop, executor, cancelled, progress)
+        )
+    except BaseException:
+        cancelled.set()
+        raise
+    if type(rv) is Model:
+        return rv
+    else:
+        raise TypeError(type(rv))
+
+
+@_probe("read_directory")
+def read_directory(
+    path: str, processes: Optional[int] = None, validate: bool = False
+) -> "Model":
+    """Load a model from a directory written by `Model.to_directory`
+
+    Package files are parsed in parallel by a pool of processes, then
+    references between them are resolved by uuid.
+
+    Parameters
+    ----------
+    path : string
+
+    processes : int, default None
+        Number of worker processes, one per CPU if None. With 1, files are
+        parsed in this process.
+
+    validate : bool, default False
+        Check the fields of every element once loaded, raising a TypeError
+        if any fails
+
+    """
+    with open(_path.join(path, _MANIFEST), "r") as f:
+        manifest = _safe_load(f)
+    filenames = [_path.join(path, manifest["model"])]
+    filenames.extend(_path.join(path, entry["file"]) for entry in manifest["packages"])
+
+    if processes == 1 or len(filenames) == 1:
+        units = [_read_unit(filename) for filename in filenames]
+    else:
+        with _ProcessPoolExecutor(processes) as executor:
+            units = list(executor.map(_read_unit, filenames))
+
+    index: dict = {}
+    for unit in units:
+        stack = [unit]
+        while stack:
+            element = stack.pop()
+            index.setdefault(str(element.uuid), element)
+            for kind, elements in element._containers():
+                if kind not in _REFERENCE_KINDS:
+                    stack.extend(
+                        child
+                        for child in elements.values()
+                        if isinstance(child, ModelElement)
+                    )
+
+    seen = set()
+    stack = list(units)
+    while stack:
+        element = stack.pop()
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+        for attribute, value in element.__getstate__().items():
+            if isinstance(value, _Reference):
+                setattr(element, attribute, index[value.uuid])
+            elif isinstance(value, ModelElement):
+                stack.append(value)
+            elif isinstance(value, dict):
+                for key, child in value.items():
+                    if isinstance(child, _Reference):
+                        value[key] = index[child.uuid]
+                    elif isinstance(child, ModelElement):
+                        stack.append(child)
+
+    if type(units[0]) is Model:
+        if validate:
+            units[0].validate()
+        return units[0]
+    else:
+        raise TypeError(type(units[0]))
+
+
+class _Cancelled(Exception):
+    """Raised within an executor to abandon work whose caller was cancelled"""
+
+
+class _ProgressLoader(_Loader):
+    """Loader that reports progress and stops once cancelled"""
+
+    def get_single_data(self):
+        node = self.get_single_node()
+        if node is None:
+            return None
+        self.done = 0
+        self.total = 0
+        seen = set()
+        stack = [node]
+        while stack:
+            node_ = stack.pop()
+            if id(node_) in seen:
+                continue
+            seen.add(id(node_))
+            self.total += 1
+            if type(node_.value) is list:
+                for item in node_.value:
+                    stack.extend(item if type(item) is tuple else (item,))
+        return self.construct_document(node)
+
+    def construct_object(self, node, deep=False):
+        self.done += 1
+        if not self.done % _CHECK_INTERVAL:
+            if self.cancelled.is_set():
+                raise _Cancelled
+            if self.report is not None:
+                self.report("parse", min(self.done, self.total), self.total)
+        return super().construct_object(node, deep)
+
+
+class _ProgressDumper(_Dumper):
+    """Dumper that reports progress and stops once cancelled"""
+
+    done = 0
+
+    def represent_data(self, data):
+        self.done += 1
+        if not self.done % _CHECK_INTERVAL:
+            if self.cancelled.is_set():
+                raise _Cancelled
+            if self.report is not None:
+                self.report("serialize", self.done, None)
+        return super().represent_data(data)
+
+
+def _hooks(loop, executor, cancelled, progress):
+    """Returns the cancellation event and progress callback to pass to work
+    running in executor"""
+    if isinstance(executor, _ProcessPoolExecutor):
+        return None, None
+    if progress is None:
+        return cancelled, None
+
+    def report(phase, done, total):
+        loop.call_soon_threadsafe(progress, phase, done, total)
+
+    return cancelled, report
+
+
+def _parse(data, cancelled, report):
+    if cancelled is None:
+        return _load(data, Loader=_Loader)
+    loader = _ProgressLoader(data)
+    loader.cancelled = cancelled
+    loader.report = report
+    try:
+        return loader.get_single_data()
+    finally:
+        loader.dispose()
+
+
+def _serialize(model, cancelled, report):
+    if cancelled is None:
+        return _dump(model, Dumper=_Dumper)
+    stream = _StringIO()
+    dumper = _ProgressDumper(stream)
+    dumper.cancelled = cancelled
+    dumper.report = report
+    try:
+        dumper.open()
+        dumper.represent(model)
+        dumper.close()
+    finally:
+        dumper.dispose()
+    return stream.getvalue()
+
+
+class _Reference:
+    """Placeholder for an element stored in another file of a model
+    directory"""
+
+    __slots__ = ("uuid",)
+
+    def __init__(self, uuid):
+        self.uuid = uuid
+
+
+class _UnitDumper(_Dumper):
+    """Dumper that writes elements placed in other files as references to
+    their uuid"""
+
+    def __init__(self, stream, owned, placed):
+        super().__init__(stream)
+        self.owned = owned
+        self.placed = placed
+        self.references = set()
+
+    def represent_element(self, element):
+        if id(element) in self.owned or id(element) not in self.placed:
+            return self.represent_object(element)
+        self.references.add(str(element.uuid))
+        return self.represent_scalar(_REFERENCE_TAG, str(element.uuid))
+
+
+class _UnitLoader(_Loader):
+    """Loader that reads references written by `_UnitDumper`"""
+
+    def construct_reference(self, node):
+        return _Reference(self.construct_scalar(node))
+
+
+_UnitDumper.add_multi_representer(
+    ModelElement, _UnitDumper.represent_element  # type: ignore[type-abstract]
+)
+_UnitLoader.add_constructor(_REFERENCE_TAG, _UnitLoader.construct_reference)
+
+
+def _rehome(element, clones) -> None:
+    """Points the fields and references of element that refer to copied
+    elements, given as copies by id of the original, at the copies"""
+    for attribute, value in element.__getstate__().items():
+        if isinstance(value, ModelElement) and id(value) in clones:
+            setattr(element, attribute, clones[id(value)])
+    for kind, elements in element._containers():
+        if kind in _REFERENCE_KINDS:
+            for key, value in elements.items():
+                if id(value) in clones:
+                    elements[key] = clones[id(value)]
+
+
+def _owned_elements(root, roots) -> dict:
+    """Returns root and every element it owns, by id, without descending
+    into other roots"""
+    owned = {id(root): root}
+    for path, element in root._walk(prune=lambda path, element: id(element) in roots):
+        if id(element) not in roots:
+            owned[id(element)] = element
+    return owned
+
+
+def _write_unit(filename, root, owned, placed) -> set:
+    """Writes root and the elements it owns to a yaml file, returning the
+    uuids of the elements it references in other files"""
+    with open(filename, "w") as f:
+        dumper = _UnitDumper(f, owned, placed)
+        try:
+            dumper.open()
+            dumper.represent(root)
+            dumper.close()
+        finally:
+            dumper.dispose()
+    return dumper.references
+
+
+def _read_unit(filename):
+    with open(filename, "r") as f:
+        return _load(f, Loader=_UnitLoader)
+
+
+class _Fork:
+    """Copy-on-write bookkeeping for the variant returned by `Model.fork`"""
+
+    def __init__(self, base):
+        self.base = base
+        self.root = None
+        self.active = True
+        self.clones: dict = {}
+
+    def clone(self, element):
+        """Returns this fork's shallow copy of element, with its own copies of
+        the collections it subsumes"""
+        entry = self.clones.get(id(element))
+        if entry is not None:
+            return entry[1]
+
+        clone = element.__class__.__new__(element.__class__)
+        if hasattr(element, "__dict__"):
+            collections = {id(elements) for kind, elements in element._containers()}
+            for attribute, value in element.__dict__.items():
+                if id(value) in collections:
+                    value = value.copy()
+                clone.__dict__[attribute] = value
+            clone.__dict__.pop("_owners", None)
+            clone.__dict__.pop("_query_index", None)
+        else:
+            clone.__setstate__(element.__getstate__())
+        clone._fork = self
+        for kind, elements in element._containers():
+            if kind not in _REFERENCE_KINDS:
+                for child in elements.values():
+                    _weaken(child, element)
+        self.clones[id(element)] = (element, clone)
+        if self.root is None:
+            self.root = clone
+        return clone
+
+    def rehome(self, element):
+        """Returns this fork's copy of element, claimed through the elements
+        owning it from the root of the fork so that the copy takes its place
+        in the fork, or a copy of its own if the fork does not own it"""
+        entry = self.clones.get(id(element))
+        if entry is not None:
+            return entry[1]
+        if not self.active:
+            return element
+        path = self._path(element)
+        if path is None:
+            return self.clone(element)
+        kinds, keys = zip(*path)
+        return self.root._claim(keys, kinds)
+
+    def _path(self, element):
+        """Returns the (kind, key) pairs leading from the root of the fork to
+        an element it owns, without copying any, or None if it owns none"""
+        visited = {id(self.root)}
+        stack = [(self.root, ())]
+        while stack:
+            owner, path = stack.pop()
+            for kind, elements in owner._containers():
+                if kind in _REFERENCE_KINDS:
+                    continue
+                for key, child in elements.items():
+                    if child is element:
+                        return path + ((kind, key),)
+                    if id(child) not in visited:
+                        visited.add(id(child))
+                        stack.append((child, path + ((kind, key),)))
+        return None
+
+    def release(self):
+        """Takes the copies made by this fork out of the owners of the
+        elements they share with the base model"""
+        for original, clone in self.clones.values():
+            for kind, elements in clone._containers():
+                if kind in _REFERENCE_KINDS:
+                    continue
+                for child in elements.values():
+                    if child._fork is not self:
+                        clone._release(child)
+
+    def seal(self):
+        """Stops copying elements into this fork, which from then on must be
+        treated as read-only"""
+        self.active = False
+        self.clones.clear()
+        self.base = None
+
+    def claim(self, parent, elements, key):
+        """Replaces the element under key, within a collection of parent,
+        with this fork's copy of it"""
+        element = elements[key]
+        if not self.active:
+            return element
+        clone = self.clone(element)
+        elements[key] = clone
+        if parent._hash is not None:
+            clone._owners = [parent]
+        return clone
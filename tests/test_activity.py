@@ -0,0 +1,102 @@
+import sysml
+import math
+import pytest
+
+
+def survey_duration(run):
+    """Surveys take longer on odd-numbered runs"""
+    return 3.0 if run % 2 else 1.0
+
+
+def go_for_landing(run):
+    return run % 3 != 0
+
+
+@pytest.fixture
+def mission():
+    """Create a mission activity in which a survey and a refit run in
+    parallel after launch, followed by a landing decision"""
+    start = sysml.InitialNode("start")
+    launch = sysml.Action("launch", duration=2.0)
+    fork = sysml.ForkNode("fork")
+    survey = sysml.Action("survey", duration=survey_duration)
+    refit = sysml.Action("refit", duration=2.0)
+    join = sysml.JoinNode("join")
+    decide = sysml.DecisionNode("decide")
+    land = sysml.Action("land", duration=0.5)
+    orbit = sysml.Action("orbit", duration=10.0)
+    merge = sysml.MergeNode("merge")
+    end = sysml.ActivityFinalNode("end")
+    nodes = [start, launch, fork, survey, refit, join, decide, land, orbit, merge, end]
+    flows = [
+        (start, launch),
+        (launch, fork),
+        (fork, survey),
+        (fork, refit),
+        (survey, join),
+        (refit, join),
+        (join, decide),
+        (land, merge),
+        (orbit, merge),
+        (merge, end),
+    ]
+    activity = sysml.Activity(
+        "Mission", nodes, [sysml.ControlFlow(*flow) for flow in flows]
+    )
+    activity.add_edge(sysml.ControlFlow(decide, land, guard=go_for_landing))
+    activity.add_edge(sysml.ObjectFlow(decide, orbit))
+    return activity
+
+
+def test_activity(mission):
+    assert len(mission.edges) == 12
+    assert list(mission.edges)[-2:] == ["controlFlow11", "objectFlow1"]
+    with pytest.raises(KeyError):
+        mission.add_edge(sysml.ControlFlow(mission["end"], sysml.MergeNode("lost")))
+    with pytest.raises(TypeError):
+        sysml.Action("warp", duration="fast")
+
+    content_hash = mission.content_hash
+    mission["land"].duration = 1.0
+    assert mission.content_hash != content_hash
+
+    graph = mission.compile()
+    assert graph.nodes[:3] == ("start", "launch", "fork")
+    assert list(graph.kinds) == [1, 0, 3, 0, 0, 4, 5, 0, 0, 6, 2]
+    assert list(graph.outgoing[graph.out_offsets[2] : graph.out_offsets[3]]) == [2, 3]
+    assert list(graph.incoming[graph.in_offsets[5] : graph.in_offsets[6]]) == [4, 5]
+
+
+def test_activity_engine(mission):
+    engine = sysml.ActivityEngine(mission)
+    timelines = engine.run(4)
+    # launch 2, survey 1 or 3 in parallel with refit 2, then land 0.5 or
+    # orbit 10 on every third run
+    assert [timeline.finish for timeline in timelines] == [14.0, 5.5, 4.5, 15.0]
+    land = engine.graph.nodes.index("land")
+    join = engine.graph.nodes.index("join")
+    assert timelines[1].starts[join] == 5.0
+    assert timelines[2].starts[join] == 4.0
+    assert timelines[1].ends[land] == 5.5
+    assert math.isnan(timelines[0].starts[land])
+
+    # NaN entries compare unequal, so compare representations
+    assert repr(engine.run(2, start=2)) == repr(timelines[2:])
+    assert repr(engine.run(4, processes=2)) == repr(timelines)
+
+
+def test_activity_engine_limit():
+    start = sysml.InitialNode("start")
+    merge = sysml.MergeNode("merge")
+    spin = sysml.Action("spin", duration=1.0)
+    loop = sysml.Activity(
+        "Loop",
+        [start, merge, spin],
+        [
+            sysml.ControlFlow(start, merge),
+            sysml.ControlFlow(merge, spin),
+            sysml.ControlFlow(spin, merge),
+        ],
+    )
+    with pytest.raises(RuntimeError):
+        sysml.ActivityEngine(loop, limit=100).run()
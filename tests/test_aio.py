@@ -0,0 +1,85 @@
+import sysml
+import pytest
+import asyncio
+import os
+
+
+@pytest.fixture
+def model():
+    """Create a model with enough blocks to report parsing progress"""
+    model = sysml.Model("NCC-1701")
+    structure = sysml.Package("structure")
+    model.add(structure)
+    for i in range(200):
+        structure.add(sysml.Block("block{}".format(i)))
+    return model
+
+
+def test_asave_aread(model, tmp_path):
+    filename = str(tmp_path / "model.yaml")
+    phases = []
+
+    async def main():
+        await model.asave(filename, progress=lambda *args: phases.append(args[0]))
+        return await sysml.aread(
+            filename, progress=lambda *args: phases.append(args[0])
+        )
+
+    model2 = asyncio.run(main())
+
+    assert model2.content_hash == model.content_hash
+    assert {"serialize", "write", "read", "parse"} <= set(phases)
+    assert os.listdir(str(tmp_path)) == ["model.yaml"]
+
+
+def test_aread_concurrently(model, tmp_path):
+    filenames = [str(tmp_path / "model{}.yaml".format(i)) for i in range(3)]
+    for filename in filenames:
+        model.to_yaml(filename)
+
+    async def main():
+        return await asyncio.gather(*(sysml.aread(f) for f in filenames))
+
+    for model2 in asyncio.run(main()):
+        assert model2.content_hash == model.content_hash
+
+    not_a_model = str(tmp_path / "not_a_model.yaml")
+    with open(not_a_model, "w") as f:
+        f.write("not a model")
+    with pytest.raises(TypeError):
+        asyncio.run(sysml.aread(not_a_model))
+    with pytest.raises(TypeError):
+        asyncio.run(model.asave(2))
+
+
+def test_aread_cancel(model, tmp_path):
+    filename = str(tmp_path / "model.yaml")
+    model.to_yaml(filename)
+
+    async def main():
+        task = asyncio.ensure_future(
+            sysml.aread(filename, chunk_size=64, progress=lambda *args: task.cancel())
+        )
+        return await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(main())
+
+
+def test_asave_cancel(model, tmp_path):
+    filename = str(tmp_path / "model.yaml")
+    with open(filename, "w") as f:
+        f.write("previous")
+
+    async def main():
+        task = asyncio.ensure_future(
+            model.asave(filename, chunk_size=64, progress=lambda *args: task.cancel())
+        )
+        return await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(main())
+
+    assert os.listdir(str(tmp_path)) == ["model.yaml"]
+    with open(filename) as f:
+        assert f.read() == "previous"
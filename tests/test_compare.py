@@ -0,0 +1,80 @@
+import sysml
+import pytest
+import copy
+
+
+@pytest.fixture
+def model():
+    """Create a model with structure and requirements packages"""
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    starship.add_part("saucer section", sysml.Block("Primary Hull"))
+    starship.add_part("engineering", sysml.Block("Engineering Hull"))
+    starship["engineering"].add_part("warpdrive", sysml.Block("Class-7 Warp Drive"))
+    model.add(sysml.Package("structure", [starship]))
+    model.add(sysml.Package("requirements", [sysml.Requirement("Functional")]))
+    return model
+
+
+def changes(model_a, model_b):
+    return sorted(
+        (change.kind, change.old_path, change.new_path)
+        for change in sysml.diff(model_a, model_b)
+    )
+
+
+def test_diff_unchanged(model):
+    assert list(sysml.diff(model, model)) == []
+    assert list(sysml.diff(model, copy.deepcopy(model))) == []
+
+
+def test_diff_renamed_and_modified(model):
+    revision = copy.deepcopy(model)
+    starship = revision["structure"]["constitution-class starship"]
+    starship.name = "galaxy-class starship"
+    starship["saucer section"].multiplicity = 2
+    revision["requirements"]["Functional"].txt = "travel at warp 8"
+
+    path = ("structure", "constitution-class starship")
+    assert changes(model, revision) == [
+        ("modified", ("requirements", "Functional"), ("requirements", "Functional")),
+        ("modified", path + ("saucer section",), path + ("saucer section",)),
+        ("renamed", path, path),
+    ]
+
+
+def test_diff_added_removed_moved(model):
+    revision = copy.deepcopy(model)
+    starship = revision["structure"]["constitution-class starship"]
+    warpdrive = starship["engineering"]["warpdrive"]
+    starship["engineering"].remove_part("warpdrive")
+    starship.remove_part("saucer section")
+    starship.add_part("warp core", warpdrive)
+    revision.add(sysml.Package("behavior", [sysml.Block("Shuttlecraft")]))
+
+    path = ("structure", "constitution-class starship")
+    assert changes(model, revision) == [
+        ("added", None, ("behavior",)),
+        ("moved", path + ("engineering", "warpdrive"), path + ("warp core",)),
+        ("removed", path + ("saucer section",), None),
+    ]
+
+
+def test_diff_moved_into_new_subtree(model):
+    revision = copy.deepcopy(model)
+    starship = revision["structure"]["constitution-class starship"]
+    saucer = starship["saucer section"]
+    starship.remove_part("saucer section")
+    section = sysml.Block("Separated section")
+    section.add_part("saucer", saucer)
+    revision.add(sysml.Package("separation", [section]))
+
+    path = ("structure", "constitution-class starship")
+    assert changes(model, revision) == [
+        ("added", None, ("separation",)),
+        (
+            "moved",
+            path + ("saucer section",),
+            ("separation", "Separated section", "saucer"),
+        ),
+    ]
@@ -0,0 +1,76 @@
+import sysml
+import pytest
+import threading
+
+
+@pytest.fixture
+def shared():
+    """Share a model with a single, initially empty, assembly block"""
+    model = sysml.Model("NCC-1701")
+    model.add(sysml.Package("structure", [sysml.Block("assembly", multiplicity=0)]))
+    return sysml.SharedModel(model)
+
+
+def test_shared_model_edit(shared):
+    before = shared.snapshot()
+
+    with shared.edit() as draft:
+        draft["structure"]["assembly"].add_part("nacelle", sysml.Block("Nacelle"))
+
+    assert shared.version == 1
+    assert "nacelle" in shared.snapshot()["structure"]["assembly"].parts
+    assert "nacelle" not in before["structure"]["assembly"].parts
+
+    with pytest.raises(RuntimeError):
+        with shared.edit() as draft:
+            draft["structure"]["assembly"].remove_part("nacelle")
+            raise RuntimeError
+
+    assert shared.version == 1
+    assert "nacelle" in shared.snapshot()["structure"]["assembly"].parts
+
+    with pytest.raises(TypeError):
+        sysml.SharedModel(sysml.Block("assembly"))
+
+
+def test_shared_model_stress(shared):
+    """Readers must only ever see published states, in which the assembly's
+    multiplicity counts its parts, while a writer keeps editing"""
+    edits = 300
+    errors = []
+    done = threading.Event()
+
+    def read():
+        try:
+            versions = 0
+            while not done.is_set() or versions == 0:
+                assembly = shared.snapshot()["structure"]["assembly"]
+                parts = list(assembly.parts.values())
+                assert len(parts) == assembly.multiplicity
+                assert all(part.multiplicity == 1 for part in parts)
+                versions += 1
+        except Exception as error:  # pragma: no cover
+            errors.append(error)
+
+    def write():
+        for i in range(edits):
+            with shared.edit() as draft:
+                assembly = draft["structure"]["assembly"]
+                if len(assembly.parts) > 5:
+                    for name in list(assembly.parts)[:2]:
+                        assembly.remove_part(name)
+                else:
+                    for j in range(2):
+                        assembly.add_part("{}-{}".format(i, j), sysml.Block())
+                assembly.multiplicity = len(assembly.parts)
+
+    readers = [threading.Thread(target=read) for i in range(4)]
+    for reader in readers:
+        reader.start()
+    write()
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert shared.version == edits
@@ -0,0 +1,139 @@
+import sysml
+import gc
+import random
+import pytest
+import weakref
+
+
+def test_find_cycle():
+    model = sysml.Model("cycles")
+    starship = sysml.Block("starship")
+    engine = sysml.Block("engine")
+    starship.add_part("engine", engine)
+    model.add(sysml.Package("structure", [starship]))
+
+    assert sysml.find_cycle(model) is None
+
+    engine.add_part("starship", starship)
+    assert sysml.find_cycle(model) == [starship, engine]
+
+    engine.remove_part("starship")
+    engine.add_part("engine", engine)
+    assert sysml.find_cycle(model) == [engine]
+
+
+def test_find_cycle_derivation():
+    model = sysml.Model("cycles")
+    top_lvl_req = sysml.Requirement("Top-level")
+    functional_req = sysml.Requirement("Functional")
+    model.add(sysml.Package("requirements", [top_lvl_req, functional_req]))
+    model["requirements"].add(sysml.DeriveReqt(functional_req, top_lvl_req))
+
+    assert sysml.find_cycle(model) is None
+
+    model["requirements"].add(sysml.DeriveReqt(top_lvl_req, functional_req))
+    assert sysml.find_cycle(model) == [functional_req, top_lvl_req]
+
+
+def test_find_cycle_deep_hierarchy():
+    model = sysml.Model("deep")
+    block = sysml.Block("0")
+    model.add(block)
+    for i in range(1, 5000):
+        part = sysml.Block(str(i))
+        block.add_part(part.name, part)
+        block = part
+
+    assert sysml.find_cycle(model) is None
+
+
+def test_cycle_guard():
+    model = sysml.Model("guarded")
+    starship = sysml.Block("starship")
+    engine = sysml.Block("engine")
+    nacelle = sysml.Block("nacelle")
+
+    with sysml.CycleGuard():
+        model.add(sysml.Package("structure", [starship]))
+        starship.add_part("engine", engine)
+        engine["nacelle"] = nacelle
+
+        with pytest.raises(ValueError):
+            nacelle.add_part("starship", starship)
+        with pytest.raises(ValueError):
+            nacelle["nacelle"] = nacelle
+        with pytest.raises(ValueError):
+            model["structure"].add(model)
+
+        # parts may be shared as long as no loop is closed
+        nacelle.add_part("spare", sysml.Block("coil"))
+        starship.add_part("nacelle", nacelle)
+
+    assert sysml.find_cycle(model) is None
+    assert "starship" not in nacelle.parts
+
+    nacelle.add_part("starship", starship)
+    assert sysml.find_cycle(model) == [starship, engine, nacelle]
+
+
+def test_cycle_guard_reorders():
+    blocks = [sysml.Block(str(i)) for i in range(6)]
+    with sysml.CycleGuard():
+        # insert edges bottom-up, against the registration order
+        for parent, child in reversed(list(zip(blocks, blocks[1:]))):
+            parent.add_part(child.name, child)
+        blocks[0].add_part("5", blocks[5])
+
+        for block in blocks[1:]:
+            with pytest.raises(ValueError):
+                block.add_part("0", blocks[0])
+
+
+def test_cycle_guard_removals():
+    """Edges undone by removals no longer constrain the order"""
+    for seed in range(200):
+        rng = random.Random(seed)
+        blocks = [sysml.Block(str(i)) for i in range(8)]
+        parts = []
+        with sysml.CycleGuard():
+            for step in range(40):
+                if parts and rng.random() < 0.3:
+                    parent, key = parts.pop(rng.randrange(len(parts)))
+                    if rng.random() < 0.5:
+                        parent.remove_part(key)
+                    else:
+                        parent[key] = sysml.Block("leaf")
+                    continue
+                parent, child = rng.sample(blocks, 2)
+                try:
+                    parent.add_part(str(step), child)
+                except ValueError:
+                    continue
+                parts.append((parent, str(step)))
+                assert sysml.find_cycle(sysml.Package("root", blocks)) is None
+
+
+def test_cycle_guard_releases_elements():
+    with sysml.CycleGuard() as guard:
+        parent = sysml.Block("parent")
+        parent.add_part("child", sysml.Block("child"))
+        child = weakref.ref(parent["child"])
+        del parent
+        gc.collect()
+
+        assert child() is None
+        assert len(guard._order) == 0
+
+
+def test_derivation_graph_acyclic():
+    requirements = [sysml.Requirement(str(i)) for i in range(4)]
+    graph = sysml.DerivationGraph(acyclic=True)
+    for supplier, client in zip(requirements, requirements[1:]):
+        graph.add(sysml.DeriveReqt(client, supplier))
+
+    with pytest.raises(ValueError):
+        graph.add(sysml.DeriveReqt(requirements[0], requirements[3]))
+    with pytest.raises(ValueError):
+        graph.add(sysml.DeriveReqt(requirements[2], requirements[2]))
+    assert len(graph) == 3
+    assert graph.find_cycle() is None
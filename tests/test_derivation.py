@@ -0,0 +1,76 @@
+import sysml
+import pytest
+
+
+@pytest.fixture
+def chain():
+    """Create a chain of requirements, each derived from the previous one"""
+    requirements = [sysml.Requirement("REQ-{}".format(i)) for i in range(5)]
+    relations = [
+        sysml.DeriveReqt(client, supplier)
+        for supplier, client in zip(requirements, requirements[1:])
+    ]
+    return requirements, relations
+
+
+def test_derivation_closure(chain):
+    requirements, relations = chain
+    graph = sysml.DerivationGraph(relations)
+
+    assert len(graph) == 4
+    assert relations[0] in graph
+    assert graph.downstream(requirements[0]) == requirements[1:]
+    assert graph.upstream(requirements[4]) == requirements[3::-1]
+    assert graph.downstream(requirements[4]) == []
+    assert graph.downstream(sysml.Requirement("unrelated")) == []
+
+    with pytest.raises(TypeError):
+        graph.add(sysml.Satisfy(sysml.Block("block"), requirements[0]))
+    with pytest.raises(TypeError):
+        graph.upstream(sysml.Block("block"))
+
+
+def test_derivation_invalidation(chain):
+    requirements, relations = chain
+    graph = sysml.DerivationGraph(relations)
+
+    assert graph.downstream(requirements[0]) == requirements[1:]
+    assert graph.upstream(requirements[4]) == requirements[3::-1]
+
+    graph.remove(relations[1])
+    assert graph.downstream(requirements[0]) == requirements[1:2]
+    assert graph.upstream(requirements[4]) == requirements[3:1:-1]
+
+    branch = sysml.Requirement("REQ-branch")
+    graph.add(sysml.DeriveReqt(branch, requirements[1]))
+    assert graph.downstream(requirements[0]) == [requirements[1], branch]
+    assert graph.upstream(branch) == requirements[1::-1]
+
+    with pytest.raises(KeyError):
+        graph.remove(relations[1])
+
+
+def test_derivation_deep_chain():
+    requirements = [sysml.Requirement() for i in range(5000)]
+    graph = sysml.DerivationGraph()
+    for supplier, client in zip(requirements, requirements[1:]):
+        graph.add(sysml.DeriveReqt(client, supplier))
+
+    assert len(graph.downstream(requirements[0])) == 4999
+    assert len(graph.upstream(requirements[-1])) == 4999
+    assert len(graph.downstream(requirements[2500])) == 2499
+
+
+def test_derivation_from_model(chain):
+    requirements, relations = chain
+    model = sysml.Model("derivation")
+    model.add(sysml.Package("requirements", requirements))
+    nested = sysml.Package("nested")
+    model.add(sysml.Package("traces", [nested]))
+    for relation in relations:
+        nested.add(relation)
+
+    graph = sysml.DerivationGraph.from_model(model)
+
+    assert len(graph) == 4
+    assert graph.downstream(requirements[1]) == requirements[2:]
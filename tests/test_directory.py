@@ -0,0 +1,97 @@
+import sysml
+import pytest
+import os
+
+
+@pytest.fixture
+def model():
+    """Create a model whose requirements package references a block in the
+    structure package"""
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    warpdrive = sysml.Block("Class-7 Warp Drive")
+    starship.add_part("warpdrive", warpdrive)
+    functional_req = sysml.Requirement("Functional", "travel at warp 8")
+    model.add(sysml.Package("structure", [starship]))
+    model.add(sysml.Package("requirements", [functional_req]))
+    model["requirements"].add(sysml.Satisfy(warpdrive, functional_req))
+    model.add(sysml.Block("Shuttlecraft"))
+    return model
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_directory_round_trip(model, tmp_path, processes):
+    model.to_directory(str(tmp_path))
+    model2 = sysml.read_directory(str(tmp_path), processes=processes)
+
+    assert repr(model2) == repr(model)
+    assert model2.uuid == model.uuid
+    assert model2.content_hash == model.content_hash
+    assert list(model2.elements) == ["structure", "requirements", "Shuttlecraft"]
+
+    satisfy = model2["requirements"]["satisfy1"]
+    warpdrive = model2["structure"]["constitution-class starship"]["warpdrive"]
+    assert satisfy.client is warpdrive
+    assert satisfy.supplier is model2["requirements"]["Functional"]
+
+    with pytest.raises(TypeError):
+        model.to_directory(2)
+
+
+def test_directory_manifest(model, tmp_path):
+    model.to_directory(str(tmp_path))
+    with open(str(tmp_path / "manifest.yaml")) as f:
+        manifest = sysml.system._safe_load(f)
+
+    entries = {entry["name"]: entry for entry in manifest["packages"]}
+    warpdrive = model["structure"]["constitution-class starship"]["warpdrive"]
+    assert entries["requirements"]["references"] == [str(warpdrive.uuid)]
+    assert entries["structure"]["references"] == []
+    assert len(manifest["references"]) == 2
+    assert sorted(os.listdir(str(tmp_path / "packages"))) == sorted(
+        "{}.yaml".format(entry["uuid"]) for entry in manifest["packages"]
+    )
+
+
+def test_directory_incremental_save(model, tmp_path):
+    model.to_directory(str(tmp_path))
+    structure = tmp_path / "packages" / "{}.yaml".format(model["structure"].uuid)
+    requirements = tmp_path / "packages" / "{}.yaml".format(model["requirements"].uuid)
+    structure.write_text(structure.read_text() + "# untouched\n")
+    requirements.write_text(requirements.read_text() + "# untouched\n")
+
+    model["requirements"]["Functional"].txt = "travel at warp 9"
+    holodeck = sysml.Package("Holodeck")
+    model.add(holodeck)
+    model.to_directory(str(tmp_path))
+
+    assert structure.read_text().endswith("# untouched\n")
+    assert not requirements.read_text().endswith("# untouched\n")
+    assert (tmp_path / "packages" / "{}.yaml".format(holodeck.uuid)).exists()
+
+    model.remove(holodeck)
+    model.to_directory(str(tmp_path))
+    assert not (tmp_path / "packages" / "{}.yaml".format(holodeck.uuid)).exists()
+
+    model2 = sysml.read_directory(str(tmp_path), processes=1)
+    assert model2["requirements"]["Functional"].txt == "travel at warp 9"
+    assert model2.content_hash == model.content_hash
+
+
+def test_directory_moved_reference(model, tmp_path):
+    model.to_directory(str(tmp_path))
+    starship = model["structure"]["constitution-class starship"]
+    warpdrive = starship["warpdrive"]
+    starship.remove_part("warpdrive")
+    model.to_directory(str(tmp_path))
+
+    with open(str(tmp_path / "manifest.yaml")) as f:
+        manifest = sysml.system._safe_load(f)
+    entries = {entry["name"]: entry for entry in manifest["packages"]}
+    assert entries["requirements"]["references"] == []
+
+    model2 = sysml.read_directory(str(tmp_path), processes=1)
+    satisfy = model2["requirements"]["satisfy1"]
+    assert satisfy.client.uuid == warpdrive.uuid
+    assert "warpdrive" not in model2["structure"]["constitution-class starship"].parts
+    assert model2.content_hash == model.content_hash
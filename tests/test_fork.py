@@ -0,0 +1,225 @@
+import sysml
+from sysml.elements.base import _live
+import gc
+import pytest
+import weakref
+
+
+@pytest.fixture
+def model():
+    """Create a model with structure and requirements packages"""
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    starship.add_part("nacelle", sysml.Block("Nacelle", multiplicity=2))
+    starship.add_part("warpdrive", sysml.Block("Class-7 Warp Drive"))
+    model.add(sysml.Package("structure", [starship]))
+    model.add(sysml.Package("requirements", [sysml.Requirement("Functional")]))
+    return model
+
+
+def test_fork_shares_untouched_elements(model):
+    variant = model.fork()
+
+    assert variant is not model
+    assert variant.uuid == model.uuid
+    assert variant.content_hash == model.content_hash
+    assert variant._elements is not model._elements
+
+    requirements = model["requirements"]
+    starship = variant["structure"]["constitution-class starship"]
+    assert starship is not model["structure"]["constitution-class starship"]
+    assert starship.uuid == model["structure"]["constitution-class starship"].uuid
+    assert variant._elements["requirements"] is requirements
+    assert (
+        starship._parts["warpdrive"]
+        is model["structure"]["constitution-class starship"]["warpdrive"]
+    )
+
+
+def test_fork_isolates_edits(model):
+    before = model.content_hash
+    variant = model.fork()
+    starship = variant["structure"]["constitution-class starship"]
+    starship["nacelle"].multiplicity = 4
+    starship.add_part("cloak", sysml.Block("Cloaking device"))
+    for requirement in variant["requirements"].elements.values():
+        requirement.txt = "travel at warp 9"
+
+    original = model["structure"]["constitution-class starship"]
+    assert original["nacelle"].multiplicity == 2
+    assert "cloak" not in original.parts
+    assert model["requirements"]["Functional"].txt == ""
+    assert model.content_hash == before
+    assert variant.content_hash != before
+    assert [change.kind for change in sysml.diff(model, variant)].count("added") == 1
+
+
+def test_fork_views(model):
+    variant = model.fork()
+    starship = variant["structure"]["constitution-class starship"]
+    original = model["structure"]["constitution-class starship"]
+
+    assert list(starship.parts) == ["nacelle", "warpdrive"]
+    assert "nacelle" in starship.parts and len(starship.parts) == 2
+    assert starship._parts["nacelle"] is original["nacelle"]
+
+    starship.parts["nacelle"].multiplicity = 4
+    assert starship._parts["nacelle"] is not original["nacelle"]
+    assert starship._parts["warpdrive"] is original["warpdrive"]
+    assert original["nacelle"].multiplicity == 2
+
+    with pytest.raises(TypeError):
+        starship.parts["cloak"] = sysml.Block("Cloaking device")
+
+
+def test_fork_merge_owners(model):
+    model.content_hash
+    variant = model.fork()
+    variant["structure"]["constitution-class starship"]["nacelle"].multiplicity = 4
+    variant.content_hash
+
+    model.merge(variant)
+    before = model.content_hash
+    model["structure"]["constitution-class starship"]["nacelle"].multiplicity = 5
+
+    assert model.content_hash != before
+    assert all(
+        owner is not variant
+        for package in model.elements.values()
+        for owner in package._owners
+    )
+
+
+def test_fork_merge(model):
+    variant = model.fork()
+    variant["structure"]["constitution-class starship"].remove_part("warpdrive")
+    expected = variant.content_hash
+
+    model.merge(variant)
+
+    assert model.content_hash == expected
+    assert "warpdrive" not in model["structure"]["constitution-class starship"].parts
+    assert variant.elements == {}
+
+    model["structure"]["constitution-class starship"]["nacelle"].multiplicity = 3
+    assert (
+        model["structure"]["constitution-class starship"]["nacelle"].multiplicity == 3
+    )
+
+    with pytest.raises(ValueError):
+        model.merge(sysml.Model("NCC-1701").fork())
+    with pytest.raises(ValueError):
+        model.merge(model)
+
+
+def test_fork_discard(model):
+    variants = [model.fork() for i in range(3)]
+    for multiplicity, variant in enumerate(variants):
+        variant["structure"]["constitution-class starship"][
+            "nacelle"
+        ].multiplicity = multiplicity
+    variants[0].discard()
+
+    assert variants[0].elements == {}
+    assert (
+        variants[1]["structure"]["constitution-class starship"]["nacelle"].multiplicity
+        == 1
+    )
+    assert (
+        model["structure"]["constitution-class starship"]["nacelle"].multiplicity == 2
+    )
+
+    with pytest.raises(ValueError):
+        model.discard()
+
+
+def test_fork_of_fork(model):
+    variant = model.fork()
+    variant["structure"]["constitution-class starship"]["nacelle"].multiplicity = 3
+    nested = variant.fork()
+    nested["structure"]["constitution-class starship"]["nacelle"].multiplicity = 5
+
+    assert (
+        variant["structure"]["constitution-class starship"]["nacelle"].multiplicity == 3
+    )
+    assert (
+        nested["structure"]["constitution-class starship"]["nacelle"].multiplicity == 5
+    )
+    assert (
+        model["structure"]["constitution-class starship"]["nacelle"].multiplicity == 2
+    )
+
+
+def test_fork_releases_variants(model):
+    """Variants and snapshots sharing elements with the base model are freed
+    once discarded or replaced"""
+    warpdrive = model["structure"]["constitution-class starship"]["warpdrive"]
+    model.content_hash
+    variants = []
+    for multiplicity in range(20):
+        variant = model.fork()
+        variant["structure"]["constitution-class starship"][
+            "nacelle"
+        ].multiplicity = multiplicity
+        variant.content_hash
+        variants.append(weakref.ref(variant))
+        variant.discard()
+        del variant
+
+    shared = sysml.SharedModel(model)
+    snapshots = []
+    for multiplicity in range(20):
+        with shared.edit() as draft:
+            starship = draft["structure"]["constitution-class starship"]
+            starship["nacelle"].multiplicity = multiplicity
+        shared.snapshot().content_hash
+        snapshots.append(weakref.ref(shared.snapshot()))
+    del draft, starship
+    gc.collect()
+
+    assert all(variant() is None for variant in variants)
+    assert [snapshot() is None for snapshot in snapshots] == [True] * 19 + [False]
+    before = shared.snapshot().content_hash
+    warpdrive.multiplicity = 3
+    assert shared.snapshot().content_hash != before
+    # the starship of the model and that of the latest snapshot
+    assert len(list(_live(warpdrive._owners))) == 2
+
+
+def test_fork_merge_relationships(model):
+    model["requirements"].add(
+        sysml.Satisfy(
+            model["structure"]["constitution-class starship"],
+            model["requirements"]["Functional"],
+        )
+    )
+    variant = model.fork()
+    variant["structure"]["constitution-class starship"].name = "Enterprise"
+    model.merge(variant)
+
+    starship = model["structure"]["constitution-class starship"]
+    assert model["requirements"]["satisfy1"].client is starship
+    assert model["requirements"]["satisfy1"].client.name == "Enterprise"
+
+
+def test_fork_copies_only_results():
+    model = sysml.Model("fleet")
+    model.add(sysml.Package("ships", [sysml.Block(str(i)) for i in range(1000)]))
+
+    variant = model.fork()
+    assert list(variant.check()) == list(model.check())
+    assert len(variant._fork.clones) == 1
+
+    variant.query(type=sysml.Package).first()
+    ship = variant.query(type=sysml.Block, where={"name": "500"}).first()
+    assert len(variant._fork.clones) == 3
+    assert ship is variant["ships"]["500"]
+    assert variant.query(under=variant["ships"]).count() == 1000
+
+    path, ship = next(variant.walk(type=sysml.Block))
+    assert ship is variant["ships"]["0"]
+    assert len(variant._fork.clones) == 4
+
+    ship.name = "Enterprise"
+    assert variant.query(where={"name": "Enterprise"}).count() == 1
+    assert model.query(where={"name": "Enterprise"}).count() == 0
@@ -0,0 +1,144 @@
+import sysml
+import pytest
+import copy
+
+
+@pytest.fixture
+def model():
+    """Create a small model with structure and requirements packages"""
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    starship.add_part("nacelle", sysml.Block("Nacelle", multiplicity=2))
+    starship.add_part("warpdrive", sysml.Block("Class-7 Warp Drive"))
+    functional_req = sysml.Requirement("Functional", "travel at warp 8", "REQ-2")
+    model.add(sysml.Package("structure", [starship]))
+    model.add(sysml.Package("requirements", [functional_req]))
+    model["requirements"].add(sysml.Satisfy(starship["warpdrive"], functional_req))
+    return model
+
+
+def test_content_hash_equality(model):
+    twin = copy.deepcopy(model)
+
+    assert twin["structure"] is not model["structure"]
+    assert twin.content_hash == model.content_hash
+    assert len(model.content_hash) == 32
+
+    twin["structure"]["constitution-class starship"]["nacelle"].multiplicity = 3
+    assert twin.content_hash != model.content_hash
+    assert twin["requirements"].content_hash == model["requirements"].content_hash
+
+
+def test_content_hash_fields(model):
+    functional_req = model["requirements"]["Functional"]
+    starship = model["structure"]["constitution-class starship"]
+
+    for mutate in (
+        lambda: setattr(functional_req, "txt", "travel at warp 9"),
+        lambda: setattr(starship["nacelle"], "name", "Warp Nacelle"),
+        lambda: starship.add_part("pylons", sysml.Block("Pylon")),
+        lambda: starship.remove_part("pylons"),
+        lambda: model["structure"].add(sysml.Block("Shuttlecraft")),
+    ):
+        before = model.content_hash
+        mutate()
+        assert model.content_hash != before
+
+    with pytest.raises(TypeError):
+        functional_req.txt = 47
+
+
+def test_content_hash_dirty_path(model):
+    starship = model["structure"]["constitution-class starship"]
+    model.content_hash
+
+    starship["nacelle"].multiplicity = 4
+
+    assert starship["nacelle"]._hash is None
+    assert starship._hash is None
+    assert model["structure"]._hash is None
+    assert model._hash is None
+    assert starship["warpdrive"]._hash is not None
+    assert model["requirements"]._hash is not None
+
+
+def test_content_hash_transient(model):
+    model.content_hash
+    state = model["structure"].__getstate__()
+
+    assert "_hash" not in state
+    assert "_owners" not in state
+
+
+def test_content_hash_detached(model):
+    starship = model["structure"]["constitution-class starship"]
+    nacelle = starship["nacelle"]
+    warpdrive = starship["warpdrive"]
+    model.content_hash
+
+    starship.remove_part("nacelle")
+    starship["warpdrive"] = sysml.Block("Class-9 Warp Drive")
+    model["structure"].remove(starship)
+    model.content_hash
+
+    assert starship not in nacelle._owners
+    assert starship not in warpdrive._owners
+    assert model["structure"] not in starship._owners
+    nacelle.multiplicity = 3
+    assert model._hash is not None
+
+
+LEGACY_YAML = """\
+!!python/object:sysml.system.Model
+_elements: !!python/object/apply:collections.OrderedDict
+- - - requirements
+    - !!python/object:sysml.elements.structure.Package
+      _elements: !!python/object/apply:collections.OrderedDict
+      - - - Functional
+          - !!python/object:sysml.elements.requirements.Requirement
+            _id: REQ-2
+            _name: Functional
+            _uuid: !!python/object:uuid.UUID
+              int: 41028382456905601576819556712206827521
+              is_safe: -1
+            txt: travel at warp 8
+      _name: requirements
+      _uuid: !!python/object:uuid.UUID
+        int: 41028403056227855285547331033633914881
+        is_safe: -1
+_name: NCC-1701
+_uuid: !!python/object:uuid.UUID
+  int: 41028359480738472440161654584461230081
+  is_safe: -1
+"""
+
+
+def test_content_hash_legacy_yaml(tmp_path):
+    """Files written before Requirement.txt became a property still load"""
+    filename = tmp_path / "legacy.yaml"
+    filename.write_text(LEGACY_YAML)
+    model = sysml.read_yaml(str(filename))
+    requirement = model["requirements"]["Functional"]
+
+    assert requirement.txt == "travel at warp 8"
+    assert "txt" not in requirement.__dict__
+    assert len(model.content_hash) == 32
+    assert list(sysml.diff(model, model)) == []
+    model.to_jsonl(str(tmp_path / "legacy.jsonl"))
+
+
+def test_content_hash_references(model):
+    starship = model["structure"]["constitution-class starship"]
+    functional_req = model["requirements"]["Functional"]
+    before = model.content_hash
+
+    starship.add_reference("mission", functional_req)
+    assert starship.references["mission"] is functional_req
+    assert model.content_hash != before
+    starship.remove_reference("mission")
+    assert model.content_hash == before
+
+    with pytest.raises(TypeError):
+        starship.references["mission"] = functional_req
+    with pytest.raises(TypeError):
+        starship.add_reference("mission", "not an element")
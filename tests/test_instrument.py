@@ -0,0 +1,68 @@
+import sysml
+import sysml.instrumentation
+import asyncio
+import threading
+
+
+def test_instrument(tmp_path):
+    add = sysml.Package.add
+    sysml.stats(reset=True)
+    calls = []
+
+    with sysml.instrument(lambda name, seconds: calls.append(name)) as scope:
+        assert sysml.Package.add is not add
+        model = sysml.Model("NCC-1701")
+        starship = sysml.Block("constitution-class starship")
+        starship.add_part("warpdrive", sysml.Block("Class-7 Warp Drive"))
+        model.add(sysml.Package("structure", [starship]))
+        model["structure"]["constitution-class starship"]["warpdrive"]
+        with sysml.instrument() as inner:
+            model.to_yaml(str(tmp_path / "model.yaml"))
+            sysml.read_yaml(str(tmp_path / "model.yaml"))
+
+    assert sysml.Package.add is add
+    assert {name: scope[name]["calls"] for name in scope} == {
+        "Model.__init__": 1,
+        "Block.__init__": 2,
+        "Package.__init__": 1,
+        "Block.add_part": 1,
+        "Package.add": 1,
+        "Package.__getitem__": 2,
+        "Block.__getitem__": 1,
+        "Model.to_yaml": 1,
+        "read_yaml": 1,
+    }
+    assert sorted(inner) == ["Model.to_yaml", "read_yaml"]
+    assert calls.count("Package.__getitem__") == 2
+    assert all(entry["seconds"] >= 0 for entry in scope.values())
+    assert sysml.stats(reset=True)["Package.add"]["calls"] == 1
+    assert sysml.stats() == {}
+
+    # collection stops once the outermost block exits
+    sysml.Package("structure").add(sysml.Block("Nacelle"))
+    asyncio.run(model.asave(str(tmp_path / "model.yaml")))
+    assert sysml.stats() == {}
+
+    with sysml.instrument() as scope:
+        asyncio.run(sysml.aread(str(tmp_path / "model.yaml")))
+    assert scope["aread"]["calls"] == 1
+
+
+def test_instrument_threads():
+    sysml.stats(reset=True)
+    with sysml.instrument() as scope:
+        threads = [
+            threading.Thread(
+                target=lambda: [sysml.Requirement("R") for i in range(2000)]
+            )
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    sysml.stats(reset=True)
+
+    assert scope["Requirement.__init__"]["calls"] == 16000
+    assert callable(sysml.instrument)
+    assert sysml.instrumentation.instrument is sysml.instrument
@@ -0,0 +1,103 @@
+import sysml
+import sysml.elements.behavior as behavior
+import pytest
+from array import array
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    """Run each test with and without numpy"""
+    if request.param == "python":
+        monkeypatch.setattr(behavior, "_numpy", None)
+    elif behavior._numpy is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+@pytest.fixture
+def lifelines():
+    return [sysml.Block("Kirk"), sysml.Block("Spock"), sysml.Block("Scotty")]
+
+
+def test_interaction_messages(backend, lifelines):
+    kirk, spock, scotty = lifelines
+    interaction = sysml.Interaction(
+        "Beam up",
+        lifelines,
+        [(kirk, scotty, 0.0), ("Scotty", "Kirk", 1.5, "reply"), (2, 2, 2.0)],
+    )
+    messages = interaction.messages
+    assert len(messages) == 3
+    assert messages.lifelines == ("Kirk", "Spock", "Scotty")
+    assert messages[1] == ("Scotty", "Kirk", 1.5, "reply")
+    assert list(messages.between(kirk, scotty)) == [0, 1]
+    assert list(messages.between(kirk, scotty, directed=True)) == [0]
+    assert list(messages.between("Kirk", "Scotty", start=1.0, end=2.0)) == [1]
+    assert list(messages.between(kirk, spock)) == []
+    assert messages.counts() == {"Kirk": 2, "Spock": 0, "Scotty": 3}
+    assert messages.counts(received=False) == {"Kirk": 1, "Spock": 0, "Scotty": 2}
+
+    with pytest.raises(KeyError):
+        interaction.add_message(kirk, sysml.Block("Khan"), 3.0)
+    with pytest.raises(ValueError):
+        interaction.add_message(kirk, 3, 3.0)
+    with pytest.raises(KeyError):
+        interaction.add_message(kirk, spock, 3.0, "broadcast")
+    assert len(messages) == 3
+
+    assert sysml.Interaction("Empty").messages.counts() == {}
+    with pytest.raises(TypeError):
+        sysml.Interaction("Empty", lifelines=kirk)
+
+
+def test_interaction_extend_messages(backend, lifelines):
+    kirk, spock, scotty = lifelines
+    interaction = sysml.Interaction("Replay", lifelines)
+    size = 1000
+    interaction.extend_messages(
+        array("l", [0, 1] * (size // 2)),
+        array("l", [1, 2] * (size // 2)),
+        [float(t) for t in range(size)],
+        [1] * size,
+    )
+    messages = interaction.messages
+    assert len(messages) == size
+    assert messages[size - 1] == ("Spock", "Scotty", size - 1.0, "asynchCall")
+    assert list(messages.between(spock, scotty, 100.0, 106.0)) == [101, 103, 105]
+    assert len(messages.between(kirk, spock)) == size // 2
+
+    # out-of-order timestamps are scanned rather than bisected
+    interaction.extend_messages([kirk], [spock], [0.5])
+    assert list(messages.between(kirk, spock, 0.0, 1.0)) == [0, size]
+    assert messages.counts() == {"Kirk": 501, "Spock": 1001, "Scotty": 500}
+
+    with pytest.raises(ValueError):
+        interaction.extend_messages([kirk, kirk], [spock], [0.0, 1.0])
+
+    if backend == "numpy":
+        numpy = behavior._numpy
+        interaction.extend_messages(
+            numpy.array([2, 2]), numpy.array([0, 1]), numpy.array([2000.0, 2001.0])
+        )
+        assert list(messages.between(scotty, kirk, 2000.0)) == [size + 1]
+
+
+def test_interaction_hash_and_fork(lifelines):
+    kirk, spock, scotty = lifelines
+    interaction = sysml.Interaction("Beam up", lifelines, [(kirk, scotty, 0.0)])
+    model = sysml.Model("NCC-1701")
+    model.add(sysml.Package("behavior", [interaction]))
+
+    content_hash = model.content_hash
+    interaction.add_message(scotty, kirk, 1.0, "reply")
+    assert model.content_hash != content_hash
+
+    variant = model.fork()
+    variant["behavior"]["Beam up"].add_message(spock, kirk, 2.0)
+    assert len(variant["behavior"]["Beam up"].messages) == 3
+    assert len(interaction.messages) == 2
+
+    copy = sysml.Interaction("Replay", lifelines, interaction.messages)
+    copy.add_message(kirk, spock, 3.0)
+    assert len(copy.messages) == 3
+    assert len(interaction.messages) == 2
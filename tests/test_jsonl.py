@@ -0,0 +1,108 @@
+import sysml
+import sysml.jsonl
+import json
+import pytest
+
+
+@pytest.fixture
+def model():
+    """Create a model with a structure package of blocks, a shared drive and
+    a bolt usage, and a requirements package with a satisfy relationship"""
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    warpdrive = sysml.Block("Class-7 Warp Drive")
+    starship.add_part("warpdrive", warpdrive)
+    starship.add_part("spare", warpdrive)
+    starship.add_part("nacelle", sysml.Block("Nacelle", multiplicity=2))
+    bolt = sysml.Block("M6 Bolt")
+    starship.add_usage("bolt", bolt, overrides={"torque": 9.5})
+    functional = sysml.Requirement("Functional", "travel at warp 8", "REQ-2")
+    model.add(sysml.Package("structure", [starship, bolt]))
+    model.add(sysml.Package("requirements", [functional]))
+    model["requirements"].add(sysml.Satisfy(warpdrive, functional))
+    return model
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(sysml.jsonl, "_orjson", None)
+    elif sysml.jsonl._orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+def test_records(model):
+    records = list(sysml.records(model))
+    assert records[0]["type"] == "Model"
+    assert records[0]["parent"] is None
+    assert len(records) == 11
+
+    by_key = {record["key"]: record for record in records}
+    requirement = by_key["Functional"]
+    assert requirement["txt"] == "travel at warp 8"
+    assert requirement["id"] == "REQ-2"
+    assert requirement["parent"] == by_key["requirements"]["uuid"]
+    assert requirement["kind"] == "elements"
+    satisfy = by_key["satisfy1"]
+    assert satisfy["client"] == by_key["warpdrive"]["uuid"]
+    assert satisfy["supplier"] == requirement["uuid"]
+    assert by_key["nacelle"]["multiplicity"] == 2
+    assert by_key["bolt"]["definition"] == by_key["M6 Bolt"]["uuid"]
+    assert by_key["bolt"]["overrides"] == {"torque": 9.5}
+
+    # the shared drive is recorded once in full, then by ownership only
+    shared = [record for record in records if record["uuid"] == satisfy["client"]]
+    assert [record["key"] for record in shared] == ["warpdrive", "spare"]
+    assert set(shared[1]) == {"uuid", "parent", "kind", "key"}
+
+
+def test_jsonl_round_trip(model, encoder, tmp_path):
+    filename = str(tmp_path / "model.jsonl")
+    assert model.to_jsonl(filename, chunk_size=3) == [filename]
+    with open(filename) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == list(sysml.records(model))
+
+    model2 = sysml.read_jsonl(filename)
+    assert type(model2) is sysml.Model
+    assert model2.content_hash == model.content_hash
+    starship = model2["structure"]["constitution-class starship"]
+    assert starship["warpdrive"] is starship["spare"]
+    assert starship["bolt"].definition is model2["structure"]["M6 Bolt"]
+    assert model2["requirements"]["satisfy1"].client is starship["warpdrive"]
+
+
+def test_jsonl_shards(model, encoder, tmp_path):
+    filenames = model.to_jsonl(str(tmp_path / "model.jsonl"), shard_size=4)
+    assert filenames == [
+        str(tmp_path / "model-{:05d}.jsonl".format(shard)) for shard in range(3)
+    ]
+    counts = []
+    for filename in filenames:
+        with open(filename) as f:
+            counts.append(len(f.readlines()))
+    assert counts == [4, 4, 3]
+    assert sysml.read_jsonl(filenames).content_hash == model.content_hash
+
+    with pytest.raises(ValueError):
+        model.to_jsonl(str(tmp_path / "model.jsonl"), shard_size=0)
+
+
+def test_jsonl_unsupported(tmp_path):
+    model = sysml.Model("NCC-1701")
+    machine = sysml.StateMachine("docking", states=[sysml.State("idle")])
+    model.add(sysml.Package("behavior", [machine]))
+    filename = str(tmp_path / "model.jsonl")
+    model.to_jsonl(filename)
+    with pytest.raises(ValueError):
+        sysml.read_jsonl(filename)
+
+
+def test_jsonl_dangling_reference(model, tmp_path):
+    filename = str(tmp_path / "requirements.jsonl")
+    sysml.write_jsonl(model["requirements"], filename)
+    warpdrive = model["structure"]["constitution-class starship"]["warpdrive"]
+    satisfy = model["requirements"]["satisfy1"]
+    with pytest.raises(ValueError, match=str(warpdrive.uuid)) as error:
+        sysml.read_jsonl(filename)
+    assert str(satisfy.uuid) in str(error.value)
@@ -0,0 +1,64 @@
+import sysml
+import pytest
+import tracemalloc
+
+
+def build():
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    starship.add_part("warpdrive", sysml.Block("Class-7 Warp Drive"))
+    functional = sysml.Requirement("Functional", "travel at warp 8 " * 100, "REQ-2")
+    model.add(sysml.Package("structure", [starship]))
+    model.add(sysml.Package("requirements", [functional]))
+    model["requirements"].add(sysml.Satisfy(starship, functional))
+    return model
+
+
+def test_memory_usage():
+    model = build()
+    report = model.memory_usage()
+    assert report.total == sum(entry["bytes"] for entry in report.by_class.values())
+    assert {name: entry["count"] for name, entry in report.by_class.items()} == {
+        "Model": 1,
+        "Package": 2,
+        "Block": 2,
+        "Requirement": 1,
+        "Satisfy": 1,
+    }
+    assert report.by_attribute["Requirement._txt"]["bytes"] > 1700
+    assert report.by_attribute["Block._uuid"]["count"] == 2
+    assert report.by_container["parts"] == {
+        "count": 2,
+        "bytes": report.by_container["parts"]["bytes"],
+        "empty": 1,
+    }
+    assert report.by_container["elements"]["empty"] == 0
+    assert {name: entry["count"] for name, entry in report.by_package.items()} == {
+        "structure": 3,
+        "requirements": 3,
+    }
+    assert report.by_package["requirements"]["bytes"] > 1700
+    assert report.by_site is None
+
+    # deep part chains are walked without recursion
+    block = model["structure"]["constitution-class starship"]
+    for i in range(5000):
+        part = sysml.Block("part{}".format(i))
+        block.add_part("part", part)
+        block = part
+    assert model.memory_usage().by_class["Block"]["count"] == 5002
+
+    with pytest.raises(RuntimeError):
+        model.memory_usage(tracemalloc=True)
+
+
+def test_memory_usage_tracemalloc():
+    tracemalloc.start()
+    try:
+        model = build()
+        report = model.memory_usage(tracemalloc=True)
+    finally:
+        tracemalloc.stop()
+    assert sum(entry["bytes"] for entry in report.by_site.values()) <= report.total
+    assert any("structure.py" in site for site in report.by_site)
+    assert not any("sysml/memory.py" in site for site in report.by_site)
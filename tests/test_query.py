@@ -0,0 +1,116 @@
+import sysml
+import gc
+import pytest
+import weakref
+
+
+@pytest.fixture
+def model():
+    """Create a model with a structure package of blocks and a requirements
+    package of requirements, one of which is satisfied"""
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    warpdrive = sysml.Block("Class-7 Warp Drive")
+    starship.add_part("warpdrive", warpdrive)
+    starship.add_part("nacelle", sysml.Block("Nacelle", multiplicity=2))
+    functional = sysml.Requirement("Functional", "travel at warp 8", "REQ-2")
+    performance = sysml.Requirement("Performance", "hold 400 crew", "REQ-3")
+    model.add(sysml.Package("structure", [starship]))
+    model.add(sysml.Package("requirements", [functional, performance]))
+    model["requirements"].add(sysml.Satisfy(warpdrive, functional))
+    return model
+
+
+def test_query_type_and_where(model):
+    query = model.query(type=sysml.Block)
+    assert [block.name for block in query] == [
+        "constitution-class starship",
+        "Class-7 Warp Drive",
+        "Nacelle",
+    ]
+    # lazy iterators are recomputed each time
+    assert query.count() == 3
+    assert model.query(type=sysml.Package).count() == 2
+    assert model.query(type=sysml.Dependency).count() == 1
+    assert model.query().count() == 8
+
+    query = model.query(type=sysml.Block, where={"multiplicity": lambda m: m > 1})
+    assert [block.name for block in query] == ["Nacelle"]
+    assert model.query(where={"id": "REQ-3"}).first().name == "Performance"
+    assert model.query(where={"id": "REQ-4"}).first() is None
+    assert model.query(where=lambda element: "Warp" in element.name).count() == 1
+
+    unsatisfied = model.query(
+        type=sysml.Requirement,
+        where=lambda requirement: not model.query(
+            type=sysml.Satisfy, where={"supplier": requirement}
+        ).first(),
+    )
+    assert [requirement.name for requirement in unsatisfied] == ["Performance"]
+
+    with pytest.raises(TypeError):
+        model.query(type="Block")
+
+
+def test_query_under(model):
+    starship = model["structure"]["constitution-class starship"]
+    query = model.query(under=starship)
+    assert [element.name for element in query] == ["Class-7 Warp Drive", "Nacelle"]
+    assert model.query(type=sysml.Requirement, under=model["structure"]).count() == 0
+
+    with pytest.raises(ValueError):
+        list(model.query(under=sysml.Block("Elsewhere")))
+
+
+def test_query_explain(model):
+    query = model.query(
+        type=sysml.Block,
+        where={"multiplicity": lambda m: m > 1},
+        under=model["structure"],
+    )
+    assert list(query) == [model["structure"]["constitution-class starship"]["nacelle"]]
+    assert query.explain().splitlines() == [
+        "drive  attribute index multiplicity (1 of 2 values): 1 elements",
+        "filter type index Block: 3 elements",
+        "filter subtree of <Package('structure')>: 3 elements",
+    ]
+    assert model.query().explain() == "drive  scan: 8 elements"
+    assert model.query(where={"elements": {}}).explain().splitlines()[1] == (
+        "filter attribute elements (not indexed)"
+    )
+
+
+def test_query_invalidation(model):
+    starship = model["structure"]["constitution-class starship"]
+    query = model.query(type=sysml.Block, where={"multiplicity": 2})
+    assert query.count() == 1
+    starship["warpdrive"].multiplicity = 2
+    assert query.count() == 2
+    starship.add_part("impulse", sysml.Block("Impulse engine", multiplicity=2))
+    assert [block.name for block in query] == [
+        "Class-7 Warp Drive",
+        "Nacelle",
+        "Impulse engine",
+    ]
+    starship.remove_part("nacelle")
+    assert query.count() == 2
+
+
+def test_query_releases_model():
+    model = sysml.Model("NCC-1701")
+    model.add(sysml.Package("structure", [sysml.Block("Shuttlecraft")]))
+    model.query(type=sysml.Block).count()
+    assert "_query_index" not in model.__getstate__()
+    reference = weakref.ref(model)
+    del model
+    gc.collect()
+    assert reference() is None
+
+
+def test_query_fork(model):
+    variant = model.fork()
+    for block in variant.query(type=sysml.Block):
+        block.multiplicity = 3
+
+    assert [block.multiplicity for block in model.query(type=sysml.Block)] == [1, 1, 2]
+    assert variant.query(type=sysml.Block, where={"multiplicity": 3}).count() == 3
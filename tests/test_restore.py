@@ -0,0 +1,124 @@
+import sysml
+import uuid
+import pytest
+
+UUID = "0f7c9a8e-6d4b-11ee-b962-0242ac120002"
+
+
+def test_restore():
+    coil = sysml.Block("Warp Coil")
+    nacelle = sysml.Block.restore(
+        UUID, {"_name": "Nacelle", "_multiplicity": 2}, {"parts": {"coil": coil}}
+    )
+    assert nacelle.uuid == uuid.UUID(UUID)
+    assert sysml.Block.restore(uuid.UUID(UUID).bytes).uuid == uuid.UUID(UUID)
+    assert sysml.Block.restore("{" + UUID + "}").uuid == uuid.UUID(UUID)
+    assert hash(nacelle.uuid) == hash(uuid.UUID(UUID))
+    assert nacelle.name == "Nacelle"
+    assert nacelle.multiplicity == 2
+    assert nacelle["coil"] is coil
+    assert nacelle.values == {}
+    assert (
+        nacelle.content_hash
+        == sysml.Block.restore(
+            UUID, {"_name": "Nacelle", "_multiplicity": 2}, {"parts": {"coil": coil}}
+        ).content_hash
+    )
+
+    # collections are not shared between restored elements
+    other = sysml.Block.restore(uuid.uuid1())
+    assert other.name == "" and other.multiplicity == 1
+    assert other._parts is not sysml.Block.restore(uuid.uuid1())._parts
+    interaction = sysml.Interaction.restore(uuid.uuid1())
+    assert interaction.messages is not sysml.Interaction.restore(uuid.uuid1()).messages
+
+    requirement = sysml.Requirement.restore(
+        uuid.uuid1(),
+        {"_name": "Functional", "_txt": "travel at warp 8", "_id": "REQ-2"},
+    )
+    satisfy = sysml.Satisfy.restore(
+        uuid.uuid1(), {"_name": "", "_client": nacelle, "_supplier": requirement}
+    )
+    assert satisfy.client is nacelle
+    model = sysml.Model.restore(
+        uuid.uuid1(),
+        {"_name": "NCC-1701"},
+        {"elements": {"Nacelle": nacelle, "satisfy1": satisfy}},
+    )
+    model.validate()
+
+    with pytest.raises(KeyError):
+        sysml.Block.restore(UUID, containers={"lifelines": {}})
+
+
+def test_validate():
+    nacelle = sysml.Block.restore(UUID, {"_name": "Nacelle", "_multiplicity": "2"})
+    model = sysml.Model("NCC-1701")
+    model.add(sysml.Package("structure", [sysml.Block("starship", [nacelle])]))
+    with pytest.raises(TypeError, match="structure/starship/Nacelle"):
+        model.validate()
+
+    nacelle.multiplicity = 2
+    model.validate()
+    model["structure"]["starship"]._parts["shield"] = sysml.Package("shield")
+    with pytest.raises(TypeError):
+        model.validate()
+
+    requirement = sysml.Requirement.restore(UUID, {"_name": "Functional"})
+    assert requirement.txt == ""
+    requirement.validate()
+    requirement = sysml.Requirement.restore(UUID, {"_txt": None})
+    with pytest.raises(TypeError):
+        requirement.validate()
+
+
+def test_restore_behavior():
+    interaction = sysml.Interaction.restore(UUID, {"_name": "docking"})
+    assert len(interaction.messages) == 0
+    assert interaction.messages is not sysml.Interaction.restore(UUID).messages
+    interaction.validate()
+    assert sysml.ValueType.restore(UUID).name == ""
+
+    idle = sysml.State("idle")
+    start, end = sysml.InitialNode("start"), sysml.ActivityFinalNode("end")
+    for element in (
+        sysml.Interaction.restore(UUID, {"_messages": None}),
+        sysml.Transition.restore(UUID, {"_name": "dock", "_target": idle}),
+        sysml.ControlFlow.restore(UUID, {"_target": end}),
+        sysml.ObjectFlow.restore(UUID, {"_source": start, "_target": idle}),
+        sysml.StateMachine.restore(UUID, containers={"states": {"idle": start}}),
+        sysml.Action.restore(UUID, {"_duration": "2.0"}),
+    ):
+        with pytest.raises(TypeError):
+            element.validate()
+
+    flow = sysml.ControlFlow.restore(UUID, {"_source": start, "_target": end})
+    sysml.Activity.restore(
+        UUID, containers={"nodes": {"start": start, "end": end}, "edges": {"c": flow}}
+    ).validate()
+
+
+def test_validate_on_load(tmp_path):
+    model = sysml.Model("NCC-1701")
+    model.add(sysml.Package("structure", [sysml.Block("starship")]))
+    model.to_yaml(str(tmp_path / "model.yaml"))
+    model.to_directory(str(tmp_path / "directory"))
+    model.to_jsonl(str(tmp_path / "model.jsonl"))
+    with sysml.ModelStore(str(tmp_path / "model.db")) as store:
+        store.save(model)
+    with sysml.ModelStore(str(tmp_path / "model.db")) as store:
+        for loaded in (
+            sysml.read_yaml(str(tmp_path / "model.yaml"), validate=True),
+            sysml.read_directory(str(tmp_path / "directory"), 1, validate=True),
+            sysml.read_jsonl(str(tmp_path / "model.jsonl"), validate=True),
+            store.get(model.uuid, validate=True),
+        ):
+            assert loaded.content_hash == model.content_hash
+
+    with open(str(tmp_path / "model.jsonl")) as f:
+        lines = f.read().replace('"multiplicity":1', '"multiplicity":"1"')
+    with open(str(tmp_path / "model.jsonl"), "w") as f:
+        f.write(lines)
+    sysml.read_jsonl(str(tmp_path / "model.jsonl"))
+    with pytest.raises(TypeError):
+        sysml.read_jsonl(str(tmp_path / "model.jsonl"), validate=True)
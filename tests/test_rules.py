@@ -0,0 +1,77 @@
+import sysml
+import sysml.rules
+import pytest
+
+
+@pytest.fixture
+def model():
+    """Create a model that breaks each built-in rule once: an unnamed block, a
+    requirement nothing links to, a satisfy from a requirement, a negative
+    multiplicity and a name used by both a part and a reference"""
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    warpdrive = sysml.Block("Class-7 Warp Drive")
+    starship.add_part("warpdrive", warpdrive)
+    starship.add_part("nacelle", sysml.Block("Nacelle", multiplicity=-1))
+    starship.add_reference("warpdrive", warpdrive)
+    functional = sysml.Requirement("Functional", "travel at warp 8", "REQ-2")
+    performance = sysml.Requirement("Performance", "hold 400 crew", "REQ-3")
+    orphan = sysml.Requirement("Orphan", "be orphaned", "REQ-4")
+    model.add(sysml.Package("structure", [starship, sysml.Block("")]))
+    model.add(sysml.Package("requirements", [functional, performance, orphan]))
+    model["requirements"].add(sysml.Satisfy(warpdrive, functional))
+    model["requirements"].add(sysml.Satisfy(functional, performance))
+    return model
+
+
+EXPECTED = [
+    ("naming", ("structure", "")),
+    ("multiplicity", ("structure", "constitution-class starship", "nacelle")),
+    ("duplicate-name", ("structure", "constitution-class starship")),
+    ("satisfy-client", ("requirements", "satisfy2")),
+    ("orphan-requirement", ("requirements", "Orphan")),
+]
+
+
+def test_default_rules(model):
+    violations = list(model.check())
+    assert sorted((v.rule, v.path) for v in violations) == sorted(EXPECTED)
+    by_rule = {violation.rule: violation for violation in violations}
+    assert by_rule["orphan-requirement"].uuid == str(
+        model["requirements"]["Orphan"].uuid
+    )
+    assert by_rule["multiplicity"].message == "multiplicity -1 is below 0"
+    assert by_rule["duplicate-name"].message == (
+        "'warpdrive' is used by parts and references"
+    )
+    # violations stream package by package, then model-wide rules
+    assert [violation.rule for violation in violations][-1] == "orphan-requirement"
+
+
+def test_processes(model, monkeypatch):
+    assert list(model.check(processes=2)) == list(model.check())
+    # without fork, workers check snapshots of their packages
+    monkeypatch.setattr(sysml.rules, "_get_all_start_methods", lambda: ["spawn"])
+    assert list(model.check(processes=2)) == list(model.check())
+
+
+def test_custom_rule(model):
+    class Numbered(sysml.Rule):
+        name = "numbered"
+        type = sysml.Requirement
+
+        def check(self, path, requirement):
+            if requirement.id != "REQ-2":
+                yield "not REQ-2"
+
+    rules = [Numbered(), sysml.NamingRule("[A-Z].*", type=sysml.Requirement)]
+    violations = list(model.check(rules))
+    assert [(v.rule, v.path[-1]) for v in violations] == [
+        ("numbered", "Performance"),
+        ("numbered", "Orphan"),
+    ]
+    assert list(model.check([sysml.MultiplicityRule(maximum=1)]))[0].message == (
+        "multiplicity -1 is below 0"
+    )
+    with pytest.raises(TypeError):
+        model.check([Numbered])
@@ -0,0 +1,123 @@
+import sysml
+import sysml.simulation as simulation
+import pytest
+from array import array
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    """Run each test with and without numpy"""
+    if request.param == "python":
+        monkeypatch.setattr(simulation, "_numpy", None)
+    elif simulation._numpy is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+@pytest.fixture
+def machine():
+    """Create a shuttle state machine whose docking is guarded by clearance,
+    granted to even-numbered instances only"""
+    idle = sysml.State("idle")
+    approach = sysml.State("approach")
+    docked = sysml.State("docked")
+    log = []
+    machine = sysml.StateMachine(
+        "Shuttle",
+        [idle, approach, docked],
+        [
+            sysml.Transition(idle, approach, "launch"),
+            sysml.Transition(
+                approach,
+                docked,
+                "dock",
+                guard=lambda instance: instance % 2 == 0,
+                action=log.append,
+            ),
+            sysml.Transition(docked, idle, "undock"),
+            sysml.Transition(approach, idle, "abort"),
+        ],
+    )
+    machine.log = log
+    return machine
+
+
+def test_state_machine(machine):
+    assert machine.initial is machine["idle"]
+    assert list(machine.transitions) == [
+        "transition1",
+        "transition2",
+        "transition3",
+        "transition4",
+    ]
+    assert repr(machine.transitions["transition1"]) == (
+        "<Transition('idle' -> 'approach' on 'launch')>"
+    )
+    with pytest.raises(KeyError):
+        machine.add_transition(
+            sysml.Transition(machine["idle"], sysml.State("lost"), "drift")
+        )
+
+    content_hash = machine.content_hash
+    machine.initial = machine["approach"]
+    assert machine.content_hash != content_hash
+
+    table = machine.compile()
+    assert table.states == ("idle", "approach", "docked")
+    assert table.events == ("launch", "dock", "undock", "abort")
+    assert table.initial == 1
+    assert list(table.table) == [1, -1, -1, -1, -1, -2, -1, 0, -1, -1, 0, -1]
+    assert table.fire(1, 1, instance=0) == 2
+    assert table.fire(1, 1, instance=1) == 1
+    assert machine.log == [0]
+
+    with pytest.raises(ValueError):
+        sysml.StateMachine("Empty").compile()
+
+
+def test_simulation_step(backend, machine):
+    run = sysml.Simulation(machine, instances=6)
+    assert run.counts() == {"idle": 6, "approach": 0, "docked": 0}
+    run.send("launch")
+    run.send("dock")
+    assert [run.state(i) for i in range(6)] == ["docked", "approach"] * 3
+    assert machine.log == [0, 2, 4]
+
+    run.step(["undock", "abort", -1, "abort", "undock", -1])
+    assert [run.state(i) for i in range(6)] == [
+        "idle",
+        "idle",
+        "docked",
+        "idle",
+        "idle",
+        "approach",
+    ]
+    run.step(array("l", [0, -1, 2, -1, 0, 3]))
+    assert run.counts() == {"idle": 4, "approach": 2, "docked": 0}
+    assert list(run.states) == [1, 0, 0, 0, 1, 0]
+
+    run.reset()
+    assert run.counts() == {"idle": 6, "approach": 0, "docked": 0}
+    with pytest.raises(ValueError):
+        run.step([0, 1])
+    with pytest.raises(ValueError):
+        run.step([4] * 6)
+    with pytest.raises(KeyError):
+        run.send("warp")
+
+    if backend == "numpy":
+        numpy = simulation._numpy
+        run = sysml.Simulation(machine, instances=1000)
+        run.step(numpy.zeros(1000, dtype=int))
+        run.step(numpy.ones(1000, dtype=int))
+        assert run.counts() == {"idle": 0, "approach": 500, "docked": 500}
+
+
+def test_simulation_run(backend, machine):
+    run = sysml.Simulation(machine, instances=2)
+    events = ["launch", "dock", "undock"] * 1000 + ["launch"]
+    assert run.run(events) == "approach"
+    assert run.run(["dock"], instance=1) == "idle"
+    assert run.run(array("l", [0, 1, -1]), instance=1) == "approach"
+    assert len(machine.log) == 1000
+    assert [run.state(0), run.state(1)] == ["approach", "approach"]
@@ -0,0 +1,180 @@
+import sysml
+import pytest
+
+
+@pytest.fixture
+def model():
+    """Create a model whose requirements package references a block in the
+    structure package"""
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    warpdrive = sysml.Block("Class-7 Warp Drive")
+    starship.add_part("warpdrive", warpdrive)
+    starship.add_part("nacelle", sysml.Block("Nacelle", multiplicity=2))
+    functional_req = sysml.Requirement("Functional", "travel at warp 8", "REQ-2")
+    model.add(sysml.Package("structure", [starship]))
+    model.add(sysml.Package("requirements", [functional_req]))
+    model["requirements"].add(sysml.Satisfy(warpdrive, functional_req))
+    return model
+
+
+def test_store_round_trip(model, tmp_path):
+    path = str(tmp_path / "model.db")
+    with sysml.ModelStore(path) as store:
+        store.save(model)
+        assert len(store) == 8
+        assert store.roots() == [str(model.uuid)]
+
+    with sysml.ModelStore(path) as store:
+        model2 = store.get(model.uuid)
+        assert model2 is store.get(str(model.uuid))
+        assert repr(model2) == repr(model)
+        assert model2.content_hash == model.content_hash
+        satisfy = model2["requirements"]["satisfy1"]
+        assert (
+            satisfy.client
+            is model2["structure"]["constitution-class starship"]["warpdrive"]
+        )
+
+        with pytest.raises(KeyError):
+            store.get("not a uuid")
+        with pytest.raises(TypeError):
+            store.save("not an element")
+
+
+def test_store_find(model):
+    with sysml.ModelStore() as store:
+        store.save(model)
+        store.release(model)
+
+        requirements = list(store.find(type=sysml.Requirement, id="REQ-2"))
+        assert [repr(element) for element in requirements] == [
+            "<Requirement('Functional')>"
+        ]
+        assert len(list(store.find(type=sysml.Block))) == 3
+        assert len(list(store.find(type=sysml.Package))) == 3
+        assert len(list(store.find(type=sysml.Dependency))) == 1
+        assert [e.name for e in store.find(name="Nacelle")] == ["Nacelle"]
+        assert list(store.find(type=sysml.Block, name="Functional")) == []
+
+
+def test_store_partial_edit(model, tmp_path):
+    path = str(tmp_path / "model.db")
+    with sysml.ModelStore(path) as store:
+        store.save(model)
+
+    with sysml.ModelStore(path) as store:
+        (nacelle,) = store.find(name="Nacelle")
+        nacelle.multiplicity = 4
+        (starship,) = store.find(name="constitution-class starship")
+        starship.add_part("cloak", sysml.Block("Cloaking device"))
+        starship.remove_part("warpdrive")
+        starship.remove_part("nacelle")
+        starship.add_part("nacelle", nacelle)
+        store.flush()
+
+    with sysml.ModelStore(path) as store:
+        starship = store.get(model["structure"]["constitution-class starship"].uuid)
+        assert starship["nacelle"].multiplicity == 4
+        assert list(starship.parts) == ["cloak", "nacelle"]
+        # the warp drive is no longer owned, but the satisfy relationship
+        # still refers to it
+        assert len(list(store.find(name="Class-7 Warp Drive"))) == 1
+        assert len(store) == 9
+
+        starship.add_part("impulse", sysml.Block("Impulse engine"))
+        starship["impulse"].add_part("reactor", sysml.Block("Fusion reactor"))
+        store.flush()
+        assert len(store) == 11
+        starship.remove_part("impulse")
+        store.flush()
+        assert len(store) == 9
+        assert list(store.find(name="Fusion reactor")) == []
+
+        model2 = store.get(model.uuid)
+        assert model2["structure"]["constitution-class starship"] is starship
+        satisfy = model2["requirements"]["satisfy1"]
+        assert satisfy.client.name == "Class-7 Warp Drive"
+
+
+def test_store_references_not_owned(model):
+    starship = model["structure"]["constitution-class starship"]
+    probe = sysml.Block("Probe", references={"mothership": starship})
+    model["structure"].add(probe)
+    with sysml.ModelStore() as store:
+        store.save(model)
+        assert len(store) == 9
+
+        model["structure"].remove(probe)
+        store.flush()
+        assert len(store) == 8
+        store.release(model)
+
+        loaded = store.get(starship.uuid)
+        assert list(loaded.parts) == ["warpdrive", "nacelle"]
+        assert loaded.content_hash == starship.content_hash
+
+
+def test_store_find_tracks_weakly(model, tmp_path):
+    path = str(tmp_path / "model.db")
+    with sysml.ModelStore(path) as store:
+        store.save(model)
+
+    with sysml.ModelStore(path) as store:
+        (nacelle,) = store.find(name="Nacelle")
+        assert str(nacelle.uuid) not in store._roots
+        nacelle.multiplicity = 4
+        store.flush()
+        del nacelle
+        assert len(store._found) == 0
+
+        (nacelle,) = store.find(name="Nacelle")
+        assert nacelle.multiplicity == 4
+
+
+def test_store_behavior(model):
+    kirk, spock = sysml.Block("Kirk"), sysml.Block("Spock")
+    interaction = sysml.Interaction("Briefing", [kirk, spock])
+    interaction.add_message(kirk, spock, 2.0)
+    interaction.add_message(spock, kirk, 1.0, "reply")
+    idle, docked = sysml.State("idle"), sysml.State("docked")
+    machine = sysml.StateMachine(
+        "Shuttle", [idle, docked], [sysml.Transition(idle, docked, "dock")]
+    )
+    launch = sysml.Action("launch", duration=2.0)
+    start, end = sysml.InitialNode("start"), sysml.ActivityFinalNode("end")
+    mission = sysml.Activity(
+        "Mission",
+        [start, launch, end],
+        [sysml.ControlFlow(start, launch), sysml.ControlFlow(launch, end)],
+    )
+    model.add(sysml.Package("behavior", [kirk, spock, interaction, machine, mission]))
+
+    with sysml.ModelStore() as store:
+        store.save(model)
+        store.release(model)
+        model2 = store.get(model.uuid)
+
+        assert model2.content_hash == model.content_hash
+        messages = model2["behavior"]["Briefing"].messages
+        assert [messages[message] for message in range(len(messages))] == [
+            ("Kirk", "Spock", 2.0, "synchCall"),
+            ("Spock", "Kirk", 1.0, "reply"),
+        ]
+        assert list(messages.between("Kirk", "Spock", 0.0, 1.5)) == [1]
+        assert model2["behavior"]["Mission"]["launch"].duration == 2.0
+
+
+def test_store_rejects_callables(model):
+    idle, docked = sysml.State("idle"), sysml.State("docked")
+    guarded = sysml.Transition(idle, docked, "dock", guard=lambda instance: True)
+    model.add(
+        sysml.Package(
+            "behavior", [sysml.StateMachine("Shuttle", [idle, docked], [guarded])]
+        )
+    )
+
+    with sysml.ModelStore() as store:
+        with pytest.raises(TypeError, match="_guard"):
+            store.save(model)
+        assert len(store) == 0
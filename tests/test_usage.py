@@ -0,0 +1,135 @@
+import sysml
+import pytest
+
+
+@pytest.fixture
+def model():
+    """Create a model with a library package holding a bolt definition, used
+    three times by a flange in a structure package"""
+    model = sysml.Model("NCC-1701")
+    bolt = sysml.Block("M6 Bolt")
+    bolt.add_part("nut", sysml.Block("M6 Nut"))
+    flange = sysml.Block("Flange")
+    flange.add_usage("bolt1", bolt, overrides={"torque": 9.5})
+    flange.add_usage("bolt2", bolt, multiplicity=2)
+    flange.add_part("bolt3", sysml.PartUsage(bolt))
+    model.add(sysml.Package("library", [bolt]))
+    model.add(sysml.Package("structure", [flange]))
+    return model
+
+
+def test_usage(model):
+    bolt = model["library"]["M6 Bolt"]
+    flange = model["structure"]["Flange"]
+    assert [usage.definition for usage in flange.parts.values()] == [bolt] * 3
+    assert flange["bolt3"].name == "M6 Bolt"
+    assert flange["bolt2"].multiplicity == 2
+    assert flange["bolt1"]["torque"] == 9.5
+    assert flange["bolt1"]["nut"] is bolt["nut"]
+    assert flange["bolt1"].overrides == {"torque": 9.5}
+    with pytest.raises(KeyError):
+        flange["bolt2"]["torque"]
+    assert not hasattr(flange["bolt1"], "__dict__")
+
+    with pytest.raises(TypeError):
+        sysml.PartUsage(model["library"])
+    with pytest.raises(TypeError):
+        flange.add_usage("bolt4", bolt, multiplicity="2")
+
+
+def test_usage_hash(model):
+    """Usages hash their own fields; the definition is hashed where it is
+    owned"""
+    flange = model["structure"]["Flange"]
+    digest = flange.content_hash
+    flange["bolt2"].multiplicity = 3
+    assert flange.content_hash != digest
+
+    digest = flange.content_hash
+    flange["bolt2"].override("torque", 8.0)
+    assert flange.content_hash != digest
+
+    digest = model.content_hash
+    structure = model["structure"].content_hash
+    model["library"]["M6 Bolt"].add_part("washer", sysml.Block("Washer"))
+    assert model.content_hash != digest
+    assert model["structure"].content_hash == structure
+
+    # definitions are referenced, not walked into by default
+    assert [path for path, element in flange.walk()] == [
+        ("bolt1",),
+        ("bolt2",),
+        ("bolt3",),
+    ]
+    walked = [path for path, element in flange.walk(references=True)]
+    assert ("bolt1", "definition", "nut") in walked
+
+
+def test_usage_serialization(model, tmp_path):
+    filename = str(tmp_path / "model.yaml")
+    model.to_yaml(filename)
+    with open(filename) as f:
+        assert f.read().count("M6 Nut") == 1
+
+    model.to_directory(str(tmp_path / "directory"))
+    with sysml.ModelStore(str(tmp_path / "model.db")) as store:
+        store.save(model)
+    with sysml.ModelStore(str(tmp_path / "model.db")) as store:
+        for loaded in (
+            sysml.read_yaml(filename),
+            sysml.read_directory(str(tmp_path / "directory")),
+            store.get(model.uuid),
+        ):
+            assert loaded.content_hash == model.content_hash
+            bolt = loaded["library"]["M6 Bolt"]
+            flange = loaded["structure"]["Flange"]
+            assert all(usage.definition is bolt for usage in flange.parts.values())
+            assert flange["bolt1"].overrides == {"torque": 9.5}
+
+
+def test_usage_fork(model):
+    digest = model.content_hash
+    variant = model.fork()
+    usage = variant["structure"]["Flange"]["bolt1"]
+    usage.multiplicity = 4
+    usage.definition.name = "M8 Bolt"
+    assert usage.definition is variant["structure"]["Flange"]["bolt2"].definition
+    assert model["structure"]["Flange"]["bolt1"].multiplicity == 1
+    assert model["library"]["M6 Bolt"].name == "M6 Bolt"
+    assert model.content_hash == digest
+
+
+def test_usage_fork_rehomes_definition(model, tmp_path):
+    digest = model.content_hash
+    variant = model.fork()
+    variant["structure"]["Flange"]["bolt1"].definition.name = "M8 Bolt"
+
+    assert (
+        variant["library"]["M6 Bolt"]
+        is variant["structure"]["Flange"]["bolt2"].definition
+    )
+    assert variant.content_hash != digest
+    assert [change.kind for change in sysml.diff(model, variant)] == ["renamed"]
+
+    filename = str(tmp_path / "variant.yaml")
+    variant.to_yaml(filename)
+    loaded = sysml.read_yaml(filename)
+    assert loaded.content_hash == variant.content_hash
+    assert loaded["structure"]["Flange"]["bolt1"].definition.name == "M8 Bolt"
+
+
+def test_usage_cycles(model):
+    bolt = model["library"]["M6 Bolt"]
+    flange = model["structure"]["Flange"]
+    assert sysml.find_cycle(model) is None
+
+    bolt["nut"].add_usage("flange", flange)
+    assert sysml.find_cycle(model) is not None
+
+    bolt["nut"].remove_part("flange")
+    with sysml.CycleGuard():
+        with pytest.raises(ValueError):
+            bolt["nut"].add_usage("flange", flange)
+        with pytest.raises(ValueError):
+            flange.add_usage("flange", flange)
+        bolt["nut"].add_usage("washer", sysml.Block("Washer"))
@@ -0,0 +1,111 @@
+import sysml
+import pytest
+
+
+@pytest.fixture
+def model():
+    """Create a model with a structure package, whose starship owns a drive
+    block twice, and a requirements package"""
+    model = sysml.Model("NCC-1701")
+    starship = sysml.Block("constitution-class starship")
+    warpdrive = sysml.Block("Class-7 Warp Drive")
+    starship.add_part("warpdrive", warpdrive)
+    starship.add_part("spare", warpdrive)
+    requirement = sysml.Requirement("Functional", "travel at warp 8", "REQ-2")
+    model.add(sysml.Package("structure", [starship]))
+    model.add(sysml.Package("requirements", [requirement]))
+    return model
+
+
+def test_walk_order(model):
+    assert [path for path, element in model.walk()] == [
+        ("structure",),
+        ("structure", "constitution-class starship"),
+        ("structure", "constitution-class starship", "warpdrive"),
+        ("requirements",),
+        ("requirements", "Functional"),
+    ]
+    assert [path for path, element in model.walk(order="bfs")] == [
+        ("structure",),
+        ("requirements",),
+        ("structure", "constitution-class starship"),
+        ("requirements", "Functional"),
+        ("structure", "constitution-class starship", "warpdrive"),
+    ]
+    path, element = next(model.walk(type=sysml.Requirement))
+    assert element is model["requirements"]["Functional"]
+    with pytest.raises(ValueError):
+        list(model.walk(order="postorder"))
+
+
+def test_walk_shared_elements(model):
+    paths = [path for path, element in model.walk(unique=False)]
+    assert ("structure", "constitution-class starship", "spare") in paths
+    assert len(paths) == 6
+
+    blocks = [element for path, element in model.walk(type=sysml.Block)]
+    assert [block.name for block in blocks] == [
+        "constitution-class starship",
+        "Class-7 Warp Drive",
+    ]
+
+
+def test_walk_filters(model):
+    assert [path for path, element in model.walk(max_depth=1)] == [
+        ("structure",),
+        ("requirements",),
+    ]
+    assert [
+        element.name
+        for path, element in model.walk(type=(sysml.Block, sysml.Requirement))
+        if len(path) == 2
+    ] == ["constitution-class starship", "Functional"]
+
+    # pruned elements are yielded, the elements they subsume are not
+    pruned = model.walk(prune=lambda path, element: path[-1] == "structure")
+    assert [path for path, element in pruned] == [
+        ("structure",),
+        ("requirements",),
+        ("requirements", "Functional"),
+    ]
+
+
+def test_walk_references():
+    drive = sysml.Block("Class-7 Warp Drive")
+    nacelle = sysml.Block("Nacelle")
+    drive.add_part("nacelle", nacelle)
+    starship = sysml.Block("constitution-class starship", references=[drive])
+    assert list(starship.walk()) == []
+    assert [path for path, element in starship.walk(references=True)] == [
+        ("Class-7 Warp Drive",),
+        ("Class-7 Warp Drive", "nacelle"),
+    ]
+
+
+def test_walk_deep_model():
+    """A walk is not limited by the recursion limit"""
+    root = block = sysml.Block("block0")
+    for depth in range(1, 5001):
+        child = sysml.Block("block{}".format(depth))
+        block.add_part("part", child)
+        block = child
+    paths = [path for path, element in root.walk()]
+    assert len(paths) == 5000
+    assert len(paths[-1]) == 5000
+    assert len(list(root.walk(order="bfs", max_depth=10))) == 10
+
+
+@pytest.mark.parametrize("order", ["dfs", "bfs"])
+def test_walk_fork(model, order):
+    before = model.content_hash
+    variant = model.fork()
+    for path, block in variant.walk(order=order, type=sysml.Block):
+        block.multiplicity = 3
+
+    assert model.content_hash == before
+    assert all(block.multiplicity == 1 for path, block in model.walk(type=sysml.Block))
+    assert variant["structure"]["constitution-class starship"].multiplicity == 3
+    assert (
+        variant["structure"]["constitution-class starship"]["spare"]
+        is variant["structure"]["constitution-class starship"]["warpdrive"]
+    )